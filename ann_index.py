@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+# hnswlib is optional; say so once per process, not for every index
+_warned_missing = False
+
+
+class CandidateIndex:
+    """
+    Approximate nearest-neighbour index over the candidate embeddings in an
+    EmbeddingStore: one HNSW graph for the full-text vectors and one per
+    section type.
+
+    Labels are EmbeddingStore row numbers, so re-adding a candidate updates its
+    vector in place. Inserts are incremental and the graphs are persisted next
+    to the store; save() only writes them when something was added since the
+    last save. `ef_search` is the recall/speed knob: higher values explore
+    more of the graph and get closer to exact results.
+
+    Pools smaller than `exact_threshold` (or any pool when hnswlib isn't
+    installed) are searched exactly with one matrix-vector product.
+    """
+
+    def __init__(self, embedding_store, path_prefix='candidate_ann', exact_threshold=5000,
+                 ef_search=128, ef_construction=200, M=16):
+        self.store = embedding_store
+        self.path_prefix = path_prefix
+        self.exact_threshold = exact_threshold
+        self.ef_search = ef_search
+        self.ef_construction = ef_construction
+        self.M = M
+
+        self.fields = ['full'] + list(embedding_store.section_types)
+        self._indexes = {}
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.RLock()
+
+        global _warned_missing
+        if hnswlib is None and not _warned_missing:
+            _warned_missing = True
+            print("hnswlib is not installed, candidate search will be exact")
+
+    @property
+    def available(self):
+        return hnswlib is not None
+
+    def set_ef(self, ef_search):
+        """Trade speed for recall on subsequent queries."""
+        with self._lock:
+            self.ef_search = ef_search
+            for index in self._indexes.values():
+                index.set_ef(ef_search)
+
+    def add(self, doc_id):
+        """Index (or re-index) one candidate that is already in the embedding store."""
+        if not self.available:
+            return
+        with self._lock:
+            self._ensure_loaded()
+            row = int(self.store.rows([doc_id])[0])
+            self._add_rows(np.array([row]))
+
+    def sync(self):
+        """Bring the graphs up to date with every row in the store, e.g. after loading."""
+        if not self.available or not len(self.store):
+            return
+        with self._lock:
+            n_rows = len(self.store)
+            indexed = self._indexes['full'].get_current_count() if 'full' in self._indexes else 0
+            if indexed < n_rows:
+                self._add_rows(np.arange(indexed, n_rows))
+
+    def search(self, query, k=10, field='full', exact=None):
+        """
+        Return the top-k (doc_id, cosine similarity) pairs for a query embedding.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        query = query / max(np.linalg.norm(query), 1e-12)
+
+        with self._lock:
+            self._ensure_loaded()
+            matrix, mask = self._field_matrix(field)
+            n_candidates = int(mask.sum())
+            if not n_candidates:
+                return []
+            k = min(k, n_candidates)
+
+            if exact is None:
+                exact = not self.available or n_candidates < self.exact_threshold or field not in self._indexes
+            if not exact:
+                k = min(k, self._indexes[field].get_current_count())
+                labels, distances = self._indexes[field].knn_query(query, k=k)
+                # Skip candidates whose section was removed when they were re-added
+                return [(self.store.doc_ids[label], 1.0 - float(distance))
+                        for label, distance in zip(labels[0], distances[0]) if mask[label]]
+
+        # Exact fallback: score every candidate and partially sort
+        scores = matrix @ query
+        scores[~mask] = -np.inf
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.store.doc_ids[row], float(scores[row])) for row in top]
+
+    def save(self):
+        if not self.available or not self._loaded:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            for field, index in self._indexes.items():
+                tmp_path = f"{self._path(field)}.tmp"
+                index.save_index(tmp_path)
+                os.replace(tmp_path, self._path(field))
+            with open(f"{self.path_prefix}.json", 'w') as f:
+                json.dump({'fields': list(self._indexes), 'dim': self.store.dim}, f)
+            self._dirty = False
+
+    def load(self):
+        """Load persisted graphs, then index anything added to the store since they were saved."""
+        if not self.available:
+            return
+        with self._lock:
+            self._loaded = True
+            try:
+                with open(f"{self.path_prefix}.json", 'r') as f:
+                    meta = json.load(f)
+                for field in meta['fields']:
+                    index = hnswlib.Index(space='ip', dim=meta['dim'])
+                    index.load_index(self._path(field))
+                    index.set_ef(self.ef_search)
+                    self._indexes[field] = index
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Error loading candidate index, rebuilding it: {e}")
+                self._indexes = {}
+            self.sync()
+
+    def _ensure_loaded(self):
+        # Loading happens on first use so it never slows down startup
+        if not self._loaded:
+            self.load()
+
+    def _field_matrix(self, field):
+        if field == 'full':
+            matrix = self.store.full_matrix()
+            return matrix, np.ones(len(matrix), dtype=bool)
+        return self.store.section_matrix(field)
+
+    def _add_rows(self, rows):
+        for field in self.fields:
+            matrix, mask = self._field_matrix(field)
+            # Only rows that actually have this section go into its graph
+            field_rows = rows[mask[rows]]
+            if not len(field_rows):
+                continue
+
+            index = self._indexes.get(field)
+            if index is None:
+                index = hnswlib.Index(space='ip', dim=matrix.shape[1])
+                index.init_index(max_elements=max(1024, len(matrix)), ef_construction=self.ef_construction, M=self.M)
+                index.set_ef(self.ef_search)
+                self._indexes[field] = index
+
+            needed = int(field_rows.max()) + 1
+            if needed > index.get_max_elements():
+                index.resize_index(max(needed, index.get_max_elements() * 2))
+
+            index.add_items(matrix[field_rows], field_rows)
+            self._dirty = True
+
+    def _path(self, field):
+        return f"{self.path_prefix}_{field}.bin"
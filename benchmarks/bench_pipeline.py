@@ -0,0 +1,248 @@
+"""
+Time each stage of the resume matching pipeline separately.
+
+    python benchmarks/bench_pipeline.py --pages 1 3 10 --runs 20
+    python benchmarks/bench_pipeline.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_pipeline.py --baseline benchmarks/baseline.json
+
+Stages, for synthetic resumes of each length:
+
+    pdf_extract      fitz text extraction from a generated PDF
+    sections         section extraction (keyword engine)
+    encode           one uncached, batched model.encode of the resume text and its
+                     sections, as the engine runs it; timed per call
+    tfidf            adding the resume to the TF-IDF pool and scoring it
+    save             RankingEngine.save of the scored candidate: its results row and
+                     the flush of the vectors it just added to the embedding store
+    display          refreshing the virtualized rankings view (needs a display)
+
+Reports p50/p95 latency and peak traced memory per stage. --save-baseline
+writes the numbers to a JSON file; --baseline compares a run against one and
+flags stages whose p50 regressed by more than --threshold.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_section_extraction import make_resume
+from job_matching import SECTION_COMPARISONS
+from pdf_extraction import read_pdf_text
+from ranking_engine import RankingEngine
+from section_extractor import get_section_extractor
+
+
+JOB_TEXT = ("Senior Python developer to design data pipelines and cloud services, "
+            "lead agile teams, improve latency and deliver reporting dashboards.")
+
+POOL_SIZE = 2000
+
+EMBEDDING_DIM = 768
+
+
+def write_pdf(text, path, lines_per_page=50):
+    import fitz
+
+    doc = fitz.open()
+    lines = text.split('\n')
+    for start in range(0, len(lines), lines_per_page):
+        page = doc.new_page()
+        page.insert_text((40, 40), '\n'.join(lines[start:start + lines_per_page]), fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, int(round(q / 100 * (len(values) - 1)))))
+    return values[index]
+
+
+def measure(stage, runs, setup=None):
+    """
+    Time `stage()` `runs` times, then run it once more under tracemalloc for
+    peak memory. `setup()`, if given, runs untimed before each call.
+    """
+    times = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        stage()
+        times.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    stage()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'p50_ms': percentile(times, 50) * 1000,
+        'p95_ms': percentile(times, 95) * 1000,
+        'peak_kb': peak / 1024,
+    }
+
+
+def load_model(model_name):
+    try:
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+    except Exception as e:
+        print(f"encode skipped ({e.__class__.__name__}: {str(e).splitlines()[0]})")
+        return None
+
+
+def make_display(store):
+    try:
+        import tkinter as tk
+        from virtual_tree import VirtualTreeview
+
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:
+        print(f"display skipped ({e.__class__.__name__}: {str(e).splitlines()[0]})")
+        return None
+
+    columns = ('Rank', 'Name', 'File', 'Combined Score')
+    widths = {'Rank': 50, 'Name': 300, 'File': 150, 'Combined Score': 120}
+    view = VirtualTreeview(
+        root, columns, widths,
+        fetch=lambda offset, limit: store.ranked(limit, offset),
+        count=lambda: len(store),
+        row_values=lambda index, record: (index + 1, record['candidate_name'], record['resume_file'],
+                                          f"{record['combined_score']*100:.2f}%")
+    )
+    view.visible = 30
+
+    def refresh():
+        view.refresh()
+        root.update_idletasks()
+
+    return refresh
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix='atoms_bench_')
+    try:
+        extractor = get_section_extractor('keyword')
+        model = load_model(args.model)
+
+        # A pre-filled pool so TF-IDF, save and display run at realistic sizes
+        engine = RankingEngine(data_dir=workdir, jobs_file=os.path.join(workdir, 'jobs.json'), load_models=False)
+        tfidf = engine.tfidf_engine
+        store = engine.results_store
+        vectors = np.random.default_rng(args.seed)
+        pool = [make_resume(rng, 1) for _ in range(50)]
+        records = []
+        for i in range(args.pool):
+            tfidf.add_document(f"pool_{i}", pool[i % len(pool)])
+            engine.embedding_store.add(f"pool_{i}", vectors.normal(size=EMBEDDING_DIM), {
+                name: vectors.normal(size=EMBEDDING_DIM) for name in SECTION_COMPARISONS
+            })
+            records.append({'resume_id': f"pool_{i}", 'resume_file': f"pool_{i}.pdf",
+                            'candidate_name': f"Candidate {i}", 'transformer_score': 0.5, 'tfidf_score': 0.5,
+                            'section_score': 0.5, 'combined_score': rng.random(), 'section_details': {}})
+        engine.save(records)
+        display = make_display(store)
+        bench_ids = itertools.count()
+
+        results = {}
+        for pages in args.pages:
+            text = make_resume(rng, pages)
+            pdf_path = os.path.join(workdir, f"resume_{pages}.pdf")
+            write_pdf(text, pdf_path)
+            sections = extractor.extract(text)
+            section_texts = [sections[name] for name in SECTION_COMPARISONS if sections.get(name)]
+
+            bench_record = {'candidate_name': 'Bench', 'transformer_score': 0.5, 'tfidf_score': 0.5,
+                            'section_score': 0.5, 'section_details': {}}
+
+            def add_vectors():
+                # Scoring stores the candidate's vectors before save() flushes them
+                doc_id = f"bench_{next(bench_ids)}"
+                engine.embedding_store.add(doc_id, vectors.normal(size=EMBEDDING_DIM), {
+                    name: vectors.normal(size=EMBEDDING_DIM) for name in SECTION_COMPARISONS
+                })
+                bench_record.update(resume_id=doc_id, resume_file=f"{doc_id}.pdf", combined_score=rng.random())
+            stages = {
+                'pdf_extract': (lambda: read_pdf_text(pdf_path), None),
+                'sections': (lambda: extractor.extract(text), None),
+                'tfidf': (lambda: (tfidf.add_document('bench', text), tfidf.score(JOB_TEXT, ['bench'])), None),
+                'save': (lambda: engine.save([bench_record]), add_vectors),
+            }
+            if model is not None:
+                stages['encode'] = (lambda: model.encode([text] + section_texts, convert_to_numpy=True), None)
+            if display is not None:
+                stages['display'] = (display, None)
+
+            for stage, (fn, setup) in stages.items():
+                results[f"{stage}/{pages}p"] = measure(fn, args.runs, setup)
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def report(results, baseline, threshold):
+    header = f"{'stage':<18}{'p50 ms':>10}{'p95 ms':>10}{'peak KB':>10}"
+    if baseline:
+        header += f"{'vs base':>10}"
+    print(header)
+
+    regressions = []
+    for key, stats in results.items():
+        line = f"{key:<18}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['peak_kb']:>10.0f}"
+        if baseline and key in baseline:
+            change = stats['p50_ms'] / max(baseline[key]['p50_ms'], 1e-9) - 1
+            line += f"{change*100:>+9.1f}%"
+            if change > threshold:
+                line += "  REGRESSION"
+                regressions.append(key)
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 3, 10], help='resume lengths to test')
+    parser.add_argument('--runs', type=int, default=20, help='timed runs per stage')
+    parser.add_argument('--pool', type=int, default=POOL_SIZE, help='candidates already in the pool')
+    parser.add_argument('--model', default='all-mpnet-base-v2')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save-baseline', metavar='PATH', help='write the results to a baseline file')
+    parser.add_argument('--baseline', metavar='PATH', help='compare against a saved baseline')
+    parser.add_argument('--threshold', type=float, default=0.10, help='p50 slowdown that counts as a regression')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)['results']
+
+    results = run(args)
+    regressions = report(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'args': vars(args), 'results': results},
+                      f, indent=2)
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
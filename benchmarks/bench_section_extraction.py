@@ -0,0 +1,76 @@
+"""
+Benchmark the section extractor engines on long resumes.
+
+    python benchmarks/bench_section_extraction.py --pages 10 --resumes 20
+
+Reports lines/sec for the keyword engine and the spaCy engine (token-only,
+plus the lemma mode when en_core_web_lg is installed).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from section_extractor import get_section_extractor
+
+
+HEADERS = ['PROFESSIONAL SUMMARY', 'Work Experience', 'Employment History', 'EDUCATION',
+           'Technical Skills', 'Certifications', 'Projects', 'Academic Background']
+WORDS = ('developed designed implemented managed led python java sql cloud data pipeline team '
+         'customers reduced latency improved revenue analysis reporting dashboards agile '
+         'stakeholders delivered migrated automated tested deployed services platform').split()
+
+
+def make_resume(rng, pages, lines_per_page=50):
+    lines = ['Jane Doe', 'jane.doe@example.com | (555) 555-0100']
+    for _ in range(pages * lines_per_page):
+        if rng.random() < 0.06:
+            lines.append(rng.choice(HEADERS))
+        else:
+            lines.append('• ' + ' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 16))))
+    return '\n'.join(lines)
+
+
+def bench(extractor, resumes, repeat):
+    line_count = sum(resume.count('\n') + 1 for resume in resumes)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for resume in resumes:
+            extractor.extract(resume)
+        best = min(best, time.perf_counter() - start)
+    return line_count / best, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resumes', type=int, default=20, help='number of synthetic resumes')
+    parser.add_argument('--pages', type=int, default=10, help='pages per resume (~50 lines each)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per engine, best time is reported')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    resumes = [make_resume(rng, args.pages) for _ in range(args.resumes)]
+
+    engines = [('keyword', {}), ('spacy', {'attr': 'LOWER'}), ('spacy', {'attr': 'LEMMA'})]
+
+    print(f"{args.resumes} resumes x {args.pages} pages")
+    print(f"{'engine':<16}{'lines/sec':>14}{'seconds':>10}")
+    for engine, kwargs in engines:
+        label = engine if not kwargs else f"{engine}/{kwargs['attr'].lower()}"
+        try:
+            extractor = get_section_extractor(engine, **kwargs)
+        except (ImportError, OSError) as e:
+            print(f"{label:<16}{'skipped':>14}  ({e.__class__.__name__}: {str(e).splitlines()[0]})")
+            continue
+
+        lines_per_sec, seconds = bench(extractor, resumes, args.repeat)
+        print(f"{label:<16}{lines_per_sec:>14,.0f}{seconds:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
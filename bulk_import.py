@@ -0,0 +1,174 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from pdf_extraction import PdfTextExtractor, read_pdf_text
+from section_extractor import split_sections
+
+
+def extract_resume(pdf_path, text_cache_dir=None):
+    """
+    Process-pool stage: pull the text out of a PDF and split it into sections.
+    With `text_cache_dir`, PDFs that were extracted before are not parsed again.
+    """
+    if text_cache_dir:
+        # Already one file per process here, so no page-range workers
+        resume_text = PdfTextExtractor(text_cache_dir, max_workers=1).extract(pdf_path)
+    else:
+        resume_text = read_pdf_text(pdf_path)
+    return pdf_path, resume_text, split_sections(resume_text)
+
+
+def find_resumes(folder):
+    """Walk a folder and return every PDF under it, sorted by path."""
+    pdf_paths = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if name.lower().endswith('.pdf'):
+                pdf_paths.append(os.path.join(root, name))
+    pdf_paths.sort()
+    return pdf_paths
+
+
+class BulkImporter:
+    """
+    Import a folder of resumes in stages.
+
+    PDF extraction and section splitting run in a process pool, embedding and
+    scoring run in batches on a dedicated thread, and everything is reported
+    back through the `events` queue:
+
+        ('progress', processed, total, resumes_per_sec, eta_seconds)
+        ('results', [candidate_data, ...])
+        ('error', pdf_path, message)
+        ('done', succeeded, failed, elapsed_seconds)
+
+    `score_batch` receives a list of (pdf_path, resume_text, resume_sections)
+    and must return one candidate_data dict per item. `text_cache_dir` is the
+    extracted-text cache shared with PdfTextExtractor.
+    """
+
+    def __init__(self, folder, score_batch, events, max_workers=None, batch_size=64, text_cache_dir=None):
+        self.folder = folder
+        self.score_batch = score_batch
+        self.events = events
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.batch_size = batch_size
+        self.text_cache_dir = text_cache_dir
+
+        self.total = 0
+        self.succeeded = 0
+        self.failed = 0
+
+        self._extracted = queue.Queue(maxsize=batch_size * 4)
+        self._counter_lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._threads = []
+        self._start_time = None
+
+    def start(self):
+        self._start_time = time.perf_counter()
+        self._threads = [
+            threading.Thread(target=self._extract_stage, daemon=True),
+            threading.Thread(target=self._embed_stage, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def _extract_stage(self):
+        try:
+            pdf_paths = find_resumes(self.folder)
+            self.total = len(pdf_paths)
+            self._report_progress()
+
+            # Keep a bounded window of work in flight so thousands of files don't all queue at once
+            window = self.max_workers * 4
+            pending = {}
+            next_index = 0
+
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                while (next_index < len(pdf_paths) or pending) and not self._cancelled.is_set():
+                    while next_index < len(pdf_paths) and len(pending) < window:
+                        pdf_path = pdf_paths[next_index]
+                        pending[pool.submit(extract_resume, pdf_path, self.text_cache_dir)] = pdf_path
+                        next_index += 1
+
+                    done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pdf_path = pending.pop(future)
+                        try:
+                            self._extracted.put(future.result())
+                        except Exception as e:
+                            # One corrupt PDF shouldn't abort the whole batch
+                            self._fail(pdf_path, e)
+
+                for future in pending:
+                    future.cancel()
+        except Exception as e:
+            self.events.put(('error', self.folder, f"Failed to read folder: {str(e)}"))
+        finally:
+            self._extracted.put(None)
+
+    def _embed_stage(self):
+        finished = False
+        while not finished:
+            batch = []
+            while len(batch) < self.batch_size:
+                # Flush a partial batch if extraction is slower than embedding
+                timeout = 1.0 if batch else None
+                try:
+                    item = self._extracted.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    finished = True
+                    break
+                batch.append(item)
+
+            if batch and not self._cancelled.is_set():
+                self._score(batch)
+
+        elapsed = time.perf_counter() - self._start_time
+        self.events.put(('done', self.succeeded, self.failed, elapsed))
+
+    def _score(self, batch):
+        records = self._score_split(batch)
+        if records:
+            with self._counter_lock:
+                self.succeeded += len(records)
+            self.events.put(('results', records))
+        self._report_progress()
+
+    def _score_split(self, batch):
+        # A failed batch is retried in halves, so a single bad resume only fails itself
+        # and costs O(log batch_size) extra calls rather than one call per resume
+        try:
+            return self.score_batch(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch[0][0], e)
+                return []
+            middle = len(batch) // 2
+            return self._score_split(batch[:middle]) + self._score_split(batch[middle:])
+
+    def _fail(self, pdf_path, error):
+        with self._counter_lock:
+            self.failed += 1
+        self.events.put(('error', pdf_path, str(error)))
+        self._report_progress()
+
+    def _report_progress(self):
+        processed = self.succeeded + self.failed
+        elapsed = time.perf_counter() - self._start_time
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - processed
+        eta = remaining / rate if rate > 0 else None
+        self.events.put(('progress', processed, self.total, rate, eta))
@@ -0,0 +1,165 @@
+import re
+import threading
+import time
+
+import numpy as np
+
+from section_extractor import KeywordSectionExtractor
+
+
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?;])\s+|\n+')
+
+# Lines longer than this are content, not section headers
+MAX_HEADER_LENGTH = 60
+
+
+class ChunkedEncoder:
+    """
+    Encode long texts without truncating them at the model's sequence limit.
+
+    Each text is split on section headers, then on sentence and line breaks,
+    and the pieces are packed greedily into chunks of at most `max_tokens`
+    tokens; a chunk never spans two sections. Chunks from every text in a call
+    are sorted by token length and encoded in batches of similar lengths, so
+    little compute goes to padding. Each text's vector is the token-weighted
+    mean of its normalized chunk vectors.
+
+    The encoder stands in for the SentenceTransformer (encode() takes the same
+    arguments), so it can sit behind the embedding cache. `models` is anything
+    with get_model(), such as a ModelLoader.
+    """
+
+    def __init__(self, models, max_tokens=None):
+        self.models = models
+        self.max_tokens = max_tokens
+        self.tokens = 0
+        self.chunks = 0
+        self.seconds = 0.0
+
+        self._extractor = KeywordSectionExtractor()
+        self._lock = threading.Lock()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'tokens': self.tokens,
+                'chunks': self.chunks,
+                'seconds': self.seconds,
+                'tokens_per_sec': self.tokens / self.seconds if self.seconds else 0.0,
+            }
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        model = self.models.get_model()
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        budget = self._budget(model)
+        chunk_texts = []
+        chunk_lengths = []
+        chunk_docs = []
+        for doc, text in enumerate(texts):
+            for chunk, length in self.split(text, model.tokenizer, budget):
+                chunk_texts.append(chunk)
+                chunk_lengths.append(length)
+                chunk_docs.append(doc)
+
+        started = time.perf_counter()
+
+        # Longest first, so every batch holds chunks of about the same length
+        order = np.argsort(chunk_lengths, kind='stable')[::-1]
+        embeddings = np.zeros((len(chunk_texts), model.get_sentence_embedding_dimension()), dtype=np.float32)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            embeddings[batch] = model.encode([chunk_texts[i] for i in batch], batch_size=len(batch),
+                                             convert_to_numpy=True)
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.tokens += sum(chunk_lengths)
+            self.chunks += len(chunk_texts)
+            self.seconds += elapsed
+
+        # Token-weighted mean of normalized chunk vectors per document
+        embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        weights = np.asarray(chunk_lengths, dtype=np.float32)[:, None]
+        pooled = np.zeros((len(texts), embeddings.shape[1]), dtype=np.float32)
+        np.add.at(pooled, np.asarray(chunk_docs, dtype=np.int64), embeddings * weights)
+        pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+        return pooled[0] if single else pooled
+
+    def split(self, text, tokenizer, budget):
+        """Split a text into (chunk, token_count) pairs of at most `budget` tokens each."""
+        pieces = []
+        for section in self._sections(text):
+            pieces.extend(piece for piece in SENTENCE_PATTERN.split(section) if piece.strip())
+            pieces.append(None)  # section boundary
+        if not any(pieces):
+            return [(text, max(1, len(tokenizer.tokenize(text))))]
+
+        real = [piece for piece in pieces if piece is not None]
+        lengths = iter(len(ids) for ids in tokenizer(real, add_special_tokens=False)['input_ids'])
+
+        chunks = []
+        current = []
+        current_length = 0
+
+        def flush():
+            nonlocal current, current_length
+            if current:
+                chunks.append((' '.join(current), current_length))
+            current = []
+            current_length = 0
+
+        for piece in pieces:
+            if piece is None:
+                flush()
+                continue
+
+            length = next(lengths)
+            if length > budget:
+                # A single sentence over budget is cut into word windows
+                flush()
+                chunks.extend(self._split_words(piece, tokenizer, budget))
+                continue
+            if current_length + length > budget:
+                flush()
+            current.append(piece)
+            current_length += length
+
+        flush()
+        return chunks
+
+    def _sections(self, text):
+        sections = []
+        current = []
+        for line in text.split('\n'):
+            stripped = line.strip()
+            if (current and stripped and len(stripped) <= MAX_HEADER_LENGTH
+                    and self._extractor.classify_line(stripped.lower())):
+                sections.append('\n'.join(current))
+                current = []
+            current.append(line)
+        sections.append('\n'.join(current))
+        return sections
+
+    def _split_words(self, piece, tokenizer, budget):
+        words = piece.split()
+        lengths = [len(ids) for ids in tokenizer(words, add_special_tokens=False)['input_ids']]
+        chunks = []
+        start = 0
+        while start < len(words):
+            end = start
+            total = 0
+            while end < len(words) and (end == start or total + lengths[end] <= budget):
+                total += lengths[end]
+                end += 1
+            chunks.append((' '.join(words[start:end]), total))
+            start = end
+        return chunks
+
+    def _budget(self, model):
+        # Leave room for the [CLS]/[SEP] style special tokens
+        limit = (model.max_seq_length or 512) - 2
+        return min(self.max_tokens, limit) if self.max_tokens else limit
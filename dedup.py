@@ -0,0 +1,195 @@
+import hashlib
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+
+WORD_PATTERN = re.compile(r'\w+')
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def text_hash(text):
+    """Hash of a text's words, so whitespace and case differences from PDF extraction don't matter."""
+    return hashlib.sha256(' '.join(WORD_PATTERN.findall(text.lower())).encode('utf-8')).hexdigest()
+
+
+class DuplicateIndex:
+    """
+    Exact and near-duplicate lookup for resume texts.
+
+    Exact duplicates are found by a hash of the text's words. Near duplicates
+    use MinHash signatures over word shingles with LSH banding: each signature
+    is cut into `bands` bands, resumes sharing any band are candidates, and a
+    candidate is a duplicate when its estimated Jaccard similarity (the share
+    of equal signature values) reaches `threshold`. Adding a resume appends
+    its signature and band keys, so the index is updated in place.
+
+    Texts with fewer than `min_words` words, such as scanned PDFs with no text
+    layer, are neither added nor looked up: they would all hash alike and be
+    linked to whichever one came first.
+
+    `dirty` is set by every add and cleared by save().
+    """
+
+    def __init__(self, num_perm=128, bands=16, shingle_size=5, threshold=0.8, seed=1, min_words=20):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.seed = seed
+        self.min_words = min_words
+
+        # Fixed seed, so signatures stay comparable across runs
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self.doc_ids = []  # row -> doc_id, including replaced rows
+        self._row_of = {}  # live doc_id -> row
+        self._text_hashes = []
+        self._row_of_hash = {}
+        self._signatures = np.zeros((1024, num_perm), dtype=np.uint32)
+        self._buckets = None  # built on first lookup
+        self.dirty = False
+
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._row_of
+
+    def indexable(self, text):
+        """Whether `text` has enough words to be compared with other resumes."""
+        return len(WORD_PATTERN.findall(text)) >= self.min_words
+
+    def signature(self, text):
+        """MinHash signature of the text's word shingles."""
+        words = WORD_PATTERN.findall(text.lower())
+        k = self.shingle_size
+        shingles = {' '.join(words[i:i + k]) for i in range(max(len(words) - k + 1, 1))}
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        values = (hashes[:, None] * self._a + self._b) % MERSENNE_PRIME
+        return (values.min(axis=0) & 0xffffffff).astype(np.uint32)
+
+    def find(self, text):
+        """
+        Return (doc_id, similarity) of the closest stored duplicate of `text`,
+        with similarity 1.0 for an exact duplicate, or None.
+        """
+        if not self.indexable(text):
+            return None
+        key = text_hash(text)
+        signature = self.signature(text)
+        with self._lock:
+            row = self._row_of_hash.get(key)
+            if row is not None and self._live(row):
+                return self.doc_ids[row], 1.0
+
+            self._ensure_buckets()
+            rows = set()
+            for band_key in self._band_keys(signature):
+                rows.update(self._buckets.get(band_key, ()))
+
+            best = None
+            for row in rows:
+                if not self._live(row):
+                    continue
+                similarity = float(np.mean(self._signatures[row] == signature))
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (self.doc_ids[row], similarity)
+            return best
+
+    def add(self, doc_id, text):
+        """Add (or replace) one resume; returns False if the text is too short to index."""
+        if not self.indexable(text):
+            with self._lock:
+                # A replaced resume's old text must not match anything any more
+                if self._row_of.pop(doc_id, None) is not None:
+                    self.dirty = True
+            return False
+        key = text_hash(text)
+        signature = self.signature(text)
+        with self._lock:
+            row = len(self.doc_ids)
+            if row == len(self._signatures):
+                grown = np.zeros((2 * row, self.num_perm), dtype=np.uint32)
+                grown[:row] = self._signatures
+                self._signatures = grown
+            self._signatures[row] = signature
+            self.doc_ids.append(doc_id)
+            self._text_hashes.append(key)
+            self._row_of[doc_id] = row
+            self._row_of_hash[key] = row
+            if self._buckets is not None:
+                for band_key in self._band_keys(signature):
+                    self._buckets.setdefault(band_key, []).append(row)
+            self.dirty = True
+        return True
+
+    def save(self, path):
+        """Write the index to an .npz file atomically."""
+        with self._lock:
+            n_rows = len(self.doc_ids)
+            live = np.zeros(n_rows, dtype=bool)
+            live[list(self._row_of.values())] = True
+            state = {
+                'params': np.array([self.num_perm, self.bands, self.shingle_size, self.seed]),
+                'doc_ids': np.array(self.doc_ids, dtype=str),
+                'live': live,
+                'text_hashes': np.array(self._text_hashes, dtype=str),
+                'signatures': self._signatures[:n_rows],
+            }
+
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **state)
+            os.replace(tmp_path, path)
+            self.dirty = False
+
+    @classmethod
+    def load(cls, path, threshold=0.8, min_words=20):
+        with np.load(path) as state:
+            num_perm, bands, shingle_size, seed = state['params'].tolist()
+            index = cls(num_perm, bands, shingle_size, threshold, seed, min_words)
+            index.doc_ids = state['doc_ids'].tolist()
+            index._text_hashes = state['text_hashes'].tolist()
+            live = state['live']
+            index._row_of = {doc_id: row for row, doc_id in enumerate(index.doc_ids) if live[row]}
+            index._row_of_hash = {key: row for row, key in enumerate(index._text_hashes) if live[row]}
+            signatures = state['signatures']
+            index._signatures = np.zeros((max(1024, 2 * len(signatures)), num_perm), dtype=np.uint32)
+            index._signatures[:len(signatures)] = signatures
+        return index
+
+    @classmethod
+    def load_or_create(cls, path, threshold=0.8, min_words=20):
+        if os.path.exists(path):
+            try:
+                return cls.load(path, threshold, min_words)
+            except Exception as e:
+                print(f"Error loading duplicate index, starting a new one: {e}")
+        return cls(threshold=threshold, min_words=min_words)
+
+    def _live(self, row):
+        return self._row_of.get(self.doc_ids[row]) == row
+
+    def _band_keys(self, signature):
+        rows = self.num_perm // self.bands
+        return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def _ensure_buckets(self):
+        if self._buckets is not None:
+            return
+        self._buckets = {}
+        for row in self._row_of.values():
+            for band_key in self._band_keys(self._signatures[row]):
+                self._buckets.setdefault(band_key, []).append(row)
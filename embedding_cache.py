@@ -0,0 +1,228 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache for sentence-transformer embeddings.
+
+    Embeddings are keyed by a SHA-256 hash of (model name, text) and kept in a
+    small in-memory LRU in front of an on-disk store of .npy files. The disk
+    store is bounded by size; the least recently used files are evicted first.
+
+    The directory is walked once, on a background thread, into an index of
+    every file's size in least-recently-used order; after that, stores, hits
+    and evictions only update the index. Eviction waits for the walk.
+    """
+
+    def __init__(self, model, model_name, cache_dir='embedding_cache',
+                 max_memory_items=4096, max_disk_bytes=512 * 1024 * 1024):
+        self.model = model
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+
+        # Hit/miss counters so we can confirm the cache is doing its job
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory = OrderedDict()
+        # Scoring can run on background threads, so one encode at a time
+        self._lock = threading.RLock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._files = OrderedDict()  # path -> size, least recently used first
+        self._disk_bytes = 0
+        self.scanned = threading.Event()
+        threading.Thread(target=self._scan, daemon=True).start()
+
+    def encode(self, texts, batch_size=32):
+        """
+        Encode a text or a list of texts, only running the model on cache misses.
+        Returns a numpy array shaped like model.encode(..., convert_to_numpy=True).
+        """
+        with self._lock:
+            return self._encode(texts, batch_size)
+
+    def _encode(self, texts, batch_size):
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        results = [None] * len(texts)
+        missing = OrderedDict()  # key -> indices of texts needing that embedding
+
+        for i, text in enumerate(texts):
+            key = self._key(text)
+            if key in missing:
+                missing[key].append(i)
+                continue
+
+            embedding = self._lookup(key)
+            if embedding is None:
+                missing[key] = [i]
+            else:
+                results[i] = embedding
+
+        if missing:
+            # Length-sort the misses so each batch pads to similar lengths
+            keys = sorted(missing, key=lambda key: len(texts[missing[key][0]]), reverse=True)
+            miss_texts = [texts[missing[key][0]] for key in keys]
+            embeddings = self.model.encode(miss_texts, batch_size=batch_size, convert_to_numpy=True)
+            self.misses += len(keys)
+
+            for key, embedding in zip(keys, embeddings):
+                embedding = np.asarray(embedding, dtype=np.float32)
+                self._store(key, embedding)
+                for i in missing[key]:
+                    results[i] = embedding
+
+        if single:
+            return results[0]
+        if not results:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(results)
+
+    def stats(self):
+        """Return the hit/miss counters and current cache sizes."""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'memory_items': len(self._memory),
+            'disk_bytes': self._disk_bytes,
+        }
+
+    def clear(self):
+        """Drop every cached embedding from memory and disk."""
+        self.scanned.wait()
+        with self._lock:
+            self._memory.clear()
+            for path, _, _ in self._disk_entries():
+                self._remove_file(path)
+            self._files.clear()
+            self._disk_bytes = 0
+
+    def _key(self, text):
+        digest = hashlib.sha256()
+        digest.update(self.model_name.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npy")
+
+    def _lookup(self, key):
+        # In-memory LRU first
+        embedding = self._memory.get(key)
+        if embedding is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return embedding
+
+        # Then the on-disk store
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            embedding = np.load(path)
+        except (OSError, ValueError):
+            # Corrupt or partially written entry, drop it and recompute
+            self._remove_file(path)
+            return None
+
+        # Touch the file so eviction treats it as recently used, here and in the next process
+        try:
+            os.utime(path)
+            if path in self._files:
+                self._files.move_to_end(path)
+            else:
+                self._track(path, os.path.getsize(path))
+        except OSError:
+            pass
+
+        self.disk_hits += 1
+        self._remember(key, embedding)
+        return embedding
+
+    def _store(self, key, embedding):
+        self._remember(key, embedding)
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.save(f, embedding)
+            os.replace(tmp_path, path)
+            self._track(path, os.path.getsize(path))
+        except OSError as e:
+            print(f"Error writing embedding cache entry: {e}")
+            self._remove_file(tmp_path)
+            return
+
+        if self.scanned.is_set() and self._disk_bytes > self.max_disk_bytes:
+            self._evict()
+
+    def _remember(self, key, embedding):
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _track(self, path, size):
+        # An entry written again (here or by another process) is replaced, not added to the total
+        self._disk_bytes += size - self._files.pop(path, 0)
+        self._files[path] = size
+
+    def _scan(self):
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[1])
+        with self._lock:
+            # Files stored or read while the walk ran are the most recently used
+            recent = self._files
+            self._files = OrderedDict((path, size) for path, _, size in entries if path not in recent)
+            self._files.update(recent)
+            self._disk_bytes = sum(self._files.values())
+            self.scanned.set()
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used files until the store is back under 90% of its limit."""
+        target = int(self.max_disk_bytes * 0.9)
+        while self._disk_bytes > target and self._files:
+            # A file another process already evicted is gone either way
+            path, size = self._files.popitem(last=False)
+            self._remove_file(path)
+            self._disk_bytes -= size
+
+    def _disk_entries(self):
+        """Yield (path, mtime, size) for every embedding stored on disk."""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.npy'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_mtime, stat.st_size
+
+    def _remove_file(self, path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,254 @@
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+
+class EmbeddingStore:
+    """
+    Per-candidate embedding matrices: one row per candidate for the full resume
+    text and one row per candidate for each section type, with a mask saying
+    which candidates actually have that section. Rows are L2-normalized so
+    cosine similarity against a pool is a single matrix product.
+
+    The matrices are memory-mapped float32 files in the `path` directory:
+
+        meta.json               dim, section types and model tag
+        ids.txt                 row -> doc_id, one line per row, append-only
+        full.f32                (capacity, dim) full-text embeddings
+        section_<type>.f32      (capacity, dim) section embeddings
+        mask_<type>.u8          (capacity,) section present flags
+
+    Opening the store only reads ids.txt; the vectors are never deserialized,
+    and scoring reads straight from the mapped pages, which the OS shares
+    between every process that maps the same files (pass readonly=True from
+    readers). New candidates are appended, and a re-added candidate is
+    overwritten in place, so row numbers never change. A row only becomes
+    visible once its id line is written, which happens after its vectors are
+    written. A read-only store picks up the rows another process appends by
+    re-reading ids.txt whenever it has grown.
+
+    `model` tags the vectors with the model and precision that produced them;
+    opening a store written by a different model fails rather than mixing them.
+    """
+
+    def __init__(self, path, section_types, readonly=False, model=None):
+        self.path = path
+        self.section_types = list(section_types)
+        self.model = model
+        self.readonly = readonly
+        self.dim = None
+        self.doc_ids = []
+
+        self._row_of = {}
+        self._capacity = 0
+        self._full = None
+        self._sections = {}
+        self._masks = {}
+        self._ids_file = None
+        self._ids_size = 0    # bytes of ids.txt read so far
+        self._lock = threading.RLock()
+
+        if not readonly:
+            os.makedirs(path, exist_ok=True)
+        if os.path.exists(self._file('meta.json')):
+            self._open()
+
+    def __len__(self):
+        self.refresh()
+        return len(self.doc_ids)
+
+    def __contains__(self, doc_id):
+        if doc_id not in self._row_of:
+            self.refresh()
+        return doc_id in self._row_of
+
+    def add(self, doc_id, full_embedding, section_embeddings):
+        """
+        Store (or overwrite) a candidate's full-text embedding and any of its section embeddings.
+        """
+        if self.readonly:
+            raise ValueError("Embedding store was opened read-only")
+
+        with self._lock:
+            full_embedding = self._normalize(full_embedding)
+            if self.dim is None:
+                self._create(len(full_embedding))
+
+            row = self._row_of.get(doc_id)
+            is_new = row is None
+            if is_new:
+                row = len(self.doc_ids)
+                self._reserve(row + 1)
+
+            self._full[row] = full_embedding
+            for section in self.section_types:
+                embedding = section_embeddings.get(section)
+                if embedding is None:
+                    self._sections[section][row] = 0.0
+                    self._masks[section][row] = False
+                else:
+                    self._sections[section][row] = self._normalize(embedding)
+                    self._masks[section][row] = True
+
+            if is_new:
+                # The id line is the commit record for the row
+                self._ids_file.write(doc_id + '\n')
+                self._ids_file.flush()
+                self.doc_ids.append(doc_id)
+                self._row_of[doc_id] = row
+            return row
+
+    def rows(self, doc_ids):
+        return np.fromiter((self._row_of[doc_id] for doc_id in doc_ids), dtype=np.int64, count=len(doc_ids))
+
+    def full_matrix(self):
+        """(N, dim) normalized full-text embeddings, a view onto the mapped file."""
+        self.refresh()
+        with self._lock:
+            if self._full is None:
+                return np.zeros((0, self.dim or 0), dtype=np.float32)
+            return self._full[:len(self.doc_ids)]
+
+    def section_matrix(self, section):
+        """(N, dim) normalized section embeddings and the (N,) mask of candidates that have the section."""
+        self.refresh()
+        with self._lock:
+            if self._full is None:
+                return np.zeros((0, self.dim or 0), dtype=np.float32), np.zeros(0, dtype=bool)
+            n_rows = len(self.doc_ids)
+            return self._sections[section][:n_rows], self._masks[section][:n_rows]
+
+    def flush(self):
+        """Write dirty pages back to disk."""
+        with self._lock:
+            if self._full is None or self.readonly:
+                return
+            self._full.flush()
+            for section in self.section_types:
+                self._sections[section].flush()
+                self._masks[section].flush()
+
+    def refresh(self):
+        """In a read-only store, pick up the candidates the writer has committed since the last look."""
+        if not self.readonly:
+            return
+        with self._lock:
+            if self.dim is None:
+                if os.path.exists(self._file('meta.json')) and os.path.exists(self._file('ids.txt')):
+                    self._open()
+                return
+            size = os.path.getsize(self._file('ids.txt'))
+            if size <= self._ids_size:
+                return
+            with open(self._file('ids.txt'), 'rb') as f:
+                f.seek(self._ids_size)
+                data = f.read(size - self._ids_size)
+            # Only whole lines are committed
+            end = data.rfind(b'\n') + 1
+            if not end:
+                return
+            new_ids = data[:end].decode('utf-8').split('\n')[:-1]
+
+            n_rows = len(self.doc_ids) + len(new_ids)
+            if n_rows > self._capacity:
+                row_bytes = self.dim * np.dtype(np.float32).itemsize
+                self._map(os.path.getsize(self._file('full.f32')) // row_bytes)
+            for doc_id in new_ids:
+                self._row_of[doc_id] = len(self.doc_ids)
+                self.doc_ids.append(doc_id)
+            self._ids_size += end
+
+    @classmethod
+    def open_or_create(cls, path, section_types, model=None):
+        """
+        Open the store at `path`, starting a new one if the stored section types
+        or model differ.
+        """
+        try:
+            return cls(path, section_types, model=model)
+        except Exception as e:
+            print(f"Error opening embedding store, moving it to {path}.old and starting a new one: {e}")
+            shutil.rmtree(f"{path}.old", ignore_errors=True)
+            os.replace(path, f"{path}.old")
+            return cls(path, section_types, model=model)
+
+    def _open(self):
+        with open(self._file('meta.json'), 'r') as f:
+            meta = json.load(f)
+        if meta['section_types'] != self.section_types:
+            raise ValueError(f"stored section types {meta['section_types']} differ from {self.section_types}")
+        # Stores from before model tags were always fp32 from the default model
+        stored_model = meta.get('model')
+        if self.model is not None and stored_model is not None and stored_model != self.model:
+            raise ValueError(f"stored embeddings come from {stored_model}, not {self.model}")
+        self.dim = meta['dim']
+
+        # A line without its newline was cut off mid-write and never committed
+        with open(self._file('ids.txt'), 'r', encoding='utf-8') as f:
+            lines = f.read().split('\n')
+        self.doc_ids = lines[:-1]
+        self._ids_size = len('\n'.join(self.doc_ids).encode('utf-8')) + (1 if self.doc_ids else 0)
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self.doc_ids)}
+
+        row_bytes = self.dim * np.dtype(np.float32).itemsize
+        self._map(os.path.getsize(self._file('full.f32')) // row_bytes)
+        if not self.readonly:
+            self._open_ids()
+
+    def _create(self, dim):
+        self.dim = dim
+        with open(self._file('meta.json'), 'w') as f:
+            json.dump({'dim': dim, 'section_types': self.section_types, 'model': self.model}, f)
+        open(self._file('ids.txt'), 'w').close()
+        self._map(256)
+        self._open_ids()
+
+    def _open_ids(self):
+        # Drop any uncommitted partial line before appending after it
+        with open(self._file('ids.txt'), 'r+', encoding='utf-8', newline='\n') as f:
+            f.truncate(len('\n'.join(self.doc_ids).encode('utf-8')) + (1 if self.doc_ids else 0))
+        self._ids_file = open(self._file('ids.txt'), 'a', encoding='utf-8', newline='\n')
+
+    def _map(self, capacity):
+        # Mapping in r+ mode extends a file that is shorter than the requested shape
+        mode = 'r' if self.readonly else 'r+'
+        if not self.readonly:
+            for name in self._data_files():
+                if not os.path.exists(self._file(name)):
+                    open(self._file(name), 'wb').close()
+
+        self._capacity = capacity
+        self._full = self._memmap('full.f32', np.float32, (capacity, self.dim), mode)
+        for section in self.section_types:
+            self._sections[section] = self._memmap(f'section_{section}.f32', np.float32, (capacity, self.dim), mode)
+            self._masks[section] = self._memmap(f'mask_{section}.u8', np.bool_, (capacity,), mode)
+
+    def _memmap(self, name, dtype, shape, mode):
+        if shape[0] == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self._file(name), dtype=dtype, mode=mode, shape=shape)
+
+    def _reserve(self, n_rows):
+        # Grow the files geometrically so appends are amortized O(1); old views stay valid
+        if n_rows <= self._capacity:
+            return
+        self.flush()
+        self._map(max(n_rows, self._capacity * 2, 256))
+
+    def _data_files(self):
+        names = ['full.f32']
+        for section in self.section_types:
+            names += [f'section_{section}.f32', f'mask_{section}.u8']
+        return names
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    @staticmethod
+    def _normalize(embedding):
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
@@ -0,0 +1,135 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class StageTracer:
+    """
+    Lightweight timing for the hot path.
+
+        with tracer.stage('encode', timings):
+            ...
+
+    Each stage's duration goes into a rolling window per stage name (for the
+    Diagnostics tab's histograms), into a bounded list of trace events that
+    can be exported in Chrome trace format (chrome://tracing or Perfetto), and,
+    when a `timings` dict is passed, into that dict in milliseconds so it can
+    be stored with a candidate record. The overhead is two perf_counter calls
+    and a couple of deque appends per stage.
+    """
+
+    def __init__(self, window=1000, max_events=20000):
+        self.window = window
+        self._durations = {}
+        self._events = deque(maxlen=max_events)
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name, timings=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.record(name, start, end)
+            if timings is not None:
+                timings[name] = timings.get(name, 0.0) + (end - start) * 1000
+
+    def record(self, name, start, end):
+        with self._lock:
+            durations = self._durations.get(name)
+            if durations is None:
+                durations = self._durations[name] = deque(maxlen=self.window)
+            durations.append(end - start)
+            self._events.append((name, start, end, threading.get_ident()))
+
+    def stage_names(self):
+        with self._lock:
+            return sorted(self._durations)
+
+    def durations(self, name):
+        """Recent durations of a stage in seconds, oldest first."""
+        with self._lock:
+            return list(self._durations.get(name, ()))
+
+    def summary(self):
+        """Per stage: count, p50, p95 and max in milliseconds over the rolling window."""
+        summary = {}
+        for name in self.stage_names():
+            values = np.array(self.durations(name)) * 1000
+            summary[name] = {
+                'count': len(values),
+                'p50_ms': float(np.percentile(values, 50)),
+                'p95_ms': float(np.percentile(values, 95)),
+                'max_ms': float(values.max()),
+            }
+        return summary
+
+    def export_trace(self, path):
+        """Write the recorded stages as a Chrome trace file and return the number of events."""
+        with self._lock:
+            events = list(self._events)
+        pid = os.getpid()
+        trace = {
+            'traceEvents': [
+                {
+                    'name': name,
+                    'ph': 'X',
+                    'ts': (start - self._origin) * 1e6,
+                    'dur': (end - start) * 1e6,
+                    'pid': pid,
+                    'tid': tid,
+                }
+                for name, start, end, tid in events
+            ],
+            'displayTimeUnit': 'ms',
+        }
+        with open(path, 'w') as f:
+            json.dump(trace, f)
+        return len(events)
+
+
+# Shared by the engine and the GUI
+tracer = StageTracer()
+
+
+def process_rss():
+    """Resident set size of this process in bytes, or None if it can't be read."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
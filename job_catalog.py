@@ -0,0 +1,378 @@
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from job_matching import job_title
+
+
+TOKEN_PATTERN = re.compile(r'\w+')
+SEPARATOR_PATTERN = re.compile(r'[\s,]*')
+
+# A compaction lock older than this was left by a process that died mid-compaction
+STALE_LOCK_SECONDS = 300
+
+
+def read_jobs_file(path):
+    # Load job descriptions with UTF-8 encoding
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except UnicodeDecodeError:
+        with open(path, 'r', encoding='latin-1') as f:
+            return json.load(f)
+
+
+class JobCatalog:
+    """
+    The jobs in normalized_jobs.json, indexed by title and loaded one at a time.
+
+    The first open scans the jobs file once for each job's byte range and
+    title. That index is saved to `index_path` and reused until the jobs file
+    changes, so later opens don't parse any job. A job body is parsed from its
+    byte range the first time it's asked for, and the most recent
+    `cache_size` bodies are kept.
+
+    Saving a job appends one line to `edits_path` instead of rewriting the
+    jobs file. Each line records the catalog position it applies to, so an
+    edited job replaces the job at that position (titles need not be unique)
+    and a new job is added after the others. compact() folds the edits back
+    into the jobs file; opening the catalog runs it when the log is past
+    `compact_bytes`, so saving a job never pays for a rewrite.
+
+    Another process may save to the same files, so the catalog reloads
+    whenever the jobs file or the edit log changes size or mtime. compact()
+    holds a lock file and moves the log aside before reading it, so a save
+    from another process during a compaction lands in a fresh log.
+
+    search() is the type-ahead filter: every word of the query must be the
+    start of some word in the title.
+    """
+
+    def __init__(self, path, index_path='job_index.json', edits_path='job_edits.jsonl', cache_size=256,
+                 compact_bytes=1024 * 1024):
+        self.path = path
+        self.index_path = index_path
+        self.edits_path = edits_path
+        self.cache_size = cache_size
+        self.compact_bytes = compact_bytes
+
+        self._loaded = False
+        self._files = None    # (jobs file, edit log) (size, mtime) as of the last load
+        self._entries = []    # (source, byte offset, byte length) per job; source is 'jobs' or 'edits'
+        self._titles = []
+        self._positions = {}  # title -> position of its first job
+        self._tokens = []     # sorted (title word, position)
+        self._encoding = 'utf-8'
+        self._cache = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._entries)
+
+    def titles(self):
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._titles)
+
+    def get(self, position):
+        """The job at `position`, parsed on first use."""
+        with self._lock:
+            self._ensure_loaded()
+            job = self._cache.get(position)
+            if job is not None:
+                self._cache.move_to_end(position)
+                return job
+
+            source, offset, length = self._entries[position]
+            path, encoding = (self.path, self._encoding) if source == 'jobs' else (self.edits_path, 'utf-8')
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                job = json.loads(f.read(length).decode(encoding))
+            if source == 'edits':
+                job = job['job']
+
+            self._cache[position] = job
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return job
+
+    def find(self, title):
+        """The job with this title, or None."""
+        with self._lock:
+            self._ensure_loaded()
+            position = self._positions.get(title)
+        return None if position is None else self.get(position)
+
+    def jobs(self):
+        """Every job, in catalog order, for scoring all of them at once."""
+        with self._lock:
+            self._ensure_loaded()
+            edited = [position for position, (source, _, _) in enumerate(self._entries) if source == 'edits']
+            if not edited:
+                return read_jobs_file(self.path)
+
+            jobs = read_jobs_file(self.path)
+            for position in edited:
+                if position < len(jobs):
+                    jobs[position] = self.get(position)
+                else:
+                    jobs.append(self.get(position))
+            return jobs
+
+    def search(self, query):
+        """Positions of the jobs whose titles match every word of `query`, in catalog order."""
+        words = TOKEN_PATTERN.findall(query.lower())
+        with self._lock:
+            self._ensure_loaded()
+            if not words:
+                return list(range(len(self._entries)))
+
+            result = None
+            for word in words:
+                matches = set()
+                i = bisect.bisect_left(self._tokens, (word,))
+                while i < len(self._tokens) and self._tokens[i][0].startswith(word):
+                    matches.add(self._tokens[i][1])
+                    i += 1
+                result = matches if result is None else result & matches
+                if not result:
+                    return []
+            return sorted(result)
+
+    def save(self, job, position=None):
+        """
+        Store the job at `position`, or a new job after the others when position
+        is None, with a single append. Returns the job's position.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if position is not None and not 0 <= position < len(self._entries):
+                raise IndexError(f"No job at position {position}")
+
+            # New jobs are logged without a position so concurrent adds don't overwrite each other
+            line = json.dumps({'position': position, 'job': job}, ensure_ascii=False).encode('utf-8')
+            with open(self.edits_path, 'ab') as f:
+                f.write(line + b'\n')
+                f.flush()
+                end = f.tell()
+            offset = end - len(line) - 1
+            position = self._apply_edit(position, job, offset, len(line))
+            self._cache[position] = job
+
+            # Our line follows the last one we loaded unless another process saved in between
+            files = self._file_stats()
+            loaded_end = self._files[1][0] if self._files[1] else 0
+            if loaded_end == offset and files[1] and files[1][0] == end:
+                self._files = files
+            else:
+                self._loaded = False
+            return position
+
+    def compact(self):
+        """
+        Rewrite the jobs file with every edit applied and start a fresh edit log.
+        Does nothing while another process is compacting.
+        """
+        with self._lock:
+            folding_path = f"{self.edits_path}.compacting"
+            if not os.path.exists(self.edits_path) and not os.path.exists(folding_path):
+                return
+            lock_path = f"{self.edits_path}.lock"
+            if not self._acquire_file_lock(lock_path):
+                return
+            try:
+                # A log left aside by a compaction that died is older than the current one
+                jobs = read_jobs_file(self.path)
+                if os.path.exists(folding_path):
+                    self._fold_edits(jobs, folding_path)
+                if os.path.exists(self.edits_path):
+                    os.replace(self.edits_path, folding_path)
+                    self._fold_edits(jobs, folding_path)
+
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(jobs, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+                os.remove(folding_path)
+            finally:
+                os.remove(lock_path)
+            self._loaded = False
+            self._cache.clear()
+
+    @staticmethod
+    def _acquire_file_lock(lock_path):
+        for _ in range(2):
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) < STALE_LOCK_SECONDS:
+                        return False
+                    os.remove(lock_path)
+                except FileNotFoundError:
+                    pass
+        return False
+
+    @staticmethod
+    def _fold_edits(jobs, edits_path):
+        with open(edits_path, 'rb') as f:
+            for line in f:
+                try:
+                    edit = json.loads(line.decode('utf-8'))
+                    position, job = edit['position'], edit['job']
+                except (ValueError, KeyError):
+                    # Blank, or a save cut short by a crash
+                    continue
+                if position is None or position >= len(jobs):
+                    jobs.append(job)
+                else:
+                    jobs[position] = job
+
+    def _file_stats(self):
+        stats = []
+        for path in (self.path, self.edits_path):
+            try:
+                stat = os.stat(path)
+                stats.append((stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                stats.append(None)
+        return tuple(stats)
+
+    def _ensure_loaded(self):
+        if self._files is None:
+            # First open: fold a large or half-compacted log back in now rather than in the middle of a save
+            edits = self._file_stats()[1]
+            if (edits and edits[0] > self.compact_bytes) or os.path.exists(f"{self.edits_path}.compacting"):
+                try:
+                    self.compact()
+                except OSError as e:
+                    print(f"Error compacting {self.edits_path}: {e}")
+
+        files = self._file_stats()
+        if self._loaded and files == self._files:
+            return
+
+        self._loaded = False
+        self._entries = []
+        self._titles = []
+        self._positions = {}
+        self._tokens = []
+        self._cache.clear()
+
+        stat = os.stat(self.path)
+        signature = [os.path.abspath(self.path), stat.st_size, stat.st_mtime_ns]
+        index = None
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('signature') != signature:
+                index = None
+        except (OSError, ValueError):
+            pass
+        if index is None:
+            index = self._scan()
+            index['signature'] = signature
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self.index_path)
+
+        self._encoding = index['encoding']
+        for (offset, length), title in zip(index['entries'], index['titles']):
+            self._add_entry(('jobs', offset, length), title)
+
+        # Replay the edit log; each line is one saved job and its position
+        if os.path.exists(self.edits_path):
+            offset = 0
+            with open(self.edits_path, 'rb') as f:
+                for line in f:
+                    stripped = line.rstrip(b'\r\n')
+                    if stripped:
+                        try:
+                            edit = json.loads(stripped.decode('utf-8'))
+                            self._apply_edit(edit['position'], edit['job'], offset, len(stripped))
+                        except (ValueError, KeyError):
+                            # A save cut short by a crash; everything before it is intact
+                            print(f"Error reading job edit at byte {offset} of {self.edits_path}")
+                    offset += len(line)
+
+        self._tokens.sort()
+        self._files = files
+        self._loaded = True
+
+    def _scan(self):
+        # One pass over the file for each job's byte range; the job objects are thrown away
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        try:
+            text = data.decode('utf-8')
+            encoding = 'utf-8'
+        except UnicodeDecodeError:
+            text = data.decode('latin-1')
+            encoding = 'latin-1'
+
+        decoder = json.JSONDecoder()
+        entries = []
+        titles = []
+        position = text.index('[') + 1
+        byte_offset = len(text[:position].encode(encoding))
+        while True:
+            end = SEPARATOR_PATTERN.match(text, position).end()
+            byte_offset += end - position  # whitespace and commas are one byte each
+            position = end
+            if position >= len(text) or text[position] == ']':
+                break
+            job, end = decoder.raw_decode(text, position)
+            length = len(text[position:end].encode(encoding))
+            entries.append([byte_offset, length])
+            titles.append(job_title(job))
+            byte_offset += length
+            position = end
+
+        return {'encoding': encoding, 'entries': entries, 'titles': titles}
+
+    def _add_entry(self, entry, title):
+        position = len(self._entries)
+        self._entries.append(entry)
+        self._titles.append(title)
+        self._index_title(position, title)
+        return position
+
+    def _index_title(self, position, title):
+        if self._positions.get(title, position) >= position:
+            self._positions[title] = position
+        for word in set(TOKEN_PATTERN.findall(title.lower())):
+            if self._loaded:
+                bisect.insort(self._tokens, (word, position))
+            else:
+                self._tokens.append((word, position))
+
+    def _set_title(self, position, title):
+        old_title = self._titles[position]
+        if old_title == title:
+            return
+        self._titles[position] = title
+        self._tokens = [token for token in self._tokens if token[1] != position]
+        if self._positions.get(old_title) == position:
+            # Another job with the old title becomes the one find() returns
+            del self._positions[old_title]
+            others = [i for i, other in enumerate(self._titles) if other == old_title]
+            if others:
+                self._positions[old_title] = others[0]
+        self._index_title(position, title)
+
+    def _apply_edit(self, position, job, offset, length):
+        title = job_title(job)
+        if position is None or position >= len(self._entries):
+            return self._add_entry(('edits', offset, length), title)
+        self._entries[position] = ('edits', offset, length)
+        self._set_title(position, title)
+        self._cache.pop(position, None)
+        return position
@@ -0,0 +1,268 @@
+import hashlib
+import heapq
+import json
+
+import numpy as np
+
+
+# Resume section -> the job sections it is compared against, and its weight in the section score
+SECTION_COMPARISONS = {
+    'experience': {'job_sections': ['experience'], 'weight': 0.35},
+    'education': {'job_sections': ['education'], 'weight': 0.15},
+    'skills': {'job_sections': ['skills', 'requirements'], 'weight': 0.30},
+    'summary': {'job_sections': ['summary', 'description'], 'weight': 0.20},
+}
+
+# Weights of the three component scores in combined_score
+SCORE_WEIGHTS = {
+    'transformer': 0.4,
+    'tfidf': 0.3,
+    'section': 0.3,
+}
+
+# Sections written first in structured_text, in the order the notebook's parser uses
+STRUCTURED_SECTION_ORDER = ['summary', 'contact', 'experience', 'education', 'skills', 'projects',
+                            'certifications', 'achievements', 'languages', 'interests']
+
+
+def job_text(job):
+    """Full text of a job entry; jobs added in the GUI only have a description."""
+    return job.get('structured_text') or job.get('description', '')
+
+
+def job_title(job):
+    """Name of a job entry; jobs added in the GUI have a title instead of a file name."""
+    return job.get('file_name') or job.get('title', 'Untitled Job')
+
+
+def job_id(job):
+    """
+    The id scores are recorded against: the SHA-256 of the job's JSON. Titles
+    need not be unique, and an edited job is a different job to score against.
+    """
+    return hashlib.sha256(json.dumps(job, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def structured_text(sections):
+    """Non-empty sections wrapped in <SECTION> markers, priority sections first, as the parser writes them."""
+    order = STRUCTURED_SECTION_ORDER + [name for name in sections if name not in STRUCTURED_SECTION_ORDER]
+    parts = []
+    for name in order:
+        content = sections.get(name, '')
+        if content.strip():
+            parts.extend([f"<{name.upper()}>", content, f"</{name.upper()}>"])
+    return "\n".join(parts)
+
+
+def edit_job_sections(job, sections):
+    """
+    A copy of the job with `sections` merged into its own and its
+    structured_text rebuilt from them, so job_text() scores the edit.
+    A GUI-added job's description stays at the front of the text.
+    """
+    job = dict(job)
+    job['sections'] = dict(job.get('sections', {}), **sections)
+    parts = [job.get('description', ''), structured_text(job['sections'])]
+    job['structured_text'] = "\n".join(part for part in parts if part)
+    return job
+
+
+def job_section_texts(job, section_comparisons=SECTION_COMPARISONS):
+    """Map each resume section type to the joined text of the job sections it is compared against."""
+    job_sections = job.get('sections', {})
+    texts = {}
+    for section_type, config in section_comparisons.items():
+        parts = [job_sections[name] for name in config['job_sections'] if name in job_sections]
+        if parts:
+            texts[section_type] = " ".join(parts)
+    return texts
+
+
+def match_all_jobs(jobs, embedding_store, tfidf_engine, encode, top_k=50, best_jobs=5, doc_ids=None,
+                   chunk_size=8192, section_comparisons=SECTION_COMPARISONS, weights=SCORE_WEIGHTS):
+    """
+    Score every job against every stored candidate.
+
+    Transformer, TF-IDF and section scores are computed as (jobs x candidates)
+    matrix products over the stored embeddings and sparse TF-IDF rows, a chunk
+    of candidates at a time so memory stays bounded. `encode(texts)` must
+    return embeddings for the job texts (the embedding cache's encode works).
+    Pass `doc_ids` to score only a subset, e.g. candidates retrieved from the
+    ANN index.
+
+    Returns (job_rankings, candidate_best_jobs):
+        job_rankings[j] = [(doc_id, scores), ...] best first, top_k long
+        candidate_best_jobs[doc_id] = [(job_index, scores), ...] best first
+    where scores is a dict of combined/transformer/tfidf/section scores.
+    """
+    doc_ids = _scorable(embedding_store, tfidf_engine, doc_ids)
+    if not jobs or not doc_ids:
+        return [[] for _ in jobs], {}
+
+    scorer = _JobScorer(jobs, embedding_store, tfidf_engine, encode, section_comparisons, weights)
+    n_jobs = len(jobs)
+
+    # Running top-k per job as min-heaps of (combined, doc index)
+    heaps = [[] for _ in range(n_jobs)]
+    candidate_best_jobs = {}
+
+    for start in range(0, len(doc_ids), chunk_size):
+        chunk_ids = doc_ids[start:start + chunk_size]
+        combined, transformer, tfidf, section, _ = scorer.score(chunk_ids)
+        components = (combined, transformer, tfidf, section)
+
+        # Per-job top-k: partial sort inside the chunk, then merge into the running heap
+        k = min(top_k, len(chunk_ids))
+        candidates = np.argpartition(-combined, k - 1, axis=1)[:, :k]
+        for j in range(n_jobs):
+            heap = heaps[j]
+            for c in candidates[j]:
+                item = (float(combined[j, c]), start + int(c), _scores(components, j, c))
+                if len(heap) < top_k:
+                    heapq.heappush(heap, item)
+                elif item[0] > heap[0][0]:
+                    heapq.heapreplace(heap, item)
+
+        # Per-candidate best jobs: every job is in this chunk's columns already
+        m = min(best_jobs, n_jobs)
+        best = np.argpartition(-combined, m - 1, axis=0)[:m]
+        for c, doc_id in enumerate(chunk_ids):
+            order = best[:, c][np.argsort(-combined[best[:, c], c])]
+            candidate_best_jobs[doc_id] = [(int(j), _scores(components, j, c)) for j in order]
+
+    job_rankings = []
+    for heap in heaps:
+        ranked = sorted(heap, key=lambda item: item[0], reverse=True)
+        job_rankings.append([(doc_ids[index], scores) for _, index, scores in ranked])
+
+    return job_rankings, candidate_best_jobs
+
+
+def score_job(job, embedding_store, tfidf_engine, encode, doc_ids=None, chunk_size=8192,
+              section_comparisons=SECTION_COMPARISONS, weights=SCORE_WEIGHTS):
+    """
+    Score one job against every stored candidate (or `doc_ids`) with the same
+    matrix products as match_all_jobs, keeping every candidate's scores.
+
+    Returns (doc_ids, scores) where scores maps each of combined/transformer/
+    tfidf/section_score to an array aligned with doc_ids, and 'section_details'
+    maps each section type to (similarities, present) arrays.
+    """
+    doc_ids = _scorable(embedding_store, tfidf_engine, doc_ids)
+    names = ('combined_score', 'transformer_score', 'tfidf_score', 'section_score')
+    scores = {name: np.zeros(len(doc_ids), dtype=np.float32) for name in names}
+    scores['section_details'] = {
+        section_type: (np.zeros(len(doc_ids), dtype=np.float32), np.zeros(len(doc_ids), dtype=bool))
+        for section_type in section_comparisons
+    }
+    if not doc_ids:
+        return doc_ids, scores
+
+    scorer = _JobScorer([job], embedding_store, tfidf_engine, encode, section_comparisons, weights)
+    for start in range(0, len(doc_ids), chunk_size):
+        chunk_ids = doc_ids[start:start + chunk_size]
+        end = start + len(chunk_ids)
+        *components, sections = scorer.score(chunk_ids)
+        for name, values in zip(names, components):
+            scores[name][start:end] = values[0]
+        for section_type, (similarity, present) in sections.items():
+            scores['section_details'][section_type][0][start:end] = similarity[0]
+            scores['section_details'][section_type][1][start:end] = present[0]
+
+    return doc_ids, scores
+
+
+def _scorable(embedding_store, tfidf_engine, doc_ids=None):
+    if doc_ids is None:
+        doc_ids = embedding_store.doc_ids
+    return [doc_id for doc_id in doc_ids if doc_id in embedding_store and doc_id in tfidf_engine]
+
+
+class _JobScorer:
+    """
+    Job embeddings for a list of jobs, and the (jobs x candidates) component
+    scores for a chunk of stored candidates.
+    """
+
+    def __init__(self, jobs, embedding_store, tfidf_engine, encode, section_comparisons, weights):
+        self.embedding_store = embedding_store
+        self.tfidf_engine = tfidf_engine
+        self.section_comparisons = section_comparisons
+        self.weights = weights
+
+        # Encode every job text and job section text in one batch
+        texts = [job_text(job) for job in jobs]
+        section_texts = [job_section_texts(job, section_comparisons) for job in jobs]
+        section_slots = {}
+        for section_type in section_comparisons:
+            for j, job_sections in enumerate(section_texts):
+                if section_type in job_sections:
+                    section_slots[(section_type, j)] = len(texts)
+                    texts.append(job_sections[section_type])
+
+        embeddings = np.asarray(encode(texts), dtype=np.float32)
+        embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        n_jobs = len(jobs)
+        dim = embeddings.shape[1]
+
+        self.job_texts = texts[:n_jobs]
+        self.job_full = embeddings[:n_jobs]
+        self.job_section_matrices = {}
+        self.job_section_masks = {}
+        for section_type in section_comparisons:
+            matrix = np.zeros((n_jobs, dim), dtype=np.float32)
+            mask = np.zeros(n_jobs, dtype=bool)
+            for j in range(n_jobs):
+                slot = section_slots.get((section_type, j))
+                if slot is not None:
+                    matrix[j] = embeddings[slot]
+                    mask[j] = True
+            self.job_section_matrices[section_type] = matrix
+            self.job_section_masks[section_type] = mask
+
+        self.full_matrix = embedding_store.full_matrix()
+        self.store_sections = {section_type: embedding_store.section_matrix(section_type)
+                               for section_type in section_comparisons}
+
+    def score(self, chunk_ids):
+        """(combined, transformer, tfidf, section, {section_type: (similarity, present)}) for a chunk."""
+        rows = self.embedding_store.rows(chunk_ids)
+
+        # 1. Transformer scores: (jobs, chunk)
+        transformer = self.job_full @ self.full_matrix[rows].T
+
+        # 2. TF-IDF scores over the pool's statistics
+        tfidf = self.tfidf_engine.score_matrix(self.job_texts, chunk_ids).astype(np.float32)
+
+        # 3. Section scores: weighted mean over the sections both sides have
+        weighted = np.zeros_like(transformer)
+        total_weight = np.zeros_like(transformer)
+        sections = {}
+        for section_type, config in self.section_comparisons.items():
+            candidate_matrix, candidate_mask = self.store_sections[section_type]
+            present = np.outer(self.job_section_masks[section_type], candidate_mask[rows])
+            if not present.any():
+                continue
+            similarity = self.job_section_matrices[section_type] @ candidate_matrix[rows].T
+            weighted += np.where(present, similarity * config['weight'], 0.0)
+            total_weight += present * config['weight']
+            sections[section_type] = (similarity, present)
+
+        section = np.zeros_like(transformer)
+        np.divide(weighted, total_weight, out=section, where=total_weight > 0)
+
+        combined = (transformer * self.weights['transformer'] +
+                    tfidf * self.weights['tfidf'] +
+                    section * self.weights['section'])
+
+        return combined, transformer, tfidf, section, sections
+
+
+def _scores(components, j, c):
+    combined, transformer, tfidf, section = components
+    return {
+        'combined_score': float(combined[j, c]),
+        'transformer_score': float(transformer[j, c]),
+        'tfidf_score': float(tfidf[j, c]),
+        'section_score': float(section[j, c]),
+    }
@@ -0,0 +1,94 @@
+import threading
+import time
+
+from quantization import precision_tag, quantize_model
+
+
+class ModelLoader:
+    """
+    Load the sentence transformer and the spaCy pipeline on a background thread
+    so the window can appear before either model is ready. Pass
+    spacy_model=None to skip loading spaCy altogether.
+
+    The loader can stand in for the SentenceTransformer itself: encode() waits
+    for the model and then delegates to it, which lets the embedding cache
+    answer hits before the model has finished loading.
+
+    With quantize=True the transformer's Linear layers are dynamically
+    quantized to int8 after loading. `tag` names the model and precision, and
+    is what embeddings should be keyed by.
+    """
+
+    def __init__(self, model_name='all-mpnet-base-v2', spacy_model='en_core_web_lg', quantize=False):
+        self.model_name = model_name
+        self.spacy_model = spacy_model
+        self.quantize = quantize
+        self.tag = precision_tag(model_name, quantize)
+
+        self.model_load_time = None
+        self.nlp_load_time = None
+        self.error = None
+
+        self._model = None
+        self._nlp = None
+        self._model_ready = threading.Event()
+        self._nlp_ready = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load, daemon=True)
+            self._thread.start()
+
+    def is_ready(self):
+        return self._model_ready.is_set() and self._nlp_ready.is_set()
+
+    def get_model(self):
+        """Return the sentence transformer, blocking until it has loaded."""
+        self.start()
+        self._model_ready.wait()
+        if self._model is None:
+            raise RuntimeError(f"Failed to load {self.model_name}: {self.error}")
+        return self._model
+
+    def get_nlp(self):
+        """Return the spaCy pipeline, blocking until it has loaded."""
+        self.start()
+        self._nlp_ready.wait()
+        if self._nlp is None:
+            raise RuntimeError(f"Failed to load {self.spacy_model}: {self.error}")
+        return self._nlp
+
+    def encode(self, *args, **kwargs):
+        return self.get_model().encode(*args, **kwargs)
+
+    def _load(self):
+        # Heavy imports live here so they never run on the Tk thread
+        try:
+            start = time.perf_counter()
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(self.model_name)
+            if self.quantize:
+                model = quantize_model(model)
+            self._model = model
+            self.model_load_time = time.perf_counter() - start
+        except Exception as e:
+            self.error = e
+            print(f"Error loading {self.model_name}: {e}")
+        finally:
+            self._model_ready.set()
+
+        if self.spacy_model is None:
+            self._nlp_ready.set()
+            return
+
+        try:
+            start = time.perf_counter()
+            import spacy
+            self._nlp = spacy.load(self.spacy_model)
+            self.nlp_load_time = time.perf_counter() - start
+        except Exception as e:
+            self.error = e
+            print(f"Error loading {self.spacy_model}: {e}")
+        finally:
+            self._nlp_ready.set()
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-256 of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_pages(pdf_path, start, end):
+    """Text of pages [start, end) of a PDF, one string per page."""
+    import fitz
+
+    doc = fitz.open(pdf_path)
+    try:
+        return [doc[i].get_text() for i in range(start, end)]
+    finally:
+        doc.close()
+
+
+def read_pdf_text(pdf_path):
+    """Extract the text of every page of a PDF."""
+    import fitz
+
+    doc = fitz.open(pdf_path)
+    try:
+        return "".join(page.get_text() for page in doc)
+    finally:
+        doc.close()
+
+
+class TextCache:
+    """
+    Extracted PDF text on disk, keyed by the SHA-256 of the PDF's bytes, so a
+    renamed or re-added file is still a hit and an edited one is a miss.
+    Writes are atomic, so several processes can share the directory.
+    """
+
+    def __init__(self, cache_dir='text_cache'):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, text):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.txt")
+
+
+class PdfTextExtractor:
+    """
+    PDF text extraction with a content-hash cache in front of it.
+
+    A PDF that has been seen before is never opened again: only its bytes are
+    hashed. Documents with more than `pages_per_task` pages are split into
+    page ranges that run in a process pool, and the page texts are joined once
+    at the end.
+    """
+
+    def __init__(self, cache_dir='text_cache', max_workers=None, pages_per_task=16):
+        self.cache = TextCache(cache_dir)
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.pages_per_task = pages_per_task
+
+        self.hits = 0
+        self.misses = 0
+
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def extract(self, pdf_path):
+        key = file_hash(pdf_path)
+        text = self.cache.get(key)
+        if text is not None:
+            with self._lock:
+                self.hits += 1
+            return text
+
+        text = self._extract(pdf_path)
+        self.cache.put(key, text)
+        with self._lock:
+            self.misses += 1
+        return text
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0}
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _extract(self, pdf_path):
+        import fitz
+
+        with fitz.open(pdf_path) as doc:
+            page_count = doc.page_count
+            if page_count <= self.pages_per_task or self.max_workers < 2:
+                return "".join(page.get_text() for page in doc)
+
+        # Large document: page ranges in parallel, joined in order
+        ranges = [(start, min(start + self.pages_per_task, page_count))
+                  for start in range(0, page_count, self.pages_per_task)]
+        futures = [self._pool().submit(extract_pages, pdf_path, start, end) for start, end in ranges]
+        return "".join(page for future in futures for page in future.result())
+
+    def _pool(self):
+        # Created on first use so small documents never pay for starting processes
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
@@ -0,0 +1,145 @@
+"""
+Dynamic int8 quantization for the sentence transformer, and a check of what it
+costs in ranking quality.
+
+    python quantization.py resumes/ --jobs normalized_jobs.json --limit 200
+
+The check encodes the same resumes and jobs with the fp32 model and with its
+int8 copy, then reports the encode speedup, how close the two embeddings of
+each text are, and how well the per-job candidate rankings agree (Spearman
+correlation and top-10 overlap). By default only resumes that are already
+stored candidates are used.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+
+def quantize_model(model):
+    """Return a copy of a SentenceTransformer with its Linear layers quantized to int8."""
+    import torch
+
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def precision_tag(model_name, quantize):
+    """Name embeddings by model and precision so int8 and fp32 vectors never share a cache or store."""
+    return f"{model_name}-int8" if quantize else model_name
+
+
+def _rank_positions(scores):
+    positions = np.empty(len(scores))
+    positions[np.argsort(-scores)] = np.arange(len(scores))
+    return positions
+
+
+def compare_precisions(model, quantized_model, resume_texts, job_texts, batch_size=32, top_n=10):
+    """
+    Encode the resumes and jobs with both models and report speed and ranking agreement.
+    """
+    def encode(m, texts):
+        start = time.perf_counter()
+        embeddings = m.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        elapsed = time.perf_counter() - start
+        embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings, elapsed
+
+    # Warm both models up so the first call's setup isn't timed
+    model.encode(resume_texts[:1])
+    quantized_model.encode(resume_texts[:1])
+
+    fp32_resumes, fp32_seconds = encode(model, resume_texts)
+    int8_resumes, int8_seconds = encode(quantized_model, resume_texts)
+    fp32_jobs, _ = encode(model, job_texts)
+    int8_jobs, _ = encode(quantized_model, job_texts)
+
+    fp32_scores = fp32_jobs @ fp32_resumes.T
+    int8_scores = int8_jobs @ int8_resumes.T
+
+    spearman = []
+    overlap = []
+    n = min(top_n, len(resume_texts))
+    for fp32_row, int8_row in zip(fp32_scores, int8_scores):
+        spearman.append(np.corrcoef(_rank_positions(fp32_row), _rank_positions(int8_row))[0, 1])
+        fp32_top = set(np.argsort(-fp32_row)[:n])
+        int8_top = set(np.argsort(-int8_row)[:n])
+        overlap.append(len(fp32_top & int8_top) / n)
+
+    return {
+        'resumes': len(resume_texts),
+        'jobs': len(job_texts),
+        'fp32_seconds': fp32_seconds,
+        'int8_seconds': int8_seconds,
+        'speedup': fp32_seconds / max(int8_seconds, 1e-9),
+        'embedding_cosine': float(np.mean(np.sum(fp32_resumes * int8_resumes, axis=1))),
+        'spearman': float(np.nanmean(spearman)),
+        f'top{n}_overlap': float(np.mean(overlap)),
+    }
+
+
+def format_report(report):
+    lines = [
+        f"{report['resumes']} resumes, {report['jobs']} jobs",
+        f"fp32 encode: {report['fp32_seconds']:.2f}s",
+        f"int8 encode: {report['int8_seconds']:.2f}s ({report['speedup']:.2f}x faster)",
+        f"Mean fp32/int8 embedding cosine: {report['embedding_cosine']:.4f}",
+        f"Ranking agreement: Spearman {report['spearman']:.3f}",
+    ]
+    for key, value in report.items():
+        if key.endswith('_overlap'):
+            lines.append(f"{key.replace('_', ' ').capitalize()}: {value*100:.1f}%")
+    return "\n".join(lines)
+
+
+def run_check(folder, jobs, model_name='all-mpnet-base-v2', stored_files=None, limit=200):
+    """
+    Compare fp32 and int8 on the PDFs under `folder`, restricted to `stored_files`
+    (resume file names of stored candidates) when given.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    from bulk_import import find_resumes
+    from job_matching import job_text
+    from pdf_extraction import read_pdf_text
+
+    pdf_paths = find_resumes(folder)
+    if stored_files is not None:
+        pdf_paths = [path for path in pdf_paths if os.path.basename(path) in stored_files]
+    pdf_paths = pdf_paths[:limit]
+    if not pdf_paths:
+        raise ValueError(f"No {'stored ' if stored_files is not None else ''}candidate PDFs found in {folder}")
+
+    resume_texts = [read_pdf_text(path) for path in pdf_paths]
+    job_texts = [job_text(job) for job in jobs]
+
+    model = SentenceTransformer(model_name)
+    return compare_precisions(model, quantize_model(model), resume_texts, job_texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folder', help="Folder of resume PDFs")
+    parser.add_argument('--jobs', default=None, help="Jobs JSON file (default: the app's jobs file)")
+    parser.add_argument('--data-dir', default='.', help="Directory holding the rankings database")
+    parser.add_argument('--all', action='store_true', help="Use every PDF, not just stored candidates")
+    parser.add_argument('--limit', type=int, default=200, help="Maximum resumes to encode")
+    parser.add_argument('--model', default='all-mpnet-base-v2')
+    args = parser.parse_args()
+
+    from job_catalog import JobCatalog
+    from ranking_engine import JOBS_FILE
+    from results_store import ResultsStore
+
+    jobs = JobCatalog(args.jobs or JOBS_FILE, os.path.join(args.data_dir, 'job_index.json'),
+                      os.path.join(args.data_dir, 'job_edits.jsonl')).jobs()
+    stored_files = None
+    if not args.all:
+        stored_files = set(ResultsStore(os.path.join(args.data_dir, 'rankings.db')).resume_files().values())
+
+    print(format_report(run_check(args.folder, jobs, args.model, stored_files, args.limit)))
+
+
+if __name__ == "__main__":
+    main()
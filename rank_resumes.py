@@ -0,0 +1,130 @@
+"""
+Rank a folder of resume PDFs against one or more jobs without the GUI.
+
+    python rank_resumes.py resumes/ --jobs normalized_jobs.json --job 0 --job 3 --output rankings.json
+    python rank_resumes.py resumes/ --all-jobs --top-k 100
+
+Resumes are imported exactly like the GUI's Import Folder (scored against the
+first selected job and added to the rankings database), then every selected
+job is scored against the imported candidates with the same engine the GUI
+uses and the rankings are written to --output. A resume that duplicates a
+candidate (stored earlier or in the same folder) isn't stored again; it is
+ranked with that candidate's scores and its entry names the file in
+"duplicate_of".
+
+The rankings database and indexes go to --data-dir, batch_data/ by default, so
+a batch run never writes into the GUI's live database. Pass --data-dir . to
+add the candidates to the GUI's rankings.
+"""
+import argparse
+import json
+import os
+import queue
+import time
+
+from bulk_import import BulkImporter
+from job_matching import job_title
+from ranking_engine import JOBS_FILE, RankingEngine, build_candidate_data, resume_id
+
+
+def import_folder(engine, folder, job, workers=None, batch_size=64):
+    """Run the staged folder import and return the stored candidate records."""
+    def score_batch(batch):
+        scores = engine.score_resumes(
+            [(resume_id(pdf_path), resume_text, resume_sections)
+             for pdf_path, resume_text, resume_sections in batch],
+            job
+        )
+        return [
+            build_candidate_data(os.path.splitext(os.path.basename(pdf_path))[0], pdf_path, score)
+            for (pdf_path, _, _), score in zip(batch, scores)
+        ]
+
+    events = queue.Queue()
+    importer = BulkImporter(folder, score_batch, events, max_workers=workers, batch_size=batch_size,
+                            text_cache_dir=engine.pdf_extractor.cache.cache_dir)
+    importer.start()
+
+    records = []
+    while True:
+        event = events.get()
+        kind = event[0]
+        if kind == 'results':
+            records.extend(event[1])
+        elif kind == 'progress':
+            _, processed, total, rate, eta = event
+            eta_text = f"{eta:.0f}s" if eta is not None else "--"
+            print(f"\r{processed}/{total} resumes  |  {rate:.1f} resumes/sec  |  ETA {eta_text}", end='', flush=True)
+        elif kind == 'error':
+            _, pdf_path, message = event
+            print(f"\nFailed to import {pdf_path}: {message}")
+        elif kind == 'done':
+            _, succeeded, failed, elapsed = event
+            print(f"\nImported {succeeded} resumes in {elapsed:.1f}s ({failed} failed)")
+            # One insert and one index write for the whole folder
+            engine.save(records)
+            engine.save_indexes()
+            return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folder', help="Folder of resume PDFs (searched recursively)")
+    parser.add_argument('--jobs', default=JOBS_FILE, help="Jobs JSON file")
+    parser.add_argument('--job', type=int, action='append', dest='job_indexes',
+                        help="Index of a job in the jobs file; repeat for several (default: 0)")
+    parser.add_argument('--all-jobs', action='store_true', help="Rank against every job in the jobs file")
+    parser.add_argument('--top-k', type=int, default=50, help="Candidates to keep per job")
+    parser.add_argument('--output', default='batch_rankings.json', help="Where to write the rankings")
+    parser.add_argument('--data-dir', default='batch_data',
+                        help="Directory holding the rankings database and indexes (default: batch_data)")
+    parser.add_argument('--workers', type=int, default=None, help="PDF extraction processes")
+    parser.add_argument('--batch-size', type=int, default=64, help="Resumes per embedding batch")
+    parser.add_argument('--quantize', action='store_true', help="Use int8 dynamic quantization for the transformer")
+    parser.add_argument('--chunked', action='store_true', help="Encode long resumes in chunks instead of truncating")
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    engine = RankingEngine(data_dir=args.data_dir, jobs_file=args.jobs, quantize=args.quantize, chunked=args.chunked)
+    all_jobs = engine.read_jobs()
+    job_indexes = list(range(len(all_jobs))) if args.all_jobs else (args.job_indexes or [0])
+    jobs = [all_jobs[i] for i in job_indexes]
+
+    records = import_folder(engine, args.folder, jobs[0], args.workers, args.batch_size)
+
+    # Duplicates are ranked by the candidate they duplicate, which may have been stored before this run
+    stored_files = engine.results_store.resume_files()
+    imported = {}
+    for record in records:
+        imported.setdefault(record.get('duplicate_of') or record['resume_id'], []).append(record)
+    duplicates = [record for record in records if record.get('duplicate_of')]
+    if duplicates:
+        print(f"{len(duplicates)} resumes duplicate a stored candidate and reuse its scores:")
+        for record in duplicates:
+            print(f"  {record['resume_file']} -> {stored_files.get(record['duplicate_of'], record['duplicate_of'])}")
+
+    started = time.perf_counter()
+    job_rankings, _ = engine.match_jobs(jobs, top_k=args.top_k, best_jobs=1, doc_ids=list(imported))
+    print(f"Scored {len(imported)} candidates against {len(jobs)} jobs in {time.perf_counter() - started:.2f}s")
+
+    def entry(record, scores):
+        candidate = dict(resume_file=record['resume_file'], candidate_name=record['candidate_name'], **scores)
+        if record.get('duplicate_of'):
+            candidate['duplicate_of'] = stored_files.get(record['duplicate_of'], record['duplicate_of'])
+        return candidate
+
+    output = [
+        {
+            'job_index': index,
+            'job': job_title(job),
+            'candidates': [entry(record, scores) for doc_id, scores in ranking for record in imported[doc_id]]
+        }
+        for index, job, ranking in zip(job_indexes, jobs, job_rankings)
+    ]
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
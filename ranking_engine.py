@@ -0,0 +1,494 @@
+import os
+
+import numpy as np
+
+from ann_index import CandidateIndex
+from chunked_encoding import ChunkedEncoder
+from dedup import DuplicateIndex, text_hash
+from embedding_cache import EmbeddingCache
+from embedding_store import EmbeddingStore
+from instrumentation import tracer
+from job_catalog import JobCatalog
+from job_matching import (SECTION_COMPARISONS, SCORE_WEIGHTS, job_id, job_text, job_section_texts,
+                          match_all_jobs, score_job)
+from model_loader import ModelLoader
+from pdf_extraction import PdfTextExtractor, file_hash
+from results_store import ResultsStore
+from section_extractor import get_section_extractor
+from tfidf_engine import TfidfEngine
+
+
+JOBS_FILE = "D:/ATOMS/jobfiles/normalized_jobs.json"
+
+
+def resume_id(resume_path):
+    """
+    The id a resume PDF's vectors, TF-IDF row and results are stored under:
+    the SHA-256 of its bytes. Two different PDFs can share a file name, but
+    not an id.
+    """
+    return file_hash(resume_path)
+
+
+def build_candidate_data(name, resume_path, scores):
+    candidate_data = {
+        'resume_id': scores.get('resume_id') or os.path.basename(resume_path),
+        'resume_file': os.path.basename(resume_path),
+        'candidate_name': name,
+        'transformer_score': scores['transformer_score'],
+        'tfidf_score': scores['tfidf_score'],
+        'section_score': scores['section_score'],
+        'combined_score': scores['combined_score'],
+        'section_details': scores['section_details'],
+        'timings': scores.get('timings', {}),
+        'job': scores.get('job', '')
+    }
+    # Duplicates are linked to the stored candidate instead of being added again
+    if scores.get('duplicate_of'):
+        candidate_data['duplicate_of'] = scores['duplicate_of']
+        candidate_data['duplicate_similarity'] = scores['duplicate_similarity']
+    return candidate_data
+
+
+class RankingEngine:
+    """
+    The hybrid resume matching pipeline with no UI attached.
+
+    Owns the models, the embedding cache, the TF-IDF pool, the stored candidate
+    embeddings, the ANN index and the results database, all under `data_dir`.
+    The GUI and the rank_resumes.py command line both drive this class, so a
+    batch run scores exactly like the desktop app.
+
+    Models load on a background thread; anything that needs them waits. With
+    load_models=False they only load if something actually encodes, which is
+    what a GUI using the scoring service wants. Such a GUI also passes
+    readonly=True: the service is the one writer of the results database and
+    stored vectors, and this engine only reads them; scoring new resumes,
+    save() and rerank() raise.
+
+    quantize=True runs the transformer with int8 Linear layers. Its embeddings
+    go to a separate cache, store, ANN index and results database (named by
+    models.tag), so int8 and fp32 vectors and scores are never mixed.
+
+    chunked=True encodes long texts as token-budgeted chunks pooled back into
+    one vector instead of truncating them; those vectors are kept apart the
+    same way.
+    """
+
+    def __init__(self, data_dir='.', model_name='all-mpnet-base-v2', section_engine='keyword', jobs_file=JOBS_FILE,
+                 load_models=True, quantize=False, chunked=False, readonly=False):
+        self.data_dir = data_dir
+        self.readonly = readonly
+        self.jobs_file = jobs_file
+        # Job titles are indexed once; bodies load on demand and edits are appended, not rewritten
+        self.job_catalog = JobCatalog(jobs_file, self._path('job_index.json'), self._path('job_edits.jsonl'))
+
+        # spaCy isn't needed by the default section extractor, so it isn't loaded here
+        self.models = ModelLoader(model_name, spacy_model=None, quantize=quantize)
+        if load_models:
+            self.models.start()
+
+        self.section_extractor = get_section_extractor(section_engine)
+
+        self.chunked_encoder = ChunkedEncoder(self.models) if chunked else None
+        self.embedding_tag = self.models.tag + ('-chunked' if chunked else '')
+
+        # Cache embeddings so repeated job/resume texts skip the transformer
+        self.embedding_cache = EmbeddingCache(
+            self.chunked_encoder or self.models, self.embedding_tag, cache_dir=self._path('embedding_cache')
+        )
+        # Extracted resume text keyed by PDF content, so re-scoring a PDF skips parsing it
+        self.pdf_extractor = PdfTextExtractor(self._path('text_cache'))
+
+        with tracer.stage('load_results'):
+            # Scores are tagged like the vectors they came from, so an int8 run ranks in its own database
+            self.results_store = ResultsStore(self._path(self._tagged('rankings') + '.db'), readonly=readonly)
+            if self.embedding_tag == model_name and not readonly:
+                try:
+                    # One-time migration of the old (fp32) JSON results into the database
+                    imported = self.results_store.import_json(self._path('hybrid_matching_results.json'))
+                    if imported:
+                        print(f"Imported {imported} candidates from hybrid_matching_results.json")
+                except Exception as e:
+                    print(f"Error importing hybrid_matching_results.json: {e}")
+
+        # Corpus-level TF-IDF statistics over every candidate added so far
+        with tracer.stage('load_tfidf'):
+            self.tfidf_engine = TfidfEngine.load_or_create(self._path('tfidf_index.npz'))
+
+        # Stored candidate embeddings so candidates can be re-scored without their PDFs
+        with tracer.stage('load_embeddings'):
+            if readonly:
+                self.embedding_store = EmbeddingStore(
+                    self._path(self._tagged('candidate_embeddings')), list(SECTION_COMPARISONS),
+                    readonly=True, model=self.embedding_tag
+                )
+            else:
+                self.embedding_store = EmbeddingStore.open_or_create(
+                    self._path(self._tagged('candidate_embeddings')), list(SECTION_COMPARISONS),
+                    model=self.embedding_tag
+                )
+
+        # Exact and near-duplicate lookup over every stored resume's text
+        with tracer.stage('load_duplicates'):
+            self.duplicate_index = DuplicateIndex.load_or_create(self._path('duplicate_index.npz'))
+        # Resumes a failed _score_new may have stored without returning their scores;
+        # they don't count as duplicates, so scoring them again scores them as new
+        self._unscored_ids = set()
+
+        # ANN index over the stored embeddings for top-K retrieval; loaded on first use
+        self.candidate_index = CandidateIndex(self.embedding_store, self._path(self._tagged('candidate_ann')))
+
+    def read_jobs(self):
+        return self.job_catalog.jobs()
+
+    def load_current_job(self):
+        """
+        Load the job description candidates are scored against: the job at the
+        catalog position the rankings were last re-ranked for, or the first job.
+        """
+        position = self.results_store.get_meta('current_job_position')
+        if position is not None and int(position) < len(self.job_catalog):
+            return self.job_catalog.get(int(position))
+        return self.job_catalog.get(0)
+
+    def extract_sections(self, text):
+        """
+        Extract sections from resume text with the configured section extractor.
+        """
+        return self.section_extractor.extract(text)
+
+    def process_resume(self, resume_path, current_job=None, progress=None):
+        """
+        Score one resume PDF against a job (the current job by default).
+        progress(percent, stage) is called as each stage starts. The stage
+        timings are returned in scores['timings'].
+        """
+        def report(percent, stage):
+            if progress:
+                progress(percent, stage)
+
+        timings = {}
+
+        report(5, "Reading PDF")
+        with tracer.stage('read_pdf', timings):
+            resume_text = self.pdf_extractor.extract(resume_path)
+            doc_id = resume_id(resume_path)
+
+        report(15, "Loading job description")
+        if current_job is None:
+            with tracer.stage('load_job', timings):
+                current_job = self.load_current_job()
+
+        # A resume that is already stored skips sections, encoding and TF-IDF entirely
+        with tracer.stage('dedup', timings):
+            duplicate = self.find_duplicate(resume_text, doc_id)
+        if duplicate:
+            report(50, "Reusing scores of a stored duplicate")
+            return dict(self._linked_scores([duplicate], current_job, timings)[0], resume_id=doc_id)
+
+        report(20, "Extracting sections")
+        with tracer.stage('extract_sections', timings):
+            resume_sections = self.extract_sections(resume_text)
+
+        scores = self._score_new([(doc_id, resume_text, resume_sections)], current_job, progress=report)[0]
+        scores['timings'] = dict(timings, **scores['timings'])
+        return scores
+
+    def score_resumes(self, resumes, current_job, progress=None):
+        """
+        Score a list of (resume_id, resume_text, resume_sections) against one job;
+        see resume_id() for PDFs. Each result carries its 'resume_id'.
+        Resumes that duplicate a stored candidate are scored from that candidate's
+        stored vectors and carry 'duplicate_of'; so do later copies of a resume
+        that appears more than once in the list, linked to its first copy. The
+        rest go through _score_new.
+        """
+        timings = {}
+        with tracer.stage('dedup', timings):
+            duplicates = [self.find_duplicate(resume_text, doc_id) for doc_id, resume_text, _ in resumes]
+
+            # Exact copies within the batch, by id or text: none of it is in the index yet
+            copy_of = {}
+            first_copies = {}
+            for i, (doc_id, resume_text, _) in enumerate(resumes):
+                if duplicates[i] is not None:
+                    continue
+                keys = [('id', doc_id)]
+                if self.duplicate_index.indexable(resume_text):
+                    keys.append(('text', text_hash(resume_text)))
+                first = min(first_copies.setdefault(key, i) for key in keys)
+                if first != i:
+                    copy_of[i] = copy_of.get(first, first)
+
+        results = [None] * len(resumes)
+        new = [i for i, duplicate in enumerate(duplicates) if duplicate is None and i not in copy_of]
+        linked = [i for i, duplicate in enumerate(duplicates) if duplicate is not None]
+        per_resume = {stage: ms / max(len(resumes), 1) for stage, ms in timings.items()}
+        if new:
+            scores = self._score_new([resumes[i] for i in new], current_job, progress)
+            for i, result in zip(new, scores):
+                result['timings'] = dict(per_resume, **result['timings'])
+                results[i] = result
+        if linked:
+            scores = self._linked_scores([duplicates[i] for i in linked], current_job, per_resume)
+            for i, result in zip(linked, scores):
+                results[i] = result
+        for i, first in copy_of.items():
+            results[i] = dict(results[first], section_details=dict(results[first]['section_details']),
+                              duplicate_of=resumes[first][0], duplicate_similarity=1.0, timings=dict(per_resume))
+        for (doc_id, _, _), result in zip(resumes, results):
+            result['resume_id'] = doc_id
+        return results
+
+    def find_duplicate(self, resume_text, doc_id=None):
+        """
+        (resume_id, similarity) of a stored candidate this resume duplicates,
+        or None. A resume whose id is stored is an exact duplicate of itself.
+        Only candidates whose vectors are stored count, so their scores can be
+        reused, and not those stored by a scoring call that then failed.
+        """
+        if doc_id is not None and self._is_scored(doc_id):
+            return doc_id, 1.0
+        duplicate = self.duplicate_index.find(resume_text)
+        if duplicate and self._is_scored(duplicate[0]):
+            return duplicate
+        return None
+
+    def _is_scored(self, doc_id):
+        return doc_id not in self._unscored_ids and doc_id in self.embedding_store and doc_id in self.tfidf_engine
+
+    def score_stored(self, job, doc_ids=None):
+        """
+        Score stored candidates against a job from their stored embeddings and
+        TF-IDF rows in one vectorized pass. Returns {resume_id: scores}; each
+        scores dict names the job by its job_id in 'job'.
+        """
+        doc_ids, scores = score_job(job, self.embedding_store, self.tfidf_engine, self.embedding_cache.encode,
+                                    doc_ids=doc_ids)
+        key = job_id(job)
+        return {
+            doc_id: {
+                'transformer_score': float(scores['transformer_score'][i]),
+                'tfidf_score': float(scores['tfidf_score'][i]),
+                'section_score': float(scores['section_score'][i]),
+                'combined_score': float(scores['combined_score'][i]),
+                'job': key,
+                'section_details': {
+                    section_type: float(similarity[i])
+                    for section_type, (similarity, present) in scores['section_details'].items()
+                    if present[i]
+                },
+            }
+            for i, doc_id in enumerate(doc_ids)
+        }
+
+    def _linked_scores(self, duplicates, current_job, timings):
+        stored = self.score_stored(current_job, list({doc_id for doc_id, _ in duplicates}))
+        return [
+            dict(stored[doc_id], duplicate_of=doc_id, duplicate_similarity=similarity, timings=dict(timings))
+            for doc_id, similarity in duplicates
+        ]
+
+    def _score_new(self, resumes, current_job, progress=None):
+        """
+        Every text needed by every resume goes through a single batched encode, and
+        every resume is added to the TF-IDF pool, the embedding store and the
+        duplicate index before it is scored. Each result's 'timings' holds the
+        batch's stage times divided across its resumes.
+        """
+        self._check_writable()
+        timings = {}
+        job_sections = job_section_texts(current_job)
+
+        # Collect every text so they go through a single encode:
+        # [job, job sections..., resume 1, resume 1 sections..., resume 2, resume 2 sections..., ...]
+        texts = [job_text(current_job)]
+        job_slots = {}
+        for section_type, text in job_sections.items():
+            job_slots[section_type] = len(texts)
+            texts.append(text)
+
+        plans = []
+        for _, resume_text, resume_sections in resumes:
+            resume_index = len(texts)
+            texts.append(resume_text)
+
+            # Every non-empty resume section is encoded, even if this job lacks it,
+            # so the stored embeddings can be scored against any job later
+            section_slots = {}
+            for section_type in SECTION_COMPARISONS:
+                if resume_sections.get(section_type):
+                    section_slots[section_type] = len(texts)
+                    texts.append(resume_sections[section_type])
+
+            plans.append((resume_index, section_slots))
+
+        if progress:
+            progress(30, "Encoding")
+
+        with tracer.stage('encode', timings):
+            try:
+                embeddings = self.embedding_cache.encode(texts)
+            except UnicodeEncodeError:
+                full_texts = {0} | {resume_index for resume_index, _ in plans}
+                texts = [text if i in full_texts else text.encode('ascii', 'ignore').decode('ascii')
+                         for i, text in enumerate(texts)]
+                embeddings = self.embedding_cache.encode(texts)
+
+        # Normalize once so every similarity below is a plain dot product
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.maximum(norms, 1e-12)
+
+        if progress:
+            progress(70, "Scoring")
+
+        # 2. TF-IDF matching against the whole candidate pool's statistics
+        doc_ids = [doc_id for doc_id, _, _ in resumes]
+        try:
+            with tracer.stage('tfidf', timings):
+                for doc_id, resume_text, _ in resumes:
+                    self.tfidf_engine.add_document(doc_id, resume_text)
+                tfidf_scores = self.tfidf_engine.score(texts[0], doc_ids)
+
+            with tracer.stage('store_embeddings', timings):
+                for doc_id, (resume_index, section_slots) in zip(doc_ids, plans):
+                    self.embedding_store.add(
+                        doc_id,
+                        embeddings[resume_index],
+                        {section_type: embeddings[slot] for section_type, slot in section_slots.items()}
+                    )
+                    self.candidate_index.add(doc_id)
+                for doc_id, resume_text, _ in resumes:
+                    self.duplicate_index.add(doc_id, resume_text)
+        except Exception:
+            # Part of the batch may be stored already; a retry must not match it against itself
+            self._unscored_ids.update(doc_ids)
+            raise
+        self._unscored_ids.difference_update(doc_ids)
+
+        results = []
+        for doc_id, (resume_index, section_slots), tfidf_score in zip(doc_ids, plans, tfidf_scores):
+
+            # 1. Transformer-based matching
+            transformer_score = float(np.dot(embeddings[0], embeddings[resume_index]))
+
+            tfidf_score = float(tfidf_score)
+
+            # 3. Section-based matching for sections both the job and the resume have
+            section_scores = {}
+            weighted_section_score = 0
+            total_weight = 0
+
+            for section_type, slot in section_slots.items():
+                if section_type not in job_slots:
+                    continue
+                similarity = float(np.dot(embeddings[job_slots[section_type]], embeddings[slot]))
+                section_scores[section_type] = similarity
+                weighted_section_score += similarity * SECTION_COMPARISONS[section_type]['weight']
+                total_weight += SECTION_COMPARISONS[section_type]['weight']
+
+            section_score = weighted_section_score / total_weight if total_weight > 0 else 0.0
+
+            # Calculate combined score
+            combined_score = (
+                transformer_score * SCORE_WEIGHTS['transformer'] +    # 40% transformer
+                tfidf_score * SCORE_WEIGHTS['tfidf'] +                # 30% TF-IDF
+                section_score * SCORE_WEIGHTS['section']              # 30% section-based
+            )
+
+            results.append({
+                'resume_id': doc_id,
+                'transformer_score': transformer_score,
+                'tfidf_score': tfidf_score,
+                'section_score': section_score,
+                'combined_score': combined_score,
+                'section_details': section_scores,
+                'job': job_id(current_job)
+            })
+
+        per_resume = {stage: ms / max(len(resumes), 1) for stage, ms in timings.items()}
+        for result in results:
+            result['timings'] = dict(per_resume)
+        return results
+
+    def save(self, records):
+        """
+        Store newly scored candidates and flush their stored embeddings.
+        Duplicates are linked to the candidate they duplicate rather than
+        added as another row. The TF-IDF pool, duplicate index and ANN index
+        are rewritten whole, so they're left to save_indexes().
+        """
+        self._check_writable()
+        # New candidates are one insert transaction, not a rewrite of every result
+        with tracer.stage('save_results'):
+            self.results_store.add_many([record for record in records if not record.get('duplicate_of')])
+            self.results_store.link_duplicates([record for record in records if record.get('duplicate_of')])
+            self.embedding_store.flush()
+
+    def save_indexes(self):
+        """
+        Write the TF-IDF pool, duplicate index and ANN index back to disk, each
+        only if it changed since its last save. Each write costs O(pool), so
+        callers run this after a batch import, on a timer off the UI thread and
+        on exit, not after every candidate. Candidates added since the last
+        call are missing from the saved indexes if the process dies first.
+        """
+        if self.readonly:
+            return
+        with tracer.stage('save_indexes'):
+            if self.tfidf_engine.dirty:
+                self.tfidf_engine.save(self._path('tfidf_index.npz'))
+            if self.duplicate_index.dirty:
+                self.duplicate_index.save(self._path('duplicate_index.npz'))
+            self.candidate_index.save()
+
+    def match_jobs(self, jobs, top_k=50, best_jobs=5, doc_ids=None):
+        """Score jobs against the stored candidates; see job_matching.match_all_jobs."""
+        return match_all_jobs(
+            jobs, self.embedding_store, self.tfidf_engine, self.embedding_cache.encode,
+            top_k=top_k, best_jobs=best_jobs, doc_ids=doc_ids
+        )
+
+    def rerank(self, job, position=None):
+        """
+        Re-score every stored candidate against `job` from the stored embeddings
+        and TF-IDF rows, without reading any PDF, and make it the job new resumes
+        are scored against. Only job texts that changed miss the embedding cache,
+        so an edit re-encodes just the edited sections. Returns the number of
+        candidates updated.
+
+        `position` is the job's place in the catalog, which load_current_job()
+        reads back. Candidates imported without stored embeddings can't be
+        re-scored; their rows keep the job they were scored against and rank
+        after the others as stale.
+        """
+        self._check_writable()
+        with tracer.stage('rerank'):
+            records = [dict(scores, resume_id=doc_id) for doc_id, scores in self.score_stored(job).items()]
+            updated = self.results_store.update_scores(records)
+            self.results_store.set_meta('current_job', job_id(job))
+            if position is not None:
+                self.results_store.set_meta('current_job_position', str(position))
+        return updated
+
+    def top_candidates(self, job, retrieve_k=200, top_k=50):
+        """
+        Retrieve the nearest candidates for a job from the ANN index, then
+        re-rank them with the full hybrid score.
+        """
+        job_embedding = self.embedding_cache.encode(job_text(job))
+        retrieved = [doc_id for doc_id, _ in self.candidate_index.search(job_embedding, k=retrieve_k)]
+        return self.match_jobs([job], top_k=top_k, best_jobs=1, doc_ids=retrieved)
+
+    def _check_writable(self):
+        if self.readonly:
+            raise ValueError("Ranking engine was opened read-only")
+
+    def _tagged(self, name):
+        # The default fp32, truncating model keeps the original file names
+        suffix = self.embedding_tag[len(self.models.model_name):]
+        return f"{name}{suffix}" if suffix else name
+
+    def _path(self, name):
+        return os.path.join(self.data_dir, name)
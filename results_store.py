@@ -0,0 +1,291 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.request import pathname2url
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    resume_id TEXT NOT NULL DEFAULT '',
+    resume_file TEXT NOT NULL,
+    candidate_name TEXT NOT NULL,
+    transformer_score REAL NOT NULL,
+    tfidf_score REAL NOT NULL,
+    section_score REAL NOT NULL,
+    combined_score REAL NOT NULL,
+    section_details TEXT NOT NULL,
+    timings TEXT NOT NULL DEFAULT '{}',
+    job TEXT NOT NULL DEFAULT '',
+    added_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_combined ON candidates (combined_score DESC);
+CREATE INDEX IF NOT EXISTS idx_candidates_added ON candidates (added_at DESC);
+CREATE INDEX IF NOT EXISTS idx_candidates_file ON candidates (resume_file);
+CREATE TABLE IF NOT EXISTS duplicates (
+    resume_file TEXT NOT NULL,
+    candidate_name TEXT NOT NULL,
+    duplicate_of TEXT NOT NULL,
+    similarity REAL NOT NULL,
+    added_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+COLUMNS = ('resume_id', 'resume_file', 'candidate_name', 'transformer_score', 'tfidf_score',
+           'section_score', 'combined_score', 'section_details', 'timings', 'job')
+
+# Candidates a re-rank couldn't re-score (and legacy rows, job '') keep another job's scores;
+# they're still listed, but flagged stale and ranked after every candidate scored for the current job
+STALE = "job != COALESCE((SELECT value FROM meta WHERE key = 'current_job'), job)"
+
+INSERT_SQL = f"INSERT INTO candidates ({', '.join(COLUMNS)}, added_at) VALUES ({', '.join('?' * (len(COLUMNS) + 1))})"
+
+
+class ResultsStore:
+    """
+    SQLite store for scored candidates, replacing the rewrite of
+    hybrid_matching_results.json on every add.
+
+    Each candidate is one row with its resume_id (the id its vectors are
+    stored under; resume_file is only for display), its component scores,
+    its section_details and stage timings as JSON, the job_id of the job it
+    was scored against and the time it was added. Inserts are single
+    transactions, and the indexes on combined_score and added_at keep the
+    ranked and recently-added queries from scanning the table.
+
+    Records read back carry 'stale': true when their job isn't the current
+    job (the meta key set by a re-rank); stale rows rank after the rest.
+
+    readonly=True opens the database for reading only, for a window whose
+    candidates are written by the scoring service; it sees each of the
+    service's commits as it lands, and any write fails.
+    """
+
+    def __init__(self, path='rankings.db', readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.RLock()
+        if readonly and not os.path.exists(path):
+            # Nothing scored yet; start the database the writer would
+            ResultsStore(path).close()
+
+        # One connection shared by the Tk thread and the scoring threads, guarded by the lock
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(path))}?mode=ro", uri=True,
+                                         check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if readonly:
+            # The writer owns the schema and its migrations
+            return
+
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            # Databases created before stage timings were recorded
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(candidates)")}
+            if 'timings' not in columns:
+                self._conn.execute("ALTER TABLE candidates ADD COLUMN timings TEXT NOT NULL DEFAULT '{}'")
+            # ... and before the scores' job was recorded, when every row was kept on the current job
+            if 'job' not in columns:
+                self._conn.execute("ALTER TABLE candidates ADD COLUMN job TEXT NOT NULL DEFAULT ''")
+                self._conn.execute(
+                    "UPDATE candidates SET job = COALESCE((SELECT value FROM meta WHERE key = 'current_job'), '')"
+                )
+            # ... and before candidates had an id apart from their file name, which stays their id
+            if 'resume_id' not in columns:
+                self._conn.execute("ALTER TABLE candidates ADD COLUMN resume_id TEXT NOT NULL DEFAULT ''")
+                self._conn.execute("UPDATE candidates SET resume_id = resume_file")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_resume_id ON candidates (resume_id)")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def stale_count(self):
+        """Number of candidates whose scores are for another job than the current one."""
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM candidates WHERE {STALE}").fetchone()[0]
+
+    def add(self, record):
+        """Insert one candidate record and return its row id."""
+        return self.add_many([record])[0]
+
+    def add_many(self, records, added_at=None):
+        """Insert candidate records in one transaction and return their row ids."""
+        added_at = time.time() if added_at is None else added_at
+        ids = []
+        with self._lock, self._conn:
+            for record in records:
+                cursor = self._conn.execute(INSERT_SQL, self._row_values(record) + (record.get('added_at', added_at),))
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def update_scores(self, records):
+        """
+        Overwrite the scores, section_details and job of stored candidates,
+        matched by resume_id, in one transaction. Returns the number of rows
+        updated.
+        """
+        updated = 0
+        with self._lock, self._conn:
+            for record in records:
+                cursor = self._conn.execute(
+                    "UPDATE candidates SET transformer_score = ?, tfidf_score = ?, section_score = ?, "
+                    "combined_score = ?, section_details = ?, job = ? WHERE resume_id = ?",
+                    (float(record['transformer_score']), float(record['tfidf_score']),
+                     float(record['section_score']), float(record['combined_score']),
+                     json.dumps(record.get('section_details', {})), record.get('job', ''), record['resume_id'])
+                )
+                updated += cursor.rowcount
+        return updated
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def link_duplicates(self, records, added_at=None):
+        """Record resumes that duplicate a stored candidate (their 'duplicate_of') in one transaction."""
+        added_at = time.time() if added_at is None else added_at
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO duplicates (resume_file, candidate_name, duplicate_of, similarity, added_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(record['resume_file'], record['candidate_name'], record['duplicate_of'],
+                  float(record.get('duplicate_similarity', 1.0)), added_at) for record in records]
+            )
+
+    def duplicates(self):
+        """Every linked duplicate, oldest first."""
+        with self._lock:
+            return [dict(row) for row in self._conn.execute("SELECT * FROM duplicates ORDER BY added_at")]
+
+    def ranked(self, limit=None, offset=0):
+        """Candidates best first, stale ones last; pass limit/offset to read one page."""
+        query = f"SELECT *, {STALE} AS stale FROM candidates ORDER BY stale, combined_score DESC, id"
+        params = ()
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params = (limit, offset)
+        with self._lock:
+            return [self._record(row) for row in self._conn.execute(query, params)]
+
+    def component_rows(self, after_id=0):
+        """Component scores, raw section_details JSON and stale flag of every row after `after_id`, in id order."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, resume_file, candidate_name, transformer_score, tfidf_score, section_details, "
+                f"{STALE} AS stale FROM candidates WHERE id > ? ORDER BY id", (after_id,)
+            ).fetchall()
+
+    def rank_of(self, record):
+        """1-based position of a stored record in the ranked order."""
+        stale = int(record['stale'])
+        with self._lock:
+            higher = self._conn.execute(
+                f"SELECT COUNT(*) FROM candidates WHERE ({STALE}) < ? OR (({STALE}) = ? "
+                "AND (combined_score > ? OR (combined_score = ? AND id < ?)))",
+                (stale, stale, record['combined_score'], record['combined_score'], record['id'])
+            ).fetchone()[0]
+        return higher + 1
+
+    def recent(self, limit=5):
+        """The most recently added candidates, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT *, {STALE} AS stale FROM candidates ORDER BY added_at DESC, id DESC LIMIT ?", (limit,)
+            )
+            return [self._record(row) for row in rows]
+
+    def names(self):
+        """Map resume_id -> candidate_name, the latest name winning."""
+        with self._lock:
+            rows = self._conn.execute("SELECT resume_id, candidate_name FROM candidates ORDER BY id")
+            return {row['resume_id']: row['candidate_name'] for row in rows}
+
+    def resume_files(self):
+        """Map resume_id -> resume_file, the latest file name winning."""
+        with self._lock:
+            rows = self._conn.execute("SELECT resume_id, resume_file FROM candidates ORDER BY id")
+            return {row['resume_id']: row['resume_file'] for row in rows}
+
+    def import_json(self, path):
+        """
+        One-time import of an existing results JSON file. Returns the number of
+        records imported; files that were already imported are skipped.
+        """
+        if not os.path.exists(path):
+            return 0
+
+        key = f"imported:{os.path.abspath(path)}"
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+                return 0
+
+            with open(path, 'r') as f:
+                records = json.load(f)
+
+            # Keep the file's order as the insertion order so "Recently Added" still makes sense
+            start = time.time() - len(records)
+            with self._conn:
+                for i, record in enumerate(records):
+                    self._conn.execute(INSERT_SQL, self._row_values(record) + (start + i,))
+                self._conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (key, str(len(records))))
+            return len(records)
+
+    def export_json(self, path):
+        """Write every candidate, best first, in the old hybrid_matching_results.json format."""
+        records = self.ranked()
+        for record in records:
+            del record['id']
+            del record['added_at']
+            del record['timings']
+            del record['job']
+            del record['resume_id']
+            del record['stale']
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(records, f, indent=2)
+        os.replace(tmp_path, path)
+        return len(records)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row_values(record):
+        return (
+            # Results from before resume ids were keyed by file name, as were their vectors
+            record.get('resume_id') or record['resume_file'],
+            record['resume_file'],
+            record['candidate_name'],
+            float(record['transformer_score']),
+            float(record['tfidf_score']),
+            float(record['section_score']),
+            float(record['combined_score']),
+            json.dumps(record.get('section_details', {})),
+            json.dumps(record.get('timings', {})),
+            record.get('job', ''),
+        )
+
+    @staticmethod
+    def _record(row):
+        record = dict(row)
+        record['section_details'] = json.loads(record['section_details'])
+        record['timings'] = json.loads(record['timings'])
+        record['stale'] = bool(record['stale'])
+        return record
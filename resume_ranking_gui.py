@@ -1,18 +1,33 @@
+import time
+PROCESS_START = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext
 import json
 import os
-from sentence_transformers import SentenceTransformer
-from sentence_transformers import util
-import torch
-from transformers import AutoTokenizer, AutoModel
+import queue
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity as sklearn_cosine_similarity
-import spacy
-import fitz
-from collections import defaultdict
-from PIL import Image, ImageTk
+from bulk_import import BulkImporter
+from job_matching import SCORE_WEIGHTS, edit_job_sections, job_title
+from ranking_engine import RankingEngine, build_candidate_data, resume_id
+from scoring_service import ScoringClient
+from instrumentation import tracer, process_rss
+from reweighting import ScoreReweighter, default_section_weights
+from virtual_tree import VirtualTreeview
+import threading
+from scoring_worker import ScoringWorker, ScoringCancelled
+
+# Section headers in the job description editor -> job section keys
+JOB_SECTION_HEADERS = {
+    'overview': 'contact',
+    'experience requirements': 'experience',
+    'required skills': 'skills',
+    'job description': 'interests',
+}
+
+# How often the TF-IDF, duplicate and ANN indexes are written back while the window is open
+INDEX_SAVE_MS = 60 * 1000
+
 
 class ModernResumeRankingGUI:
     def __init__(self, root):
@@ -86,9 +101,7 @@ class ModernResumeRankingGUI:
         
         # Load logo
         try:
-            logo_img = Image.open("LOGO.png")
-            logo_img = logo_img.resize((150, 150), Image.Resampling.LANCZOS)
-            self.logo = ImageTk.PhotoImage(logo_img)
+            self.logo = self.load_logo("LOGO.png", "LOGO_thumbnail.png")
         except Exception as e:
             print(f"Error loading logo: {e}")
             self.logo = None
@@ -104,16 +117,177 @@ class ModernResumeRankingGUI:
         # Create header with logo
         self.setup_header()
         
-        # Initialize models
-        self.model = SentenceTransformer('all-mpnet-base-v2')
-        self.nlp = spacy.load("en_core_web_lg")
+        # With ATOMS_SCORING_SERVICE set, scoring goes to the shared local service and
+        # this window never loads the models itself
+        service_url = os.environ.get('ATOMS_SCORING_SERVICE')
+        self.scoring_client = ScoringClient(service_url) if service_url else None
+        
+        # The engine opens its stores and indexes on a loader thread so the window shows first;
+        # the tabs that need it are built once it's loaded
+        self.engine = None
+        self.engine_thread = threading.Thread(target=self.load_engine, daemon=True)
+        self.engine_thread.start()
+        self.all_jobs_thread = None
+        
+        # Re-ranking after a job edit; a second edit while one runs waits for it
+        self.rerank_thread = None
+        self.pending_rerank = None
+        
+        # Stored component scores re-combined under the Rankings tab's weights; None while the defaults apply
+        self.reweighter = None
+        self.reweight_job = None
+        
+        # Folder import state
+        self.bulk_importer = None
+        self.bulk_events = queue.Queue()
+        self.bulk_errors = []
+        self.bulk_duplicates = 0
         
-        # Load existing data
-        self.load_data()
+        # Score single candidates on a background thread; results come back through a queue
+        self.scoring_events = queue.Queue()
+        self.scoring_worker = ScoringWorker(self.score_candidate, self.scoring_events)
         
         # Create and setup tabs
         self.setup_tabs()
         
+        self.root.after(100, self.poll_scoring_events)
+        self.root.after(200, self.poll_model_status)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # The TF-IDF, duplicate and ANN indexes are rewritten whole, so they're saved
+        # once a minute off the Tk thread and on exit rather than after every add
+        self.index_save_thread = None
+        self.root.after(INDEX_SAVE_MS, self.save_indexes_periodically)
+        
+        # Startup is measured from process start until the event loop first goes idle
+        self.metrics = {'startup_seconds': None}
+        self.root.after_idle(self.record_startup_time)
+        
+    def load_engine(self):
+        # Runs on the loader thread; the engine is handed to the Tk thread through root.after.
+        # All scoring goes through the headless engine; models load in the background
+        # and anything that needs them waits until they're ready.
+        # ATOMS_QUANTIZE=1 opts into int8 inference, with its own embedding store
+        # ATOMS_CHUNKED=1 encodes long resumes in chunks instead of truncating them
+        # With the service, the service writes the results and this window only reads them,
+        # so it takes the service's settings to open the same tagged store
+        quantize = os.environ.get('ATOMS_QUANTIZE', '') not in ('', '0')
+        chunked = os.environ.get('ATOMS_CHUNKED', '') not in ('', '0')
+        if self.scoring_client:
+            try:
+                health = self.scoring_client.health(timeout=2)
+                quantize, chunked = health['quantize'], health['chunked']
+            except Exception as e:
+                print(f"Error contacting scoring service: {e}")
+        try:
+            engine = RankingEngine(load_models=self.scoring_client is None, quantize=quantize, chunked=chunked,
+                                   readonly=self.scoring_client is not None)
+        except Exception as e:
+            print(f"Error loading ranking engine: {e}")
+            self.root.after(0, self.model_status_var.set, "Loading candidates and jobs failed")
+            return
+        if self.scoring_client:
+            self.scoring_client.embedding_tag = engine.embedding_tag
+        self.root.after(0, self.on_engine_loaded, engine)
+        
+    def on_engine_loaded(self, engine):
+        self.engine = engine
+        if not self.scoring_client:
+            self.model_status_var.set("Loading models...")
+        # Build the tab that was selected while loading
+        self.on_tab_changed(None)
+        
+    def engine_loaded(self):
+        if self.engine is None:
+            messagebox.showinfo("Loading", "Candidates and jobs are still loading, try again in a moment")
+            return False
+        return True
+        
+    def save_indexes_periodically(self):
+        if self.index_save_thread is None or not self.index_save_thread.is_alive():
+            self.index_save_thread = threading.Thread(target=self.save_indexes, daemon=True)
+            self.index_save_thread.start()
+        self.root.after(INDEX_SAVE_MS, self.save_indexes_periodically)
+        
+    def save_indexes(self):
+        if self.engine is None:
+            return
+        try:
+            self.engine.save_indexes()
+        except Exception as e:
+            print(f"Error saving indexes: {e}")
+        
+    def on_close(self):
+        # Let a load in progress finish rather than cut off its migrations
+        self.engine_thread.join()
+        # Fold this session's job edits back into the jobs file before exiting
+        try:
+            if self.engine is not None:
+                self.engine.job_catalog.compact()
+        except Exception as e:
+            print(f"Error compacting job edits: {e}")
+        if self.index_save_thread is not None:
+            self.index_save_thread.join()
+        self.save_indexes()
+        self.root.destroy()
+        
+    def load_logo(self, logo_path, thumbnail_path):
+        """
+        Load the 150x150 header logo, reusing a cached thumbnail when it's newer than the source.
+        """
+        if os.path.exists(thumbnail_path) and os.path.getmtime(thumbnail_path) >= os.path.getmtime(logo_path):
+            return tk.PhotoImage(file=thumbnail_path)
+        
+        # Only pay for PIL and the LANCZOS resize when the thumbnail is missing or stale
+        from PIL import Image, ImageTk
+        logo_img = Image.open(logo_path)
+        logo_img = logo_img.resize((150, 150), Image.Resampling.LANCZOS)
+        try:
+            logo_img.save(thumbnail_path)
+        except OSError as e:
+            print(f"Error caching logo thumbnail: {e}")
+        return ImageTk.PhotoImage(logo_img)
+        
+    def record_startup_time(self):
+        self.metrics['startup_seconds'] = time.perf_counter() - PROCESS_START
+        print(f"Startup: window ready in {self.metrics['startup_seconds']:.2f}s")
+        
+    def poll_model_status(self):
+        if self.engine is None:
+            self.root.after(200, self.poll_model_status)
+            return
+        if self.scoring_client:
+            self.check_scoring_service()
+            return
+        if self.engine.models.error is not None:
+            self.model_status_var.set("Model loading failed")
+            return
+        if not self.engine.models.is_ready():
+            self.root.after(200, self.poll_model_status)
+            return
+        
+        self.metrics['model_load_seconds'] = (self.engine.models.model_load_time or 0) + (self.engine.models.nlp_load_time or 0)
+        precision = ", int8" if self.engine.models.quantize else ""
+        self.model_status_var.set(f"Models ready ({self.metrics['model_load_seconds']:.1f}s{precision})")
+        print(f"Models loaded in {self.metrics['model_load_seconds']:.2f}s")
+        
+    def check_scoring_service(self):
+        def run():
+            try:
+                health = self.scoring_client.health()
+                status = "ready" if health['models_ready'] else "loading models"
+                message = f"Scoring service {status} ({self.scoring_client.url})"
+                if health['embedding_tag'] != self.engine.embedding_tag:
+                    # Restarted with other --quantize/--chunked flags: its results go to another store
+                    message = (f"Scoring service uses {health['embedding_tag']} embeddings, "
+                               f"this window reads {self.engine.embedding_tag}; restart it")
+            except Exception as e:
+                message = f"Scoring service unreachable ({self.scoring_client.url})"
+                print(f"Error contacting scoring service: {e}")
+            self.root.after(0, self.model_status_var.set, message)
+        
+        threading.Thread(target=run, daemon=True).start()
+        
     def setup_header(self):
         header_frame = ttk.Frame(self.main_container, style='Dark.TFrame')
         header_frame.grid(row=0, column=0, sticky="ew", pady=(0, 20))
@@ -140,6 +314,15 @@ class ModernResumeRankingGUI:
         )
         desc_label.grid(row=1, column=1, sticky="w")
         
+        # Model ready indicator
+        self.model_status_var = tk.StringVar(value="Loading candidates and jobs...")
+        ttk.Label(
+            header_frame,
+            textvariable=self.model_status_var,
+            font=('Helvetica', 10, 'italic'),
+            style='Dark.TLabel'
+        ).grid(row=2, column=1, sticky="w")
+        
     def setup_tabs(self):
         # Configure notebook and tab styles with proper contrast
         self.style.configure('Dark.TNotebook',
@@ -166,18 +349,37 @@ class ModernResumeRankingGUI:
         self.rankings_tab = ttk.Frame(self.tab_control, style='Dark.TFrame')
         self.job_desc_tab = ttk.Frame(self.tab_control, style='Dark.TFrame')
         self.about_tab = ttk.Frame(self.tab_control, style='Dark.TFrame')
+        self.diagnostics_tab = ttk.Frame(self.tab_control, style='Dark.TFrame')
         
         # Add tabs to notebook
         self.tab_control.add(self.add_candidate_tab, text='Add Candidate')
         self.tab_control.add(self.rankings_tab, text='Rankings')
         self.tab_control.add(self.job_desc_tab, text='Job Description')
         self.tab_control.add(self.about_tab, text='About')
+        self.tab_control.add(self.diagnostics_tab, text='Diagnostics')
+        
+        # Tabs are built the first time they're selected, the ones reading candidates or jobs
+        # once the engine has loaded
+        self.engine_tabs = {str(self.rankings_tab), str(self.job_desc_tab), str(self.diagnostics_tab)}
+        self.tab_builders = {
+            str(self.add_candidate_tab): self.setup_add_candidate_tab,
+            str(self.rankings_tab): self.setup_rankings_tab,
+            str(self.job_desc_tab): self.setup_job_desc_tab,
+            str(self.about_tab): self.setup_about_tab,
+            str(self.diagnostics_tab): self.setup_diagnostics_tab
+        }
+        self.tab_control.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        
+        # Build the tab that's visible at startup
+        self.on_tab_changed(None)
         
-        # Setup individual tabs
-        self.setup_add_candidate_tab()
-        self.setup_rankings_tab()
-        self.setup_job_desc_tab()
-        self.setup_about_tab()
+    def on_tab_changed(self, event):
+        tab = self.tab_control.select()
+        if self.engine is None and tab in self.engine_tabs:
+            return
+        builder = self.tab_builders.pop(tab, None)
+        if builder:
+            builder()
         
     def setup_about_tab(self):
         # Main frame for the about tab
@@ -334,6 +536,184 @@ class ModernResumeRankingGUI:
         
         about_frame.bind("<Destroy>", on_destroy)
 
+    def setup_diagnostics_tab(self):
+        diagnostics_frame = ttk.Frame(self.diagnostics_tab, style='Dark.TFrame', padding="20")
+        diagnostics_frame.pack(fill="both", expand=True)
+        
+        # Process-wide numbers
+        summary_frame = ttk.LabelFrame(diagnostics_frame, text="Process", style='Dark.TFrame', padding="10")
+        summary_frame.pack(fill="x", pady=(0, 10))
+        
+        self.diagnostics_vars = {}
+        for row, (key, label) in enumerate([
+            ('startup', "Startup time"),
+            ('model_load', "Model load time"),
+            ('rss', "Process RSS"),
+            ('cache', "Embedding cache"),
+            ('text_cache', "PDF text cache"),
+            ('throughput', "Encoder throughput"),
+            ('candidates', "Candidates stored"),
+        ]):
+            ttk.Label(summary_frame, text=label, style='Dark.TLabel').grid(row=row, column=0, sticky="w", padx=5, pady=2)
+            self.diagnostics_vars[key] = tk.StringVar(value="--")
+            ttk.Label(summary_frame, textvariable=self.diagnostics_vars[key], style='Dark.TLabel').grid(
+                row=row, column=1, sticky="w", padx=20, pady=2
+            )
+        
+        # One latency histogram per instrumented stage
+        histogram_frame = ttk.LabelFrame(
+            diagnostics_frame, text="Stage latency (last 1000 calls)", style='Dark.TFrame', padding="10"
+        )
+        histogram_frame.pack(fill="both", expand=True)
+        
+        self.histogram_canvas = tk.Canvas(histogram_frame, bg=self.colors['secondary'], highlightthickness=0)
+        self.histogram_canvas.pack(fill="both", expand=True)
+        
+        button_frame = ttk.Frame(diagnostics_frame, style='Dark.TFrame')
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Refresh", command=self.refresh_diagnostics).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Export Trace", command=self.export_trace).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Quantization Check", command=self.run_quantization_check).pack(side="left", padx=5)
+        
+        self.refresh_diagnostics()
+        self.root.after(2000, self.poll_diagnostics)
+        
+    def poll_diagnostics(self):
+        # Keep refreshing while the Diagnostics tab is the one on screen
+        if self.tab_control.select() == str(self.diagnostics_tab):
+            self.refresh_diagnostics()
+        self.root.after(2000, self.poll_diagnostics)
+        
+    def refresh_diagnostics(self):
+        models = self.engine.models
+        startup = self.metrics.get('startup_seconds')
+        self.diagnostics_vars['startup'].set(f"{startup:.2f}s" if startup is not None else "--")
+        if models.model_load_time is not None:
+            self.diagnostics_vars['model_load'].set(f"{models.model_load_time:.2f}s ({self.engine.embedding_tag})")
+        elif self.scoring_client:
+            self.diagnostics_vars['model_load'].set("Models run in the scoring service")
+        else:
+            self.diagnostics_vars['model_load'].set("Loading...")
+        
+        rss = process_rss()
+        self.diagnostics_vars['rss'].set(f"{rss / 2**20:.0f} MB" if rss is not None else "unavailable")
+        
+        stats = self.engine.embedding_cache.stats()
+        self.diagnostics_vars['cache'].set(
+            f"{stats['hit_rate']*100:.1f}% hit rate ({stats['memory_hits']} memory, {stats['disk_hits']} disk, "
+            f"{stats['misses']} misses)"
+        )
+        stats = self.engine.pdf_extractor.stats()
+        self.diagnostics_vars['text_cache'].set(
+            f"{stats['hit_rate']*100:.1f}% hit rate ({stats['hits']} hits, {stats['misses']} misses)"
+        )
+        if self.engine.chunked_encoder:
+            stats = self.engine.chunked_encoder.stats()
+            self.diagnostics_vars['throughput'].set(
+                f"{stats['tokens_per_sec']:.0f} tokens/sec ({stats['tokens']} tokens, {stats['chunks']} chunks)"
+            )
+        else:
+            self.diagnostics_vars['throughput'].set("Chunked encoding off (ATOMS_CHUNKED=1 to enable)")
+        self.diagnostics_vars['candidates'].set(str(len(self.engine.results_store)))
+        
+        self.draw_histograms()
+        
+    def draw_histograms(self, bins=20):
+        canvas = self.histogram_canvas
+        canvas.delete("all")
+        width = max(canvas.winfo_width(), 400)
+        
+        summary = tracer.summary()
+        if not summary:
+            canvas.create_text(10, 10, anchor="nw", fill=self.colors['text'], text="No stages recorded yet")
+            return
+        
+        row_height = 60
+        label_width = 320
+        plot_width = width - label_width - 20
+        for row, (name, stats) in enumerate(summary.items()):
+            top = row * row_height + 5
+            canvas.create_text(
+                10, top + 5, anchor="nw", fill=self.colors['fg'], font=('Helvetica', 10, 'bold'), text=name
+            )
+            canvas.create_text(
+                10, top + 25, anchor="nw", fill=self.colors['text'], font=('Helvetica', 9),
+                text=f"n={stats['count']}  p50 {stats['p50_ms']:.1f} ms  p95 {stats['p95_ms']:.1f} ms  "
+                     f"max {stats['max_ms']:.1f} ms"
+            )
+            
+            # Log-spaced buckets so fast and slow calls both show up
+            durations = np.array(tracer.durations(name)) * 1000
+            low = max(durations.min(), 1e-3)
+            high = max(durations.max(), low * 1.01)
+            counts, _ = np.histogram(durations, bins=np.geomspace(low, high, bins + 1))
+            bar_width = plot_width / bins
+            for i, count in enumerate(counts):
+                if not count:
+                    continue
+                bar_height = (row_height - 15) * count / counts.max()
+                x = label_width + i * bar_width
+                canvas.create_rectangle(
+                    x, top + row_height - 10 - bar_height, x + bar_width - 1, top + row_height - 10,
+                    fill=self.colors['accent'], outline=""
+                )
+        
+        canvas.configure(height=len(summary) * row_height + 10)
+        
+    def export_trace(self):
+        path = filedialog.asksaveasfilename(
+            title="Export Trace",
+            defaultextension=".json",
+            initialfile="atoms_trace.json",
+            filetypes=[("Chrome trace", "*.json")]
+        )
+        if not path:
+            return
+        try:
+            count = tracer.export_trace(path)
+            messagebox.showinfo("Export Complete", f"Wrote {count} stage events to {path}\n\nOpen it in chrome://tracing or Perfetto.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export trace: {str(e)}")
+        
+    def run_quantization_check(self):
+        """
+        Compare int8 and fp32 encoding speed and ranking agreement on the stored candidates' PDFs.
+        """
+        folder = filedialog.askdirectory(title="Select the folder with the candidates' resumes")
+        if not folder:
+            return
+        
+        try:
+            jobs = self.engine.read_jobs()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load jobs: {str(e)}")
+            return
+        
+        results = queue.Queue()
+        
+        def run():
+            try:
+                from quantization import run_check, format_report
+                stored_files = set(self.engine.results_store.resume_files().values())
+                results.put(format_report(run_check(folder, jobs, self.engine.models.model_name, stored_files)))
+            except Exception as e:
+                results.put(e)
+        
+        def poll():
+            try:
+                result = results.get_nowait()
+            except queue.Empty:
+                self.root.after(500, poll)
+                return
+            
+            if isinstance(result, Exception):
+                messagebox.showerror("Error", f"Quantization check failed: {str(result)}")
+            else:
+                messagebox.showinfo("Quantization Check", result)
+        
+        threading.Thread(target=run, daemon=True).start()
+        self.root.after(500, poll)
+        
     def setup_other_tabs_sizing(self):
         # Adjust Rankings tab
         if hasattr(self, 'rankings_tab'):
@@ -350,13 +730,6 @@ class ModernResumeRankingGUI:
             for child in self.add_candidate_tab.winfo_children():
                 child.grid_configure(padx=40, pady=40)
 
-    def load_data(self):
-        try:
-            with open('hybrid_matching_results.json', 'r') as f:
-                self.rankings_data = json.load(f)
-        except FileNotFoundError:
-            self.rankings_data = []
-            
     def setup_add_candidate_tab(self):
         # Create form frame with dark theme
         form_frame = ttk.LabelFrame(
@@ -411,14 +784,41 @@ class ModernResumeRankingGUI:
         )
         self.progress_bar.grid(row=2, column=0, columnspan=3, sticky="ew", pady=10)
         
-        # Submit button
-        submit_btn = ttk.Button(
+        # Throughput / ETA readout for the progress bar
+        self.progress_status_var = tk.StringVar()
+        ttk.Label(
             form_frame,
+            textvariable=self.progress_status_var,
+            style='Dark.TLabel'
+        ).grid(row=3, column=0, columnspan=3, sticky="w")
+        
+        # Submit and folder import buttons
+        button_frame = ttk.Frame(form_frame, style='Dark.TFrame')
+        button_frame.grid(row=4, column=0, columnspan=3, pady=20)
+        
+        submit_btn = ttk.Button(
+            button_frame,
             text="Add Candidate",
             command=self.add_candidate,
             style='Dark.TButton'
         )
-        submit_btn.grid(row=3, column=0, columnspan=3, pady=20)
+        submit_btn.pack(side="left", padx=5)
+        
+        import_btn = ttk.Button(
+            button_frame,
+            text="Import Folder",
+            command=self.import_folder,
+            style='Dark.TButton'
+        )
+        import_btn.pack(side="left", padx=5)
+        
+        cancel_btn = ttk.Button(
+            button_frame,
+            text="Cancel",
+            command=self.cancel_processing,
+            style='Dark.TButton'
+        )
+        cancel_btn.pack(side="left", padx=5)
         
     def setup_rankings_tab(self):
         rankings_frame = ttk.Frame(self.rankings_tab, style='Dark.TFrame', padding="20")
@@ -429,7 +829,6 @@ class ModernResumeRankingGUI:
         table_frame.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
         
         columns = ('Rank', 'Name', 'File', 'Combined Score', 'Transformer Score', 'TFIDF Score', 'Section Score')
-        self.tree = ttk.Treeview(table_frame, columns=columns, show='headings', style='Treeview')
         
         column_widths = {
             'Rank': 50,
@@ -441,17 +840,17 @@ class ModernResumeRankingGUI:
             'Section Score': 120
         }
         
-        for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=column_widths[col], anchor='center')
-        
-        y_scrollbar = ttk.Scrollbar(table_frame, orient='vertical', command=self.tree.yview)
-        x_scrollbar = ttk.Scrollbar(table_frame, orient='horizontal', command=self.tree.xview)
-        self.tree.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
-        
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        y_scrollbar.grid(row=0, column=1, sticky="ns")
-        x_scrollbar.grid(row=1, column=0, sticky="ew")
+        # Only the rows on screen exist in the Treeview; pages are read from the results database
+        self.rankings_view = VirtualTreeview(
+            table_frame, columns, column_widths,
+            fetch=lambda offset, limit: self.rankings_source().ranked(limit, offset),
+            count=lambda: len(self.rankings_source()),
+            row_values=lambda index, candidate: self.ranking_values(index + 1, candidate)
+        )
+        self.tree = self.rankings_view.tree
+        self.rankings_view.grid(row=0, column=0)
+        table_frame.grid_rowconfigure(0, weight=1)
+        table_frame.grid_columnconfigure(0, weight=1)
         
         # Recently Added section
         recent_frame = ttk.LabelFrame(rankings_frame, text="Recently Added", style='Dark.TFrame', padding="10")
@@ -471,11 +870,44 @@ class ModernResumeRankingGUI:
         recent_y_scrollbar.grid(row=0, column=1, sticky="ns")
         recent_x_scrollbar.grid(row=1, column=0, sticky="ew")
         
+        # Score weights: moving a slider re-ranks the stored scores without re-scoring anything
+        weights_frame = ttk.LabelFrame(rankings_frame, text="Score Weights", style='Dark.TFrame', padding="10")
+        weights_frame.grid(row=0, column=1, rowspan=2, sticky="ns", padx=5, pady=5)
+        
+        self.score_weight_vars = {}
+        self.section_weight_vars = {}
+        self.weight_labels = []
+        weight_rows = (
+            [(self.score_weight_vars, key, key.capitalize() if key != 'tfidf' else "TF-IDF", value)
+             for key, value in SCORE_WEIGHTS.items()] +
+            [(self.section_weight_vars, key, f"{key.capitalize()} section", value)
+             for key, value in default_section_weights().items()]
+        )
+        for row, (weight_vars, key, label, value) in enumerate(weight_rows):
+            weight_vars[key] = tk.DoubleVar(value=value)
+            ttk.Label(weights_frame, text=label, style='Dark.TLabel').grid(row=row * 2, column=0, sticky="w")
+            value_label = ttk.Label(weights_frame, text=f"{value:.2f}", style='Dark.TLabel')
+            value_label.grid(row=row * 2, column=1, sticky="e")
+            self.weight_labels.append((weight_vars[key], value_label))
+            ttk.Scale(
+                weights_frame, from_=0.0, to=1.0, variable=weight_vars[key], length=160,
+                command=lambda _, var=weight_vars[key], value_label=value_label: self.on_weight_change(var, value_label)
+            ).grid(row=row * 2 + 1, column=0, columnspan=2, sticky="ew", pady=(0, 8))
+        
+        ttk.Button(weights_frame, text="Reset Weights", command=self.reset_weights).grid(
+            row=len(weight_rows) * 2, column=0, columnspan=2, pady=(5, 0)
+        )
+        
         rankings_frame.grid_rowconfigure(0, weight=3)
         rankings_frame.grid_rowconfigure(1, weight=1)
         rankings_frame.grid_columnconfigure(0, weight=1)
         
-        ttk.Button(rankings_frame, text="Refresh Rankings", command=self.update_rankings_display).grid(row=2, column=0, pady=10)
+        rankings_buttons = ttk.Frame(rankings_frame, style='Dark.TFrame')
+        rankings_buttons.grid(row=2, column=0, columnspan=2, pady=10)
+        
+        ttk.Button(rankings_buttons, text="Refresh Rankings", command=self.update_rankings_display).pack(side="left", padx=5)
+        ttk.Button(rankings_buttons, text="Match All Jobs", command=self.match_all_jobs).pack(side="left", padx=5)
+        ttk.Button(rankings_buttons, text="Export JSON", command=self.export_rankings).pack(side="left", padx=5)
         
         self.update_rankings_display()
         
@@ -496,6 +928,12 @@ class ModernResumeRankingGUI:
             style='Dark.TLabel'
         ).pack(pady=(0, 10))
         
+        # Type-ahead filter over the job titles
+        self.job_filter_var = tk.StringVar()
+        job_filter_entry = ttk.Entry(left_panel, textvariable=self.job_filter_var, width=40)
+        job_filter_entry.pack(fill="x", pady=(0, 5))
+        self.job_filter_var.trace_add('write', lambda *args: self.filter_jobs())
+        
         # Create listbox for jobs with scrollbar
         job_list_frame = ttk.Frame(left_panel, style='Dark.TFrame')
         job_list_frame.pack(fill="both", expand=True)
@@ -556,6 +994,13 @@ class ModernResumeRankingGUI:
             style='Dark.TButton'
         ).pack(side="right", padx=5)
         
+        ttk.Button(
+            button_frame,
+            text="Top Candidates",
+            command=self.find_top_candidates,
+            style='Dark.TButton'
+        ).pack(side="right", padx=5)
+        
         # Load existing jobs
         self.load_jobs()
         
@@ -563,33 +1008,40 @@ class ModernResumeRankingGUI:
         self.job_listbox.bind('<<ListboxSelect>>', self.on_job_select)
 
     def load_jobs(self):
-        try:
-            with open("D:/ATOMS/jobfiles/normalized_jobs.json", 'r', encoding='utf-8') as file:
-                self.jobs_data = json.load(file)
-                
-                # Clear existing items
-                self.job_listbox.delete(0, tk.END)
-                
-                # Add jobs to listbox
-                for job in self.jobs_data:
-                    # Use file_name as the job title in the list
-                    job_title = job.get('file_name', 'Untitled Job')
-                    self.job_listbox.insert(tk.END, job_title)
+        # Only the titles are read here; a job's body is loaded when it's selected
+        self.job_catalog = self.engine.job_catalog
+        self.job_titles = []
+        self.job_list_positions = []
+        with tracer.stage('load_jobs'):
+            try:
+                self.job_titles = self.job_catalog.titles()
+                self.filter_jobs()
                 
                 # Select first job if available
                 if self.job_listbox.size() > 0:
                     self.job_listbox.selection_set(0)
                     self.on_job_select(None)
                     
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load jobs: {str(e)}")
-            self.jobs_data = []
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load jobs: {str(e)}")
 
-    def on_job_select(self, event):
+    def filter_jobs(self):
+        # Listbox rows -> catalog positions of the jobs matching the filter
+        if not self.job_titles:
+            return
+        self.job_list_positions = self.job_catalog.search(self.job_filter_var.get())
+        self.job_listbox.delete(0, tk.END)
+        if self.job_list_positions:
+            self.job_listbox.insert(tk.END, *[self.job_titles[position] for position in self.job_list_positions])
+
+    def selected_job_position(self):
         selection = self.job_listbox.curselection()
-        if selection:
-            index = selection[0]
-            job_data = self.jobs_data[index]
+        return self.job_list_positions[selection[0]] if selection else None
+
+    def on_job_select(self, event):
+        position = self.selected_job_position()
+        if position is not None:
+            job_data = self.job_catalog.get(position)
             
             # Clear current text
             self.job_desc_text.delete('1.0', tk.END)
@@ -628,9 +1080,8 @@ class ModernResumeRankingGUI:
             self.job_desc_text.configure(state='normal')
 
     def save_job_description(self):
-        selection = self.job_listbox.curselection()
-        if selection:
-            index = selection[0]
+        position = self.selected_job_position()
+        if position is not None:
             
             # Get the text content
             content = self.job_desc_text.get('1.0', tk.END).strip()
@@ -645,6 +1096,8 @@ class ModernResumeRankingGUI:
                     if current_section and current_content:
                         sections[current_section.lower()] = '\n'.join(current_content).strip()
                     current_section = line[:-1].lower()
+                    # Headers shown by on_job_select map back to their section keys
+                    current_section = JOB_SECTION_HEADERS.get(current_section, current_section)
                     current_content = []
                 else:
                     current_content.append(line)
@@ -653,13 +1106,15 @@ class ModernResumeRankingGUI:
             if current_section and current_content:
                 sections[current_section.lower()] = '\n'.join(current_content).strip()
             
-            # Update the jobs data
-            self.jobs_data[index]['sections'] = sections
+            # Update the job; sections the editor doesn't show are kept, and its
+            # full text is rebuilt so the edit changes the whole-resume scores too
+            job = edit_job_sections(self.job_catalog.get(position), sections)
             
             try:
-                with open("D:/ATOMS/jobfiles/normalized_jobs.json", 'w', encoding='utf-8') as file:
-                    json.dump(self.jobs_data, file, indent=2, ensure_ascii=False)
+                # Only this job is written, at its own position even if another job shares its title
+                self.job_catalog.save(job, position)
                 messagebox.showinfo("Success", "Job description saved successfully!")
+                self.rerank_job(job, position)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save job description: {str(e)}")
 
@@ -707,15 +1162,13 @@ class ModernResumeRankingGUI:
                     "qualifications": []
                 }
                 
-                self.jobs_data.append(new_job)
-                
                 try:
-                    with open("D:/ATOMS/jobfiles/normalized_jobs.json", 'w') as file:
-                        json.dump(self.jobs_data, file, indent=2)
-                    
-                    self.job_listbox.insert(tk.END, title)
+                    position = self.job_catalog.save(new_job)
+                    self.job_titles = self.job_catalog.titles()
+                    self.filter_jobs()
                     new_job_window.destroy()
                     messagebox.showinfo("Success", "New job added successfully!")
+                    self.rerank_job(new_job, position)
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to save new job: {str(e)}")
             else:
@@ -737,6 +1190,8 @@ class ModernResumeRankingGUI:
             self.resume_path_var.set(filename)
             
     def add_candidate(self):
+        if not self.engine_loaded():
+            return
         name = self.name_var.get().strip()
         resume_path = self.resume_path_var.get().strip()
         
@@ -748,318 +1203,524 @@ class ModernResumeRankingGUI:
             messagebox.showerror("Error", "Resume file not found")
             return
             
-        try:
-            # Process the resume and get scores
-            scores = self.process_resume(resume_path)
-            
-            # Add to rankings data
-            candidate_data = {
-                'resume_file': os.path.basename(resume_path),
-                'candidate_name': name,
-                'transformer_score': scores['transformer_score'],
-                'tfidf_score': scores['tfidf_score'],
-                'section_score': scores['section_score'],
-                'combined_score': scores['combined_score'],
-                'section_details': scores['section_details']
-            }
-            
-            self.rankings_data.append(candidate_data)
-            
-            # Sort rankings
-            self.rankings_data.sort(key=lambda x: x['combined_score'], reverse=True)
+        # Queue the resume for the background worker and free the form for the next one
+        self.scoring_worker.submit(name, resume_path)
+        
+        # Clear form
+        self.name_var.set("")
+        self.resume_path_var.set("")
             
-            # Save updated data
-            with open('hybrid_matching_results.json', 'w') as f:
-                json.dump(self.rankings_data, f, indent=2)
+    def score_candidate(self, name, resume_path, progress):
+        # Runs on the scoring worker thread, so no Tk calls in here
+        if self.scoring_client:
+            progress(10, "Scoring on service")
+            # The service stores the candidate itself
+            return self.scoring_client.score_resume(resume_path, name, save=True)['record']
+        
+        try:
+            scores = self.engine.process_resume(resume_path, progress=progress)
+        except ScoringCancelled:
+            raise
+        except Exception as e:
+            import traceback
+            error_details = traceback.format_exc()
+            raise Exception(f"Failed to process resume: {str(e)}\n\nDetails:\n{error_details}")
+        return build_candidate_data(name, resume_path, scores)
+        
+    def poll_scoring_events(self):
+        """
+        Drain scoring worker events on the Tk thread.
+        """
+        try:
+            while True:
+                event = self.scoring_events.get_nowait()
+                kind = event[0]
                 
-            # Update display
-            self.update_rankings_display()
+                if kind == 'queued':
+                    _, _, name, pending = event
+                    self.progress_status_var.set(f"Queued {name} ({pending} in queue)")
+                elif kind == 'progress':
+                    _, _, percent, stage = event
+                    self.progress_var.set(percent)
+                    pending = self.scoring_worker.pending()
+                    self.progress_status_var.set(f"{stage}... ({pending} in queue)")
+                elif kind == 'finished':
+                    _, _, candidate_data, pending = event
+                    try:
+                        self.save_rankings([candidate_data])
+                    except Exception as e:
+                        messagebox.showerror("Error", f"Failed to save rankings: {str(e)}")
+                    self.update_rankings_display()
+                    duplicate_of = candidate_data.get('duplicate_of')
+                    if duplicate_of:
+                        # Duplicates are linked by id; show the stored candidate's file
+                        duplicate_of = self.engine.results_store.resume_files().get(duplicate_of, duplicate_of)
+                        similarity = candidate_data['duplicate_similarity']
+                        match = "identical to" if similarity >= 1.0 else f"{similarity*100:.0f}% similar to"
+                        self.progress_status_var.set(
+                            f"{candidate_data['candidate_name']} is {match} {duplicate_of} ({pending} in queue)"
+                        )
+                    else:
+                        self.progress_status_var.set(f"Added {candidate_data['candidate_name']} ({pending} in queue)")
+                    if pending == 0:
+                        self.progress_var.set(0)
+                        if duplicate_of:
+                            messagebox.showinfo(
+                                "Duplicate Resume",
+                                f"This resume is {match} {duplicate_of}, which is already stored.\n"
+                                "Its stored scores were reused and no new ranking was added."
+                            )
+                        else:
+                            messagebox.showinfo("Success", "Candidate added successfully!")
+                elif kind == 'failed':
+                    _, _, name, message, pending = event
+                    self.progress_var.set(0)
+                    self.progress_status_var.set(f"Failed to add {name} ({pending} in queue)")
+                    messagebox.showerror("Error", f"Failed to process resume: {message}")
+                elif kind == 'cancelled':
+                    _, _, name, pending = event
+                    self.progress_var.set(0)
+                    self.progress_status_var.set(f"Cancelled {name} ({pending} in queue)")
+        except queue.Empty:
+            pass
+        
+        self.root.after(100, self.poll_scoring_events)
+        
+    def cancel_processing(self):
+        # Stop the running candidate, everything queued behind it, and any folder import
+        self.scoring_worker.cancel()
+        if self.bulk_importer and self.bulk_importer.is_running():
+            self.bulk_importer.cancel()
+            self.progress_status_var.set("Cancelling folder import...")
             
-            # Clear form
-            self.name_var.set("")
-            self.resume_path_var.set("")
-            self.progress_var.set(0)
+    def save_rankings(self, records):
+        # A scoring service has already stored what it scored
+        if not self.scoring_client:
+            self.engine.save(records)
             
-            messagebox.showinfo("Success", "Candidate added successfully!")
+    def import_folder(self):
+        if not self.engine_loaded():
+            return
+        if self.bulk_importer and self.bulk_importer.is_running():
+            messagebox.showwarning("Warning", "A folder import is already running")
+            return
+            
+        folder = filedialog.askdirectory(title="Select Resume Folder")
+        if not folder:
+            return
             
+        try:
+            current_job = self.engine.load_current_job()
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to process resume: {str(e)}")
+            messagebox.showerror("Error", f"Failed to load job description: {str(e)}")
+            return
+        
+        def score_batch(batch):
+            # Runs on the importer's embedding thread
+            if self.scoring_client:
+                results = self.scoring_client.score_resumes([
+                    {
+                        'resume_id': resume_id(pdf_path),
+                        'resume_file': os.path.basename(pdf_path),
+                        'resume_text': resume_text,
+                        'sections': resume_sections,
+                        'name': os.path.splitext(os.path.basename(pdf_path))[0]
+                    }
+                    for pdf_path, resume_text, resume_sections in batch
+                ], job=current_job, save=True)
+                return [result['record'] for result in results]
             
-    def process_resume(self, resume_path):
+            scores = self.engine.score_resumes(
+                [(resume_id(pdf_path), resume_text, resume_sections)
+                 for pdf_path, resume_text, resume_sections in batch],
+                current_job
+            )
+            return [
+                build_candidate_data(os.path.splitext(os.path.basename(pdf_path))[0], pdf_path, score)
+                for (pdf_path, _, _), score in zip(batch, scores)
+            ]
+        
+        self.bulk_events = queue.Queue()
+        self.bulk_errors = []
+        self.bulk_duplicates = 0
+        self.progress_var.set(0)
+        self.progress_status_var.set("Scanning folder...")
+        
+        self.bulk_importer = BulkImporter(folder, score_batch, self.bulk_events,
+                                          text_cache_dir=self.engine.pdf_extractor.cache.cache_dir)
+        self.bulk_importer.start()
+        self.root.after(100, self.poll_bulk_import)
+        
+    def poll_bulk_import(self):
         """
-        Process a resume using the hybrid matching approach from the notebook.
+        Drain folder import events on the Tk thread and stream results into the rankings.
         """
-        self.progress_var.set(10)
-        self.root.update()
-
+        new_records = []
+        finished = None
+        
         try:
-            # Extract text from PDF with proper encoding handling
-            doc = fitz.open(resume_path)
-            resume_text = ""
-            for page in doc:
-                resume_text += page.get_text()
-            doc.close()
-            
-            # Load job description with UTF-8 encoding
+            while True:
+                event = self.bulk_events.get_nowait()
+                kind = event[0]
+                
+                if kind == 'results':
+                    new_records.extend(event[1])
+                    self.bulk_duplicates += sum(1 for record in event[1] if record.get('duplicate_of'))
+                elif kind == 'progress':
+                    _, processed, total, rate, eta = event
+                    self.progress_var.set(processed / total * 100 if total else 0)
+                    eta_text = f"{eta:.0f}s" if eta is not None else "--"
+                    self.progress_status_var.set(
+                        f"{processed}/{total} resumes  |  {rate:.1f} resumes/sec  |  ETA {eta_text}"
+                    )
+                elif kind == 'error':
+                    _, pdf_path, message = event
+                    self.bulk_errors.append((pdf_path, message))
+                    print(f"Failed to import {pdf_path}: {message}")
+                elif kind == 'done':
+                    finished = event
+        except queue.Empty:
+            pass
+        
+        if new_records:
             try:
-                with open("D:/ATOMS/jobfiles/normalized_jobs.json", 'r', encoding='utf-8') as f:
-                    job_data = json.load(f)
-                    current_job = job_data[0]  # Use first job for now
-            except UnicodeDecodeError:
-                with open("D:/ATOMS/jobfiles/normalized_jobs.json", 'r', encoding='latin-1') as f:
-                    job_data = json.load(f)
-                    current_job = job_data[0]
-            
-            self.progress_var.set(30)
-            self.root.update()
-
-            # 1. Transformer-based matching
-            resume_embedding = self.model.encode(resume_text, convert_to_tensor=True)
-            job_embedding = self.model.encode(current_job["structured_text"], convert_to_tensor=True)
-            transformer_score = float(util.pytorch_cos_sim(job_embedding, resume_embedding)[0][0].cpu())
-
-            self.progress_var.set(50)
-            self.root.update()
-
-            # 2. Custom TF-IDF matching for two documents
-            tfidf_score = self.calculate_custom_similarity(current_job["structured_text"], resume_text)
-
-            self.progress_var.set(70)
-            self.root.update()
-
-            # 3. Section-based matching
-            section_comparisons = {
-                'experience': {'job_sections': ['experience'], 'weight': 0.35},
-                'education': {'job_sections': ['education'], 'weight': 0.15},
-                'skills': {'job_sections': ['skills', 'requirements'], 'weight': 0.30},
-                'summary': {'job_sections': ['summary', 'description'], 'weight': 0.20},
-            }
-
-            resume_sections = self.extract_sections(resume_text)
-            job_sections = current_job.get("sections", {})
-            
-            section_scores = {}
-            weighted_section_score = 0
-            total_weight = 0
-
-            for section_type, config in section_comparisons.items():
-                if section_type in resume_sections:
-                    resume_section_text = resume_sections[section_type]
-                    
-                    job_section_texts = []
-                    for job_section in config['job_sections']:
-                        if job_section in job_sections:
-                            job_section_texts.append(job_sections[job_section])
-
-                    if job_section_texts and resume_section_text:
-                        job_section_text = " ".join(job_section_texts)
-                        
-                        try:
-                            section_job_embedding = self.model.encode(job_section_text, convert_to_tensor=True)
-                            section_resume_embedding = self.model.encode(resume_section_text, convert_to_tensor=True)
-                            similarity = float(util.pytorch_cos_sim(section_job_embedding, section_resume_embedding)[0][0].cpu())
-                        except UnicodeEncodeError:
-                            job_section_text = job_section_text.encode('ascii', 'ignore').decode('ascii')
-                            resume_section_text = resume_section_text.encode('ascii', 'ignore').decode('ascii')
-                            section_job_embedding = self.model.encode(job_section_text, convert_to_tensor=True)
-                            section_resume_embedding = self.model.encode(resume_section_text, convert_to_tensor=True)
-                            similarity = float(util.pytorch_cos_sim(section_job_embedding, section_resume_embedding)[0][0].cpu())
-                        
-                        section_scores[section_type] = similarity
-                        weighted_section_score += similarity * config['weight']
-                        total_weight += config['weight']
-
-            section_score = weighted_section_score / total_weight if total_weight > 0 else 0.0
-
-            self.progress_var.set(90)
-            self.root.update()
-
-            # Calculate combined score
-            combined_score = (
-                transformer_score * 0.4 +    # 40% transformer
-                tfidf_score * 0.3 +         # 30% TF-IDF
-                section_score * 0.3          # 30% section-based
-            )
-
-            self.progress_var.set(100)
-            self.root.update()
-
-            return {
-                'transformer_score': transformer_score,
-                'tfidf_score': tfidf_score,
-                'section_score': section_score,
-                'combined_score': combined_score,
-                'section_details': section_scores
-            }
-
+                self.save_rankings(new_records)
+            except Exception as e:
+                print(f"Error saving rankings: {e}")
+            self.update_rankings_display()
+        
+        if finished is None:
+            self.root.after(200, self.poll_bulk_import)
+            return
+        
+        _, succeeded, failed, elapsed = finished
+        self.progress_status_var.set(f"Imported {succeeded} resumes in {elapsed:.1f}s ({failed} failed)")
+        
+        message = f"Imported {succeeded} resumes, {failed} failed."
+        if self.bulk_duplicates:
+            message += f"\n{self.bulk_duplicates} were duplicates of stored candidates and reused their scores."
+        if self.bulk_errors:
+            failed_files = "\n".join(os.path.basename(path) for path, _ in self.bulk_errors[:10])
+            message += f"\n\nFailed files:\n{failed_files}"
+            if len(self.bulk_errors) > 10:
+                message += f"\n...and {len(self.bulk_errors) - 10} more"
+        messagebox.showinfo("Import Complete", message)
+        
+    def match_all_jobs(self):
+        """
+        Score every job in normalized_jobs.json against every stored candidate on a background thread.
+        """
+        if self.all_jobs_thread and self.all_jobs_thread.is_alive():
+            messagebox.showwarning("Warning", "Matching against all jobs is already running")
+            return
+        
+        try:
+            jobs = self.engine.read_jobs()
         except Exception as e:
-            import traceback
-            error_details = traceback.format_exc()
-            raise Exception(f"Failed to process resume: {str(e)}\n\nDetails:\n{error_details}")
+            messagebox.showerror("Error", f"Failed to load jobs: {str(e)}")
+            return
+        
+        results = queue.Queue()
+        
+        def run():
+            try:
+                started = time.perf_counter()
+                if self.scoring_client:
+                    job_rankings, candidate_best_jobs = self.scoring_client.rank_jobs(jobs)
+                else:
+                    job_rankings, candidate_best_jobs = self.engine.match_jobs(jobs)
+                results.put((job_rankings, candidate_best_jobs, time.perf_counter() - started))
+            except Exception as e:
+                results.put(e)
+        
+        def poll():
+            try:
+                result = results.get_nowait()
+            except queue.Empty:
+                self.root.after(200, poll)
+                return
+            
+            if isinstance(result, Exception):
+                messagebox.showerror("Error", f"Failed to match all jobs: {str(result)}")
+                return
+            self.show_all_jobs_results(jobs, *result)
+        
+        self.all_jobs_thread = threading.Thread(target=run, daemon=True)
+        self.all_jobs_thread.start()
+        self.root.after(200, poll)
 
-    def calculate_custom_similarity(self, text1, text2):
+    def rerank_job(self, job, position):
         """
-        Calculate a custom similarity score between two texts using a simplified TF-IDF approach
+        Re-score every stored candidate against an edited or added job (at
+        `position` in the catalog) from the stored embeddings and TF-IDF rows
+        on a background thread, then refresh the Rankings tab. No PDF is read.
         """
-        import re
-        from collections import Counter
-        import math
-        
-        def preprocess_text(text):
-            # Convert to lowercase and split into words
-            text = text.lower()
-            # Remove special characters and split
-            words = re.findall(r'\w+', text)
-            # Remove common English stop words
-            stop_words = set(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
-            words = [w for w in words if w not in stop_words]
-            return words
-        
-        # Preprocess both texts
-        words1 = preprocess_text(text1)
-        words2 = preprocess_text(text2)
-        
-        # Calculate term frequencies
-        tf1 = Counter(words1)
-        tf2 = Counter(words2)
-        
-        # Get unique words from both documents
-        all_words = set(words1 + words2)
-        
-        # Calculate document frequencies
-        df = Counter()
-        for word in all_words:
-            if word in tf1:
-                df[word] += 1
-            if word in tf2:
-                df[word] += 1
-        
-        # Calculate TF-IDF vectors
-        def calculate_tfidf(tf_dict, doc_length):
-            tfidf_dict = {}
-            for word in all_words:
-                tf = tf_dict.get(word, 0) / doc_length
-                idf = math.log(2 / (df[word] + 1)) + 1  # Adding 1 for smoothing
-                tfidf_dict[word] = tf * idf
-            return tfidf_dict
-        
-        tfidf1 = calculate_tfidf(tf1, len(words1))
-        tfidf2 = calculate_tfidf(tf2, len(words2))
-        
-        # Calculate cosine similarity
-        numerator = sum(tfidf1.get(word, 0) * tfidf2.get(word, 0) for word in all_words)
-        magnitude1 = math.sqrt(sum(score * score for score in tfidf1.values()))
-        magnitude2 = math.sqrt(sum(score * score for score in tfidf2.values()))
-        
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0.0
-        
-        similarity = numerator / (magnitude1 * magnitude2)
-        return similarity
+        if self.rerank_thread and self.rerank_thread.is_alive():
+            self.pending_rerank = (job, position)
+            return
+        
+        results = queue.Queue()
+        
+        def run():
+            try:
+                started = time.perf_counter()
+                if self.scoring_client:
+                    updated = self.scoring_client.rerank_job(job, position)
+                else:
+                    updated = self.engine.rerank(job, position)
+                results.put((updated, self.engine.results_store.stale_count(), time.perf_counter() - started))
+            except Exception as e:
+                results.put(e)
+        
+        def poll():
+            try:
+                result = results.get_nowait()
+            except queue.Empty:
+                self.root.after(100, poll)
+                return
+            
+            self.rerank_thread = None
+            if isinstance(result, Exception):
+                messagebox.showerror("Error", f"Failed to re-rank candidates: {str(result)}")
+            else:
+                updated, stale, elapsed = result
+                message = f"Re-ranked {updated} candidates for {job_title(job)} in {elapsed:.2f}s"
+                if stale:
+                    message += f"; {stale} without stored vectors are marked stale"
+                self.model_status_var.set(message)
+                if self.reweighter is not None:
+                    # Every stored score changed, not just new rows
+                    self.reweighter.load(full=True)
+                    self.apply_weights()
+                self.update_rankings_display()
+            
+            if self.pending_rerank is not None:
+                pending, self.pending_rerank = self.pending_rerank, None
+                self.rerank_job(*pending)
+        
+        self.model_status_var.set(f"Re-ranking candidates for {job_title(job)}...")
+        self.rerank_thread = threading.Thread(target=run, daemon=True)
+        self.rerank_thread.start()
+        self.root.after(100, poll)
 
-    def extract_sections(self, text):
+    def find_top_candidates(self, retrieve_k=200, top_k=50):
         """
-        Extract sections from resume text using spaCy for better accuracy.
+        Retrieve the nearest candidates for the selected job from the ANN index,
+        then re-rank them with the full hybrid score.
         """
-        # Clean the text before processing
-        try:
-            text = text.encode('utf-8', 'ignore').decode('utf-8')
-        except UnicodeError:
-            text = text.encode('ascii', 'ignore').decode('ascii')
-        
-        sections = {
-            'experience': '',
-            'education': '',
-            'skills': '',
-            'summary': ''
-        }
+        position = self.selected_job_position()
+        if position is None:
+            messagebox.showwarning("Warning", "Select a job first")
+            return
+        job = self.job_catalog.get(position)
         
-        # Use spaCy to analyze the text
-        doc = self.nlp(text)
+        results = queue.Queue()
         
-        # Simple rule-based section extraction
-        current_section = None
-        section_text = []
+        def run():
+            try:
+                started = time.perf_counter()
+                if self.scoring_client:
+                    job_rankings = [self.scoring_client.rank_job(job, top_k, retrieve_k)]
+                    candidate_best_jobs = {doc_id: [(0, scores)] for doc_id, scores in job_rankings[0]}
+                else:
+                    job_rankings, candidate_best_jobs = self.engine.top_candidates(job, retrieve_k, top_k)
+                results.put((job_rankings, candidate_best_jobs, time.perf_counter() - started))
+            except Exception as e:
+                results.put(e)
         
-        for line in text.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Clean the line before processing
+        def poll():
             try:
-                line = line.encode('utf-8', 'ignore').decode('utf-8')
-            except UnicodeError:
-                line = line.encode('ascii', 'ignore').decode('ascii')
+                result = results.get_nowait()
+            except queue.Empty:
+                self.root.after(100, poll)
+                return
             
-            lower_line = line.lower()
-            if any(keyword in lower_line for keyword in ['experience', 'work history', 'employment']):
-                if current_section:
-                    sections[current_section] = ' '.join(section_text)
-                current_section = 'experience'
-                section_text = []
-            elif any(keyword in lower_line for keyword in ['education', 'academic', 'qualification']):
-                if current_section:
-                    sections[current_section] = ' '.join(section_text)
-                current_section = 'education'
-                section_text = []
-            elif any(keyword in lower_line for keyword in ['skills', 'technical', 'technologies', 'proficiency']):
-                if current_section:
-                    sections[current_section] = ' '.join(section_text)
-                current_section = 'skills'
-                section_text = []
-            elif any(keyword in lower_line for keyword in ['summary', 'profile', 'objective']):
-                if current_section:
-                    sections[current_section] = ' '.join(section_text)
-                current_section = 'summary'
-                section_text = []
-            elif current_section:
-                section_text.append(line)
-        
-        # Add the last section
-        if current_section:
-            sections[current_section] = ' '.join(section_text)
-        
-        return sections
+            if isinstance(result, Exception):
+                messagebox.showerror("Error", f"Failed to find top candidates: {str(result)}")
+                return
+            self.show_all_jobs_results([job], *result)
+        
+        threading.Thread(target=run, daemon=True).start()
+        self.root.after(100, poll)
+
+    def show_all_jobs_results(self, jobs, job_rankings, candidate_best_jobs, elapsed):
+        names = self.engine.results_store.names()
+        files = self.engine.results_store.resume_files()
+        job_titles = [job_title(job) for job in jobs]
+        
+        # Keep a JSON copy of both views next to the main results
+        export = {
+            'job_rankings': [
+                {
+                    'job': job_titles[j],
+                    'candidates': [
+                        dict(resume_file=files.get(doc_id, doc_id), candidate_name=names.get(doc_id, doc_id),
+                             **scores)
+                        for doc_id, scores in ranking
+                    ]
+                }
+                for j, ranking in enumerate(job_rankings)
+            ],
+            'candidate_best_jobs': [
+                {
+                    'resume_file': files.get(doc_id, doc_id),
+                    'candidate_name': names.get(doc_id, doc_id),
+                    'jobs': [dict(job=job_titles[j], **scores) for j, scores in best]
+                }
+                for doc_id, best in candidate_best_jobs.items()
+            ]
+        }
+        try:
+            with open('all_jobs_matching_results.json', 'w') as f:
+                json.dump(export, f, indent=2)
+        except Exception as e:
+            print(f"Error saving all-jobs results: {e}")
         
+        window = tk.Toplevel(self.root)
+        window.title(f"All Jobs x All Candidates ({len(jobs)} jobs, {len(candidate_best_jobs)} candidates, {elapsed:.1f}s)")
+        window.configure(bg=self.colors['bg'])
+        
+        # Left: jobs, right: top candidates for the selected job
+        job_listbox = tk.Listbox(
+            window,
+            bg=self.colors['secondary'],
+            fg=self.colors['fg'],
+            font=('Helvetica', 12),
+            width=40
+        )
+        job_listbox.pack(side="left", fill="y", padx=10, pady=10)
+        for title in job_titles:
+            job_listbox.insert(tk.END, title)
+        
+        columns = ('Rank', 'Name', 'File', 'Combined Score', 'Transformer Score', 'TFIDF Score', 'Section Score')
+        job_tree = ttk.Treeview(window, columns=columns, show='headings', style='Treeview')
+        for col in columns:
+            job_tree.heading(col, text=col)
+            job_tree.column(col, width=50 if col == 'Rank' else 140, anchor='center')
+        job_tree.pack(side="top", fill="both", expand=True, padx=10, pady=10)
+        
+        # Below: best matching jobs per candidate
+        best_columns = ('Name', 'File', 'Best Jobs')
+        best_tree = ttk.Treeview(window, columns=best_columns, show='headings', style='Treeview')
+        for col in best_columns:
+            best_tree.heading(col, text=col)
+            best_tree.column(col, width=600 if col == 'Best Jobs' else 200, anchor='w')
+        best_tree.pack(side="top", fill="both", expand=True, padx=10, pady=10)
+        
+        for doc_id, best in candidate_best_jobs.items():
+            best_text = ", ".join(f"{job_titles[j]} ({scores['combined_score']*100:.1f}%)" for j, scores in best)
+            best_tree.insert('', 'end', values=(names.get(doc_id, doc_id), files.get(doc_id, doc_id), best_text))
+        
+        def on_select(event):
+            selection = job_listbox.curselection()
+            if not selection:
+                return
+            job_tree.delete(*job_tree.get_children())
+            for rank, (doc_id, scores) in enumerate(job_rankings[selection[0]], 1):
+                job_tree.insert('', 'end', values=(
+                    rank,
+                    names.get(doc_id, doc_id)[:100],
+                    files.get(doc_id, doc_id),
+                    f"{scores['combined_score']*100:.2f}%",
+                    f"{scores['transformer_score']*100:.2f}%",
+                    f"{scores['tfidf_score']*100:.2f}%",
+                    f"{scores['section_score']*100:.2f}%"
+                ))
+        
+        job_listbox.bind('<<ListboxSelect>>', on_select)
+        if job_titles:
+            job_listbox.selection_set(0)
+            on_select(None)
+
     def update_rankings_display(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        for item in self.recent_tree.get_children():
-            self.recent_tree.delete(item)
+        # Nothing to refresh until the Rankings tab has been opened
+        if not hasattr(self, 'tree'):
+            return
         
-        try:
-            with open('hybrid_matching_results.json', 'r') as f:
-                self.rankings_data = json.load(f)
-            
-            self.rankings_data.sort(key=lambda x: x['combined_score'], reverse=True)
-            
-            for i, candidate in enumerate(self.rankings_data, 1):
-                combined_score = f"{candidate['combined_score']*100:.2f}%"
-                transformer_score = f"{candidate['transformer_score']*100:.2f}%"
-                tfidf_score = f"{candidate['tfidf_score']*100:.2f}%"
-                section_score = f"{candidate['section_score']*100:.2f}%"
-                
-                values = (
-                    i,
-                    candidate['candidate_name'][:100],
-                    candidate['resume_file'],
-                    combined_score,
-                    transformer_score,
-                    tfidf_score,
-                    section_score
-                )
-                
-                self.tree.insert('', 'end', values=values)
+        with tracer.stage('update_rankings_display'):
+            try:
+                # New candidates join the re-weighted ranking without reloading the rest
+                if self.reweighter is not None:
+                    if self.reweighter.load():
+                        self.apply_weights()
                 
-                # Add to recent section if it's one of the last 5 added
-                if i > len(self.rankings_data) - 5:
-                    self.recent_tree.insert('', 0, values=values)
+                # Only the visible window is re-read; new candidates show up at their rank
+                self.rankings_view.refresh()
+            
+                # Recently added comes from insertion time, not from the bottom of the ranking
+                self.recent_tree.delete(*self.recent_tree.get_children())
+                for candidate in self.engine.results_store.recent(5):
+                    if self.reweighter is not None:
+                        candidate = self.reweighter.reweighted(candidate)
+                    rank = self.rankings_source().rank_of(candidate)
+                    self.recent_tree.insert('', 'end', values=self.ranking_values(rank, candidate))
             
-        except FileNotFoundError:
-            messagebox.showwarning("Warning", "No rankings data found.")
+            except Exception as e:
+                messagebox.showerror("Error", f"Error loading rankings: {str(e)}")
+
+    def rankings_source(self):
+        return self.reweighter if self.reweighter is not None else self.engine.results_store
+
+    def on_weight_change(self, var, value_label):
+        value_label.configure(text=f"{var.get():.2f}")
+        # Coalesce a slider drag into one re-rank per frame or so
+        if self.reweight_job is None:
+            self.reweight_job = self.root.after(30, self.apply_weights)
+
+    def apply_weights(self):
+        """
+        Re-combine the stored component scores under the current slider weights
+        and re-rank the whole pool. At the default weights the rankings come
+        straight from the database again.
+        """
+        if self.reweight_job is not None:
+            self.root.after_cancel(self.reweight_job)
+            self.reweight_job = None
+        
+        score_weights = {key: var.get() for key, var in self.score_weight_vars.items()}
+        section_weights = {key: var.get() for key, var in self.section_weight_vars.items()}
+        if score_weights == SCORE_WEIGHTS and section_weights == default_section_weights():
+            self.reweighter = None
+        else:
+            with tracer.stage('reweight'):
+                if self.reweighter is None:
+                    self.reweighter = ScoreReweighter(self.engine.results_store)
+                    self.reweighter.load()
+                self.reweighter.apply(score_weights, section_weights)
+        
+        self.rankings_view.refresh()
+
+    def reset_weights(self):
+        for weight_vars, defaults in ((self.score_weight_vars, SCORE_WEIGHTS),
+                                      (self.section_weight_vars, default_section_weights())):
+            for key, var in weight_vars.items():
+                var.set(defaults[key])
+        # Scale commands only fire when the user moves a slider
+        for var, value_label in self.weight_labels:
+            value_label.configure(text=f"{var.get():.2f}")
+        self.apply_weights()
+
+    def ranking_values(self, rank, candidate):
+        # Stale candidates still carry their scores for a job other than the current one
+        return (
+            f"{rank} (stale)" if candidate.get('stale') else rank,
+            candidate['candidate_name'][:100],
+            candidate['resume_file'],
+            f"{candidate['combined_score']*100:.2f}%",
+            f"{candidate['transformer_score']*100:.2f}%",
+            f"{candidate['tfidf_score']*100:.2f}%",
+            f"{candidate['section_score']*100:.2f}%"
+        )
+        
+    def export_rankings(self):
+        """
+        Write the rankings to hybrid_matching_results.json in the old format.
+        """
+        try:
+            count = self.engine.results_store.export_json('hybrid_matching_results.json')
+            messagebox.showinfo("Export Complete", f"Exported {count} candidates to hybrid_matching_results.json")
         except Exception as e:
-            messagebox.showerror("Error", f"Error loading rankings: {str(e)}")
+            messagebox.showerror("Error", f"Failed to export rankings: {str(e)}")
 
 if __name__ == "__main__":
     root = tk.Tk()
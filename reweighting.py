@@ -0,0 +1,150 @@
+import json
+
+import numpy as np
+
+from job_matching import SECTION_COMPARISONS, SCORE_WEIGHTS
+
+
+def default_section_weights(section_comparisons=SECTION_COMPARISONS):
+    return {section_type: config['weight'] for section_type, config in section_comparisons.items()}
+
+
+class ScoreReweighter:
+    """
+    Re-rank stored candidates under different score weights without re-scoring them.
+
+    The transformer, TF-IDF and per-section similarities already stored with
+    each candidate are loaded once into aligned arrays. apply() recomputes
+    every section score as a masked weighted mean and every combined score as
+    one weighted sum over the whole pool, then sorts it, stale candidates
+    last as in the results store; nothing is read from disk or re-encoded,
+    so it stays interactive at 100k candidates.
+
+    load() only reads rows added since the last call; pass full=True after
+    stored scores change (e.g. a re-rank).
+    """
+
+    def __init__(self, results_store, section_types=tuple(SECTION_COMPARISONS)):
+        self.results_store = results_store
+        self.section_types = list(section_types)
+        self._reset()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _reset(self):
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.transformer = np.zeros(0, dtype=np.float32)
+        self.tfidf = np.zeros(0, dtype=np.float32)
+        self.section_similarity = np.zeros((0, len(self.section_types)), dtype=np.float32)
+        self.section_present = np.zeros((0, len(self.section_types)), dtype=bool)
+        self.stale = np.zeros(0, dtype=bool)
+        self.resume_files = []
+        self.candidate_names = []
+
+        self.combined = None
+        self.section = None
+        self.order = None
+        self._positions = None
+        self._last_id = 0
+
+    def load(self, full=False):
+        """Read candidates from the results store; returns the number of rows read."""
+        if full:
+            self._reset()
+
+        rows = self.results_store.component_rows(after_id=self._last_id)
+        if not rows:
+            return 0
+
+        n = len(rows)
+        similarity = np.zeros((n, len(self.section_types)), dtype=np.float32)
+        present = np.zeros((n, len(self.section_types)), dtype=bool)
+        columns = {section_type: i for i, section_type in enumerate(self.section_types)}
+        for r, row in enumerate(rows):
+            for section_type, value in json.loads(row['section_details']).items():
+                i = columns.get(section_type)
+                if i is not None:
+                    similarity[r, i] = value
+                    present[r, i] = True
+
+        self.ids = np.concatenate([self.ids, np.fromiter((row['id'] for row in rows), dtype=np.int64, count=n)])
+        self.transformer = np.concatenate(
+            [self.transformer, np.fromiter((row['transformer_score'] for row in rows), dtype=np.float32, count=n)]
+        )
+        self.tfidf = np.concatenate(
+            [self.tfidf, np.fromiter((row['tfidf_score'] for row in rows), dtype=np.float32, count=n)]
+        )
+        self.section_similarity = np.concatenate([self.section_similarity, similarity])
+        self.section_present = np.concatenate([self.section_present, present])
+        self.stale = np.concatenate([self.stale, np.fromiter((row['stale'] for row in rows), dtype=bool, count=n)])
+        self.resume_files.extend(row['resume_file'] for row in rows)
+        self.candidate_names.extend(row['candidate_name'] for row in rows)
+        self._last_id = int(self.ids[-1])
+        return n
+
+    def apply(self, score_weights=SCORE_WEIGHTS, section_weights=None):
+        """
+        Recompute section and combined scores for the whole pool and re-rank it.
+        Score weights are normalized to sum to 1; section weights only matter
+        relative to each other, as in the original section score.
+        """
+        if section_weights is None:
+            section_weights = default_section_weights()
+        weights = np.array([section_weights.get(section_type, 0.0) for section_type in self.section_types],
+                           dtype=np.float32)
+
+        # Weighted mean over the sections each candidate shares with the job
+        present_weights = self.section_present * weights
+        total = present_weights.sum(axis=1)
+        self.section = np.zeros(len(self.ids), dtype=np.float32)
+        np.divide((self.section_similarity * present_weights).sum(axis=1), total, out=self.section, where=total > 0)
+
+        weight_sum = sum(score_weights.values()) or 1.0
+        self.combined = (self.transformer * (score_weights['transformer'] / weight_sum) +
+                         self.tfidf * (score_weights['tfidf'] / weight_sum) +
+                         self.section * (score_weights['section'] / weight_sum))
+
+        # Best first; ties keep insertion order like the database's ORDER BY stale, combined_score DESC, id
+        self.order = np.lexsort((-self.combined, self.stale))
+        self._positions = np.empty(len(self.order), dtype=np.int64)
+        self._positions[self.order] = np.arange(len(self.order))
+        return self.order
+
+    def ranked(self, limit=None, offset=0):
+        """Re-weighted candidate records best first, in the results store's record format."""
+        end = len(self.order) if limit is None else offset + limit
+        return [self._record(i) for i in self.order[offset:end]]
+
+    def rank_of(self, record):
+        """1-based position of a stored record under the current weights."""
+        i = self._index(record)
+        return None if i is None else int(self._positions[i]) + 1
+
+    def reweighted(self, record):
+        """A stored record with its scores under the current weights."""
+        i = self._index(record)
+        return record if i is None else dict(record, **self._record(i))
+
+    def _index(self, record):
+        # Ids are loaded in increasing order
+        i = int(np.searchsorted(self.ids, record['id']))
+        if i >= len(self.ids) or self.ids[i] != record['id']:
+            return None
+        return i
+
+    def _record(self, i):
+        return {
+            'id': int(self.ids[i]),
+            'resume_file': self.resume_files[i],
+            'candidate_name': self.candidate_names[i],
+            'transformer_score': float(self.transformer[i]),
+            'tfidf_score': float(self.tfidf[i]),
+            'section_score': float(self.section[i]),
+            'combined_score': float(self.combined[i]),
+            'stale': bool(self.stale[i]),
+            'section_details': {
+                section_type: float(self.section_similarity[i, j])
+                for j, section_type in enumerate(self.section_types) if self.section_present[i, j]
+            },
+        }
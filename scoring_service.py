@@ -0,0 +1,363 @@
+"""
+Local HTTP scoring service: one warm copy of the models shared by every GUI
+on the machine.
+
+    python scoring_service.py --port 8765
+
+Endpoints (JSON in, JSON out, localhost only):
+
+    GET  /health          {"status", "models_ready", "candidates", "quantize", "chunked",
+                          "embedding_tag"}
+    POST /score-resume    {"resume_path"} or {"resume_file", "resume_text"},
+                          optional "resume_id", "name", "job", "save"; or {"resumes": [...]}
+    POST /rank-job        {"job"} or {"job_index"}, optional "top_k", "retrieve_k";
+                          or {"jobs": [...]} / {"all_jobs": true} to match every job
+    POST /rerank-job      {"job"} or {"job_index"}: re-score every stored candidate
+                          against the job from stored vectors, {"updated"};
+                          "job_index" also makes it the job new resumes are scored for
+
+Concurrent score-resume and single-job rank-job requests are coalesced into
+micro-batches: the first request opens a short window (--window-ms) and
+everything that arrives before it closes goes through one encode and one
+matrix product.
+
+The TF-IDF, duplicate and ANN indexes are written every --save-interval
+seconds and on shutdown rather than after every batch.
+
+Point a GUI at the service by setting ATOMS_SCORING_SERVICE=http://127.0.0.1:8765
+before starting it. The GUI takes --quantize and --chunked from /health so it
+reads the store the service writes, and sends its "embedding_tag" with every
+POST; a service restarted with other flags answers 409 instead of scoring.
+"""
+import argparse
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ranking_engine import RankingEngine, build_candidate_data, resume_id
+
+DEFAULT_PORT = 8765
+
+
+class MicroBatcher:
+    """
+    Collect items submitted from many threads into batches for `process`.
+
+    A batch closes when it holds `max_batch` items or `window` seconds after
+    its first item arrived. `process(items)` must return one result per item;
+    if it raises, every item in the batch fails with that exception.
+    """
+
+    def __init__(self, process, max_batch=32, window=0.01):
+        self.process = process
+        self.max_batch = max_batch
+        self.window = window
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            items = [item for item, _ in batch]
+            try:
+                results = self.process(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+class ScoringService:
+    """
+    Wrap a RankingEngine with the micro-batchers behind the HTTP endpoints.
+    """
+
+    def __init__(self, engine, max_batch=32, window=0.01):
+        self.engine = engine
+        self.score_batcher = MicroBatcher(self._score_batch, max_batch, window)
+        self.rank_batcher = MicroBatcher(self._rank_batch, max_batch, window)
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'models_ready': self.engine.models.is_ready(),
+            'candidates': len(self.engine.results_store),
+            'quantize': self.engine.models.quantize,
+            'chunked': self.engine.chunked_encoder is not None,
+            'embedding_tag': self.engine.embedding_tag,
+        }
+
+    def score_resume(self, payload):
+        if 'resumes' in payload:
+            futures = [self._submit_resume(dict(payload, **resume)) for resume in payload['resumes']]
+            return {'results': [future.result() for future in futures]}
+        return self._submit_resume(payload).result()
+
+    def rank_job(self, payload):
+        if payload.get('all_jobs') or 'jobs' in payload:
+            # Many jobs in one request are already a batch
+            jobs = self.engine.read_jobs() if payload.get('all_jobs') else payload['jobs']
+            job_rankings, candidate_best_jobs = self.engine.match_jobs(
+                jobs, top_k=payload.get('top_k', 50), best_jobs=payload.get('best_jobs', 5)
+            )
+            return {'job_rankings': job_rankings, 'candidate_best_jobs': candidate_best_jobs}
+
+        item = (self._job(payload), payload.get('top_k', 50), payload.get('retrieve_k'))
+        return {'ranking': self.rank_batcher.submit(item).result()}
+
+    def rerank_job(self, payload):
+        return {'updated': self.engine.rerank(self._job(payload), payload.get('job_index'))}
+
+    def _submit_resume(self, payload):
+        # PDF reading and section splitting run on the request thread, in parallel across requests
+        if 'resume_path' in payload:
+            resume_path = payload['resume_path']
+            resume_file = os.path.basename(resume_path)
+            resume_text = self.engine.pdf_extractor.extract(resume_path)
+            doc_id = resume_id(resume_path)
+        else:
+            resume_path = resume_file = payload['resume_file']
+            resume_text = payload['resume_text']
+            # Clients send the PDF's resume_id; bare text is identified by its content
+            doc_id = payload.get('resume_id') or hashlib.sha256(resume_text.encode('utf-8', 'surrogatepass')).hexdigest()
+        resume_sections = payload.get('sections') or self.engine.extract_sections(resume_text)
+
+        name = payload.get('name') or os.path.splitext(resume_file)[0]
+        item = ((doc_id, resume_text, resume_sections), self._job(payload), name, resume_path,
+                payload.get('save', False))
+        return self.score_batcher.submit(item)
+
+    def _job(self, payload):
+        if 'job' in payload:
+            return payload['job']
+        if 'job_index' in payload:
+            return self.engine.job_catalog.get(payload['job_index'])
+        return self.engine.load_current_job()
+
+    def _score_batch(self, items):
+        # One score_resumes call per distinct job in the batch
+        groups = {}
+        for i, (_, job, _, _, _) in enumerate(items):
+            groups.setdefault(json.dumps(job, sort_keys=True), []).append(i)
+
+        results = [None] * len(items)
+        to_save = []
+        for indexes in groups.values():
+            job = items[indexes[0]][1]
+            scores = self.engine.score_resumes([items[i][0] for i in indexes], job)
+            for i, score in zip(indexes, scores):
+                _, _, name, resume_path, save = items[i]
+                record = build_candidate_data(name, resume_path, score)
+                results[i] = {'scores': score, 'record': record}
+                if save:
+                    to_save.append(record)
+
+        if to_save:
+            self.engine.save(to_save)
+        return results
+
+    def _rank_batch(self, items):
+        results = [None] * len(items)
+
+        # ANN retrievals are separate lookups; exhaustive ranks share one matrix product
+        exhaustive = []
+        for i, (job, top_k, retrieve_k) in enumerate(items):
+            if retrieve_k:
+                results[i] = self.engine.top_candidates(job, retrieve_k, top_k)[0][0]
+            else:
+                exhaustive.append(i)
+
+        if exhaustive:
+            top_k = max(items[i][1] for i in exhaustive)
+            job_rankings, _ = self.engine.match_jobs([items[i][0] for i in exhaustive], top_k=top_k, best_jobs=1)
+            for i, ranking in zip(exhaustive, job_rankings):
+                results[i] = ranking[:items[i][1]]
+        return results
+
+
+def make_handler(service):
+    class ScoringHandler(BaseHTTPRequestHandler):
+        routes = {
+            '/score-resume': service.score_resume,
+            '/rank-job': service.rank_job,
+            '/rerank-job': service.rerank_job,
+        }
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send(200, service.health())
+            else:
+                self._send(404, {'error': f"Unknown endpoint {self.path}"})
+
+        def do_POST(self):
+            route = self.routes.get(self.path)
+            if route is None:
+                self._send(404, {'error': f"Unknown endpoint {self.path}"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError as e:
+                self._send(400, {'error': f"Invalid JSON: {e}"})
+                return
+            # A client reading another tagged store would never see what this service writes
+            tag = payload.pop('embedding_tag', None)
+            if tag is not None and tag != service.engine.embedding_tag:
+                self._send(409, {'error': f"The scoring service uses {service.engine.embedding_tag} embeddings, "
+                                          f"not {tag}; restart it with matching --quantize/--chunked"})
+                return
+            try:
+                self._send(200, route(payload))
+            except (KeyError, IndexError, FileNotFoundError) as e:
+                self._send(400, {'error': f"Bad request: {e}"})
+            except Exception as e:
+                self._send(500, {'error': str(e)})
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoringHandler
+
+
+class ScoringClient:
+    """
+    Thin client for the scoring service, using only the standard library.
+
+    With `embedding_tag` set, every request carries it and the service refuses
+    to answer if it writes a different tagged store.
+    """
+
+    def __init__(self, url, timeout=600, embedding_tag=None):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.embedding_tag = embedding_tag
+
+    def health(self, timeout=None):
+        return self._request('GET', '/health', timeout=timeout)
+
+    def score_resume(self, resume_path, name=None, job=None, save=False):
+        payload = {'resume_path': os.path.abspath(resume_path), 'save': save}
+        if name:
+            payload['name'] = name
+        if job is not None:
+            payload['job'] = job
+        return self._request('POST', '/score-resume', payload)
+
+    def score_resumes(self, resumes, job=None, save=False):
+        """Score already-extracted resumes, each a dict of resume_id, resume_file, resume_text, sections and name."""
+        payload = {'resumes': resumes, 'save': save}
+        if job is not None:
+            payload['job'] = job
+        return self._request('POST', '/score-resume', payload)['results']
+
+    def rank_job(self, job, top_k=50, retrieve_k=None):
+        payload = {'job': job, 'top_k': top_k}
+        if retrieve_k:
+            payload['retrieve_k'] = retrieve_k
+        return self._request('POST', '/rank-job', payload)['ranking']
+
+    def rank_jobs(self, jobs, top_k=50, best_jobs=5):
+        result = self._request('POST', '/rank-job', {'jobs': jobs, 'top_k': top_k, 'best_jobs': best_jobs})
+        return result['job_rankings'], result['candidate_best_jobs']
+
+    def rerank_job(self, job, position=None):
+        payload = {'job': job}
+        if position is not None:
+            payload['job_index'] = position
+        return self._request('POST', '/rerank-job', payload)['updated']
+
+    def _request(self, method, path, payload=None, timeout=None):
+        if payload is not None and self.embedding_tag:
+            payload = dict(payload, embedding_tag=self.embedding_tag)
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(
+            self.url + path, data=data, method=method, headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(json.loads(e.read()).get('error', str(e))) from None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--data-dir', default='.', help="Directory holding the rankings database and indexes")
+    parser.add_argument('--window-ms', type=float, default=10.0, help="How long a batch waits for more requests")
+    parser.add_argument('--max-batch', type=int, default=32)
+    parser.add_argument('--quantize', action='store_true', help="Use int8 dynamic quantization for the transformer")
+    parser.add_argument('--chunked', action='store_true', help="Encode long resumes in chunks instead of truncating")
+    parser.add_argument('--save-interval', type=float, default=60.0, help="Seconds between index saves")
+    args = parser.parse_args()
+
+    # Never reach out to the network: models must already be in the local cache
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+
+    engine = RankingEngine(data_dir=args.data_dir, quantize=args.quantize, chunked=args.chunked)
+    service = ScoringService(engine, args.max_batch, args.window_ms / 1000)
+
+    # The indexes are rewritten whole, so they're saved on a timer instead of after every batch
+    stopped = threading.Event()
+
+    def save_indexes_periodically():
+        while not stopped.wait(args.save_interval):
+            try:
+                engine.save_indexes()
+            except Exception as e:
+                print(f"Error saving indexes: {e}")
+
+    index_saver = threading.Thread(target=save_indexes_periodically, daemon=True)
+    index_saver.start()
+
+    # Bound to loopback only, the service is never reachable from other machines
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(service))
+    print(f"Scoring service listening on http://127.0.0.1:{args.port} (loading models in the background)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stopped.set()
+        index_saver.join()
+        engine.save_indexes()
+
+
+if __name__ == "__main__":
+    main()
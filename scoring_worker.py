@@ -0,0 +1,95 @@
+import itertools
+import queue
+import threading
+
+
+class ScoringCancelled(Exception):
+    """Raised from a progress callback when the running job has been cancelled."""
+
+
+class ScoringWorker:
+    """
+    Background thread that scores queued resumes one at a time so the Tk event
+    loop never blocks. The GUI polls `events` with root.after and receives:
+
+        ('queued', job_id, name, pending)
+        ('progress', job_id, percent, stage)
+        ('finished', job_id, candidate_data, pending)
+        ('failed', job_id, name, message, pending)
+        ('cancelled', job_id, name, pending)
+
+    `process(name, resume_path, progress)` does the actual work and must call
+    `progress(percent, stage)` between stages; that is where cancellation is
+    checked.
+    """
+
+    def __init__(self, process, events):
+        self.process = process
+        self.events = events
+
+        self._jobs = queue.Queue()
+        self._ids = itertools.count(1)
+        self._cancelled = set()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._current = None
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, name, resume_path):
+        """Queue a resume for scoring and return its job id."""
+        job_id = next(self._ids)
+        with self._lock:
+            self._pending += 1
+            pending = self._pending
+        self._jobs.put((job_id, name, resume_path))
+        self.events.put(('queued', job_id, name, pending))
+        return job_id
+
+    def cancel(self, job_id=None):
+        """Cancel one job, or the running job and everything queued when job_id is None."""
+        with self._lock:
+            if job_id is not None:
+                self._cancelled.add(job_id)
+                return
+
+            if self._current is not None:
+                self._cancelled.add(self._current)
+            for queued_id, _, _ in list(self._jobs.queue):
+                self._cancelled.add(queued_id)
+
+    def pending(self):
+        """Number of jobs queued or running."""
+        with self._lock:
+            return self._pending
+
+    def _run(self):
+        while True:
+            job_id, name, resume_path = self._jobs.get()
+            with self._lock:
+                self._current = job_id
+
+            def progress(percent, stage, job_id=job_id):
+                if job_id in self._cancelled:
+                    raise ScoringCancelled()
+                self.events.put(('progress', job_id, percent, stage))
+
+            try:
+                progress(0, "Starting")
+                candidate_data = self.process(name, resume_path, progress)
+                # Last chance to honour a cancel that came in during the final stage
+                progress(100, "Done")
+                event = ('finished', job_id, candidate_data)
+            except ScoringCancelled:
+                event = ('cancelled', job_id, name)
+            except Exception as e:
+                event = ('failed', job_id, name, str(e))
+            finally:
+                with self._lock:
+                    self._current = None
+                    self._cancelled.discard(job_id)
+                    self._pending -= 1
+                    pending = self._pending
+
+            self.events.put(event + (pending,))
@@ -0,0 +1,186 @@
+import re
+
+
+# Header keywords per section, in priority order: a line that mentions keywords
+# from more than one section is assigned to the earliest section listed here.
+SECTION_KEYWORDS = {
+    'experience': ['experience', 'work history', 'employment'],
+    'education': ['education', 'academic', 'qualification'],
+    'skills': ['skills', 'technical', 'technologies', 'proficiency'],
+    'summary': ['summary', 'profile', 'objective'],
+}
+
+
+def clean_text(text):
+    try:
+        return text.encode('utf-8', 'ignore').decode('utf-8')
+    except UnicodeError:
+        return text.encode('ascii', 'ignore').decode('ascii')
+
+
+class KeywordSectionExtractor:
+    """
+    Fast default section extractor.
+
+    Every header keyword is compiled into a single regex alternation, so each
+    line costs one scan instead of a substring test per keyword. Matching is
+    substring-based and gives the same sections as the original rule-based
+    extractor.
+    """
+
+    name = 'keyword'
+
+    def __init__(self, section_keywords=None):
+        self.section_keywords = section_keywords or SECTION_KEYWORDS
+        self.sections = list(self.section_keywords)
+
+        self._keyword_priority = {}
+        for priority, (section, keywords) in enumerate(self.section_keywords.items()):
+            for keyword in keywords:
+                self._keyword_priority.setdefault(keyword, priority)
+
+        # Higher-priority keywords first, so when two keywords start at the same
+        # position the alternation picks the one that wins anyway
+        ordered = sorted(self._keyword_priority, key=lambda keyword: (self._keyword_priority[keyword], -len(keyword)))
+        alternation = '|'.join(re.escape(keyword) for keyword in ordered)
+        self._pattern = re.compile(alternation)
+        # Zero-width lookahead finds overlapping matches, e.g. both keywords in "technicalexperience"
+        self._all_pattern = re.compile(f'(?=({alternation}))')
+
+    def classify_line(self, lower_line):
+        """Return the section a lowercase line is a header for, or None."""
+        match = self._pattern.search(lower_line)
+        if match is None:
+            return None
+
+        priority = self._keyword_priority[match.group()]
+        if priority > 0:
+            # A later keyword could belong to a higher-priority section (e.g. "Technical Experience")
+            priority = min(self._keyword_priority[keyword]
+                           for keyword in self._all_pattern.findall(lower_line, match.start()))
+        return self.sections[priority]
+
+    def extract(self, text):
+        sections = {section: '' for section in self.sections}
+
+        current_section = None
+        section_text = []
+
+        for line in clean_text(text).split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+
+            header = self.classify_line(line.lower())
+            if header:
+                if current_section:
+                    sections[current_section] = ' '.join(section_text)
+                current_section = header
+                section_text = []
+            elif current_section:
+                section_text.append(line)
+
+        # Add the last section
+        if current_section:
+            sections[current_section] = ' '.join(section_text)
+
+        return sections
+
+
+class SpacySectionExtractor:
+    """
+    Optional spaCy-backed section extractor.
+
+    Header keywords are matched on whole tokens with a PhraseMatcher, so
+    "experienced" in a bullet no longer opens an experience section. Only the
+    pipeline components the match attribute needs are loaded: matching on
+    LOWER needs just the English tokenizer, matching on LEMMA loads the model's
+    tagger and lemmatizer (parser and NER stay excluded) so "Skill" and
+    "Qualifications" match too.
+    """
+
+    name = 'spacy'
+
+    def __init__(self, model_name='en_core_web_lg', attr='LOWER', section_keywords=None, batch_size=256):
+        import spacy
+        from spacy.matcher import PhraseMatcher
+
+        self.section_keywords = section_keywords or SECTION_KEYWORDS
+        self.sections = list(self.section_keywords)
+        self.attr = attr
+        self.batch_size = batch_size
+
+        if attr == 'LEMMA':
+            self.nlp = spacy.load(model_name, exclude=['parser', 'senter', 'ner'])
+        else:
+            # Token text is all LOWER matching needs, so skip the model (and its vectors) entirely
+            self.nlp = spacy.blank('en')
+        self._run_pipeline = bool(self.nlp.pipe_names)
+
+        self.matcher = PhraseMatcher(self.nlp.vocab, attr=attr)
+        for section, keywords in self.section_keywords.items():
+            # Patterns go through the same components as the text so lemmas line up
+            self.matcher.add(section, list(self._docs(keywords)))
+
+        self._priority = {self.nlp.vocab.strings[section]: i for i, section in enumerate(self.sections)}
+
+    def extract(self, text):
+        sections = {section: '' for section in self.sections}
+
+        lines = [line.strip() for line in clean_text(text).split('\n')]
+        lines = [line for line in lines if line]
+
+        current_section = None
+        section_text = []
+
+        for line, doc in zip(lines, self._docs(lines)):
+            matches = self.matcher(doc)
+            if matches:
+                priority = min(self._priority[match_id] for match_id, _, _ in matches)
+                if current_section:
+                    sections[current_section] = ' '.join(section_text)
+                current_section = self.sections[priority]
+                section_text = []
+            elif current_section:
+                section_text.append(line)
+
+        # Add the last section
+        if current_section:
+            sections[current_section] = ' '.join(section_text)
+
+        return sections
+
+    def _docs(self, texts):
+        if self._run_pipeline:
+            return self.nlp.pipe(texts, batch_size=self.batch_size)
+        return (self.nlp.make_doc(text) for text in texts)
+
+
+SECTION_EXTRACTORS = {
+    KeywordSectionExtractor.name: KeywordSectionExtractor,
+    SpacySectionExtractor.name: SpacySectionExtractor,
+}
+
+
+def get_section_extractor(engine='keyword', **kwargs):
+    """Create a section extractor by engine name ('keyword' or 'spacy')."""
+    try:
+        extractor_class = SECTION_EXTRACTORS[engine]
+    except KeyError:
+        raise ValueError(f"Unknown section extractor '{engine}', expected one of {sorted(SECTION_EXTRACTORS)}")
+    return extractor_class(**kwargs)
+
+
+_default_extractor = None
+
+
+def split_sections(text):
+    """
+    Split resume text into experience/education/skills/summary sections with
+    the default keyword extractor. Has no model dependency so it can run in
+    worker processes.
+    """
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = KeywordSectionExtractor()
+    return _default_extractor.extract(text)
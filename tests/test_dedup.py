@@ -0,0 +1,92 @@
+import numpy as np
+
+from dedup import DuplicateIndex, text_hash
+
+
+WORDS = ("python machine learning engineer data pipelines spark airflow kubernetes docker aws "
+         "tensorflow pytorch statistics sql dashboards experimentation mentoring leadership "
+         "university bachelor computer science research publications").split()
+
+
+def resume(seed, n_words=200):
+    rng = np.random.RandomState(seed)
+    return " ".join(rng.choice(WORDS, n_words))
+
+
+def test_text_hash_ignores_case_and_whitespace():
+    assert text_hash("Senior  Engineer\n\nPython") == text_hash("senior engineer python")
+
+
+def test_exact_and_near_duplicates():
+    index = DuplicateIndex()
+    original = resume(0)
+    index.add('a', original)
+    index.add('b', resume(1))
+
+    assert index.find(original.upper()) == ('a', 1.0)
+
+    # Change a few words at the end: still a near duplicate of 'a'
+    words = original.split()
+    edited = " ".join(words[:-3] + ['changed', 'three', 'words'])
+    doc_id, similarity = index.find(edited)
+    assert doc_id == 'a'
+    assert index.threshold <= similarity < 1.0
+
+    assert index.find(resume(2)) is None
+
+
+def test_short_texts_are_never_linked():
+    index = DuplicateIndex()
+    assert not index.add('scan1.pdf', '')
+    assert not index.add('scan2.pdf', '   \n ')
+    assert index.find('') is None
+    assert index.find('  ') is None
+    assert 'scan1.pdf' not in index
+    assert len(index) == 0
+
+
+def test_replacing_with_a_short_text_drops_the_old_entry():
+    index = DuplicateIndex()
+    text = resume(0)
+    index.add('a', text)
+    index.add('a', 'scanned')
+    assert index.find(text) is None
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = DuplicateIndex()
+    texts = {f'doc{i}': resume(i) for i in range(5)}
+    for doc_id, text in texts.items():
+        index.add(doc_id, text)
+    # A replaced resume only matches its new text
+    index.add('doc0', resume(10))
+    path = str(tmp_path / 'duplicate_index.npz')
+    index.save(path)
+
+    loaded = DuplicateIndex.load_or_create(path)
+    assert len(loaded) == 5
+    assert loaded.find(texts['doc3']) == ('doc3', 1.0)
+    assert loaded.find(resume(10)) == ('doc0', 1.0)
+    assert loaded.find(texts['doc0']) is None
+
+    # The loaded index keeps growing in place
+    loaded.add('doc5', resume(5))
+    assert loaded.find(resume(5)) == ('doc5', 1.0)
+
+
+def test_unreadable_file_starts_a_new_index(tmp_path):
+    path = tmp_path / 'duplicate_index.npz'
+    path.write_bytes(b'not an npz file')
+    index = DuplicateIndex.load_or_create(str(path))
+    assert len(index) == 0
+
+
+def test_dirty_until_saved(tmp_path):
+    index = DuplicateIndex()
+    assert not index.dirty
+    assert not index.add('empty', '')
+    assert not index.dirty
+    index.add('a', resume(0))
+    assert index.dirty
+    index.save(str(tmp_path / 'duplicate_index.npz'))
+    assert not index.dirty
@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+
+
+class StubModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        self.encoded.extend(texts)
+        return np.array([np.full(16, len(text), dtype=np.float32) for text in texts])
+
+
+def open_cache(tmp_path, model, **kwargs):
+    cache = EmbeddingCache(model, 'stub', cache_dir=str(tmp_path / 'cache'), **kwargs)
+    cache.scanned.wait()
+    return cache
+
+
+def cached_files(tmp_path):
+    return sorted(name for _, _, names in os.walk(tmp_path / 'cache') for name in names)
+
+
+def test_reopened_cache_counts_the_files_on_disk(tmp_path):
+    model = StubModel()
+    first = open_cache(tmp_path, model)
+    first.encode(['a', 'bb', 'cc'])
+    assert first.stats()['disk_bytes'] > 0
+
+    second = open_cache(tmp_path, model, max_memory_items=0)
+    assert second.stats()['disk_bytes'] == first.stats()['disk_bytes']
+    second.encode(['bb'])
+    assert model.encoded == ['bb', 'cc', 'a']
+    assert second.stats()['disk_hits'] == 1
+
+
+def test_evicts_the_least_recently_used_files(tmp_path):
+    model = StubModel()
+    entry_bytes = open_cache(tmp_path / 'probe', model).encode('x').nbytes + 128
+    cache = open_cache(tmp_path, model, max_memory_items=0, max_disk_bytes=3 * entry_bytes)
+    cache.encode(['a', 'b', 'c'])
+    cache.encode('a')
+    cache.encode(['d', 'e'])
+
+    # 'b' and 'c' were the oldest once 'a' was read again
+    assert len(cached_files(tmp_path)) == 3
+    assert cache.stats()['disk_bytes'] == sum(
+        os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(tmp_path / 'cache') for name in names
+    )
+    model.encoded.clear()
+    cache.encode(['a', 'd', 'e', 'b'])
+    assert model.encoded == ['b']
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from embedding_store import EmbeddingStore
+
+SECTIONS = ['skills', 'experience']
+
+
+def vector(seed, dim=8):
+    return np.random.default_rng(seed).normal(size=dim).astype(np.float32)
+
+
+def unit(embedding):
+    return embedding / np.linalg.norm(embedding)
+
+
+def test_grows_past_its_first_capacity_and_reopens(tmp_path):
+    path = str(tmp_path / 'store')
+    store = EmbeddingStore(path, SECTIONS, model='test')
+    for i in range(300):
+        sections = {'skills': vector(1000 + i)} if i % 2 else {}
+        assert store.add(f'doc{i}', vector(i), sections) == i
+    store.flush()
+
+    for reopened in (store, EmbeddingStore(path, SECTIONS, model='test')):
+        assert len(reopened) == 300
+        assert reopened.full_matrix().shape == (300, 8)
+        np.testing.assert_allclose(reopened.full_matrix()[299], unit(vector(299)), rtol=1e-6)
+        matrix, mask = reopened.section_matrix('skills')
+        assert mask.tolist() == [bool(i % 2) for i in range(300)]
+        np.testing.assert_allclose(matrix[1], unit(vector(1001)), rtol=1e-6)
+        assert not reopened.section_matrix('experience')[1].any()
+
+
+def test_readding_a_candidate_overwrites_its_row(tmp_path):
+    store = EmbeddingStore(str(tmp_path / 'store'), SECTIONS)
+    store.add('a', vector(0), {'skills': vector(1)})
+    store.add('b', vector(2), {})
+    assert store.add('a', vector(3), {}) == 0
+
+    assert store.doc_ids == ['a', 'b']
+    np.testing.assert_allclose(store.full_matrix()[0], unit(vector(3)), rtol=1e-6)
+    assert not store.section_matrix('skills')[1][0]
+
+
+def test_readonly_store_reads_but_cannot_add(tmp_path):
+    path = str(tmp_path / 'store')
+    writer = EmbeddingStore(path, SECTIONS)
+    writer.add('a', vector(0), {'skills': vector(1)})
+    writer.flush()
+
+    reader = EmbeddingStore(path, SECTIONS, readonly=True)
+    assert 'a' in reader
+    np.testing.assert_allclose(reader.full_matrix()[0], unit(vector(0)), rtol=1e-6)
+    with pytest.raises(ValueError):
+        reader.add('b', vector(2), {})
+
+    # A missing store opens empty without creating anything
+    assert len(EmbeddingStore(str(tmp_path / 'missing'), SECTIONS, readonly=True)) == 0
+    assert not (tmp_path / 'missing').exists()
+
+
+def test_vectors_from_another_model_are_refused(tmp_path):
+    path = str(tmp_path / 'store')
+    EmbeddingStore(path, SECTIONS, model='all-mpnet-base-v2').add('a', vector(0), {})
+    with pytest.raises(ValueError):
+        EmbeddingStore(path, SECTIONS, model='all-mpnet-base-v2-int8')
+
+    store = EmbeddingStore.open_or_create(path, SECTIONS, model='all-mpnet-base-v2-int8')
+    assert len(store) == 0
+    assert (tmp_path / 'store.old').exists()
+
+
+def test_an_id_line_cut_off_mid_write_is_dropped(tmp_path):
+    path = str(tmp_path / 'store')
+    store = EmbeddingStore(path, SECTIONS)
+    store.add('a', vector(0), {})
+    store.flush()
+    with open(tmp_path / 'store' / 'ids.txt', 'a', encoding='utf-8') as f:
+        f.write('half-writ')
+
+    reopened = EmbeddingStore(path, SECTIONS)
+    assert reopened.doc_ids == ['a']
+    reopened.add('b', vector(1), {})
+    assert EmbeddingStore(path, SECTIONS).doc_ids == ['a', 'b']
+
+
+def test_readonly_store_sees_rows_added_after_it_opened(tmp_path):
+    path = str(tmp_path / 'store')
+    reader = EmbeddingStore(path, SECTIONS, readonly=True)
+    writer = EmbeddingStore(path, SECTIONS)
+    writer.add('a', vector(0), {})
+    writer.flush()
+    assert 'a' in reader
+
+    # Past the first capacity the writer's files grow and the reader maps them again
+    for i in range(1, 300):
+        writer.add(f'doc{i}', vector(i), {'skills': vector(1000 + i)})
+    writer.flush()
+    assert len(reader) == 300
+    assert reader.doc_ids[299] == 'doc299'
+    np.testing.assert_allclose(reader.full_matrix()[299], unit(vector(299)), rtol=1e-6)
+    assert reader.section_matrix('skills')[1][299]
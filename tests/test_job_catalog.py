@@ -0,0 +1,180 @@
+import json
+
+import pytest
+
+from job_catalog import JobCatalog
+
+
+def write_jobs(path, jobs, encoding='utf-8'):
+    with open(path, 'w', encoding=encoding) as f:
+        json.dump(jobs, f, indent=2, ensure_ascii=False)
+
+
+def open_catalog(tmp_path):
+    return JobCatalog(str(tmp_path / 'jobs.json'), str(tmp_path / 'job_index.json'),
+                      str(tmp_path / 'job_edits.jsonl'))
+
+
+@pytest.fixture
+def jobs_file(tmp_path):
+    jobs = [
+        {'file_name': 'Data Scientist', 'sections': {'skills': 'python'}},
+        {'file_name': 'Backend Developer', 'sections': {'skills': 'go'}},
+        {'file_name': 'Dev', 'sections': {'skills': 'first'}},
+        {'file_name': 'Dev', 'sections': {'skills': 'second'}},
+    ]
+    write_jobs(tmp_path / 'jobs.json', jobs)
+    return jobs
+
+
+def test_reads_titles_and_bodies(tmp_path, jobs_file):
+    catalog = open_catalog(tmp_path)
+    assert len(catalog) == 4
+    assert catalog.titles() == ['Data Scientist', 'Backend Developer', 'Dev', 'Dev']
+    assert catalog.get(1) == jobs_file[1]
+    assert catalog.find('Data Scientist') == jobs_file[0]
+    assert catalog.jobs() == jobs_file
+
+
+def test_search_matches_word_prefixes(tmp_path, jobs_file):
+    catalog = open_catalog(tmp_path)
+    assert catalog.search('dev') == [1, 2, 3]
+    assert catalog.search('back dev') == [1]
+    assert catalog.search('') == [0, 1, 2, 3]
+    assert catalog.search('nurse') == []
+
+
+def test_edit_replaces_the_job_at_its_position(tmp_path, jobs_file):
+    catalog = open_catalog(tmp_path)
+    edited = dict(jobs_file[3], sections={'skills': 'edited'})
+    assert catalog.save(edited, 3) == 3
+
+    # The other job titled Dev is untouched, now and after reopening
+    for reopened in (catalog, open_catalog(tmp_path)):
+        assert reopened.get(2) == jobs_file[2]
+        assert reopened.get(3) == edited
+        assert reopened.jobs() == jobs_file[:3] + [edited]
+
+
+def test_new_jobs_are_appended_and_replayed(tmp_path, jobs_file):
+    catalog = open_catalog(tmp_path)
+    new_job = {'title': 'Nurse Practitioner', 'description': 'Clinic role'}
+    assert catalog.save(new_job) == 4
+    renamed = dict(jobs_file[0], file_name='Senior Data Scientist')
+    catalog.save(renamed, 0)
+    assert catalog.search('senior') == [0]
+    assert catalog.search('data') == [0]
+
+    reopened = open_catalog(tmp_path)
+    assert len(reopened) == 5
+    assert reopened.get(4) == new_job
+    assert reopened.find('Nurse Practitioner') == new_job
+    assert reopened.find('Data Scientist') is None
+    assert reopened.search('senior') == [0]
+    assert reopened.search('nurse') == [4]
+
+
+def test_index_is_reused_until_the_jobs_file_changes(tmp_path, jobs_file):
+    open_catalog(tmp_path).titles()
+    index = json.loads((tmp_path / 'job_index.json').read_text())
+    assert index['titles'] == ['Data Scientist', 'Backend Developer', 'Dev', 'Dev']
+
+    write_jobs(tmp_path / 'jobs.json', jobs_file[:2])
+    assert open_catalog(tmp_path).titles() == ['Data Scientist', 'Backend Developer']
+
+
+def test_latin1_jobs_file(tmp_path):
+    jobs = [{'file_name': 'Café Manager', 'sections': {}}, {'file_name': 'Chef', 'sections': {}}]
+    write_jobs(tmp_path / 'jobs.json', jobs, encoding='latin-1')
+    catalog = open_catalog(tmp_path)
+    assert catalog.get(1) == jobs[1]
+    assert catalog.find('Café Manager') == jobs[0]
+
+
+def test_truncated_edit_is_skipped(tmp_path, jobs_file):
+    catalog = open_catalog(tmp_path)
+    catalog.save(dict(jobs_file[1], sections={'skills': 'rust'}), 1)
+    with open(tmp_path / 'job_edits.jsonl', 'ab') as f:
+        f.write(b'{"position": 0, "job": {"file_na')
+
+    reopened = open_catalog(tmp_path)
+    assert reopened.get(0) == jobs_file[0]
+    assert reopened.get(1)['sections'] == {'skills': 'rust'}
+
+
+def test_compact_folds_edits_into_the_jobs_file(tmp_path, jobs_file):
+    catalog = open_catalog(tmp_path)
+    edited = dict(jobs_file[3], sections={'skills': 'edited'})
+    catalog.save(edited, 3)
+    catalog.compact()
+
+    assert not (tmp_path / 'job_edits.jsonl').exists()
+    with open(tmp_path / 'jobs.json', encoding='utf-8') as f:
+        assert json.load(f) == jobs_file[:3] + [edited]
+    assert catalog.get(3) == edited
+
+
+def test_sees_edits_saved_by_another_catalog(tmp_path, jobs_file):
+    first = open_catalog(tmp_path)
+    second = open_catalog(tmp_path)
+    assert second.titles() == ['Data Scientist', 'Backend Developer', 'Dev', 'Dev']
+
+    edited = dict(jobs_file[0], file_name='ML Engineer')
+    first.save(edited, 0)
+    first.save({'file_name': 'Nurse', 'sections': {}})
+    assert second.titles() == ['ML Engineer', 'Backend Developer', 'Dev', 'Dev', 'Nurse']
+    assert second.get(0) == edited
+
+    # Adds from both catalogs are kept, none overwrites the other
+    second.save({'file_name': 'Teacher', 'sections': {}})
+    first.save({'file_name': 'Pilot', 'sections': {}})
+    for catalog in (first, second, open_catalog(tmp_path)):
+        assert catalog.titles()[4:] == ['Nurse', 'Teacher', 'Pilot']
+
+
+def test_compacts_a_large_log_when_opened(tmp_path, jobs_file):
+    def open_small(tmp_path):
+        return JobCatalog(str(tmp_path / 'jobs.json'), str(tmp_path / 'job_index.json'),
+                          str(tmp_path / 'job_edits.jsonl'), compact_bytes=200)
+
+    catalog = open_small(tmp_path)
+    catalog.save(dict(jobs_file[1], sections={'skills': 'rust'}), 1)
+    catalog.save(dict(jobs_file[2], sections={'skills': 'x' * 200}), 2)
+    # Saving only appends, however long the log gets
+    assert (tmp_path / 'job_edits.jsonl').exists()
+
+    reopened = open_small(tmp_path)
+    assert reopened.get(2)['sections'] == {'skills': 'x' * 200}
+    assert not (tmp_path / 'job_edits.jsonl').exists()
+    with open(tmp_path / 'jobs.json', encoding='utf-8') as f:
+        jobs = json.load(f)
+    assert jobs[1]['sections'] == {'skills': 'rust'}
+    assert jobs[2]['sections'] == {'skills': 'x' * 200}
+    assert open_catalog(tmp_path).jobs() == jobs
+
+
+def test_compact_skips_while_another_process_holds_the_lock(tmp_path, jobs_file):
+    catalog = open_catalog(tmp_path)
+    catalog.save(dict(jobs_file[0], sections={'skills': 'r'}), 0)
+    (tmp_path / 'job_edits.jsonl.lock').write_text('')
+    catalog.compact()
+    assert (tmp_path / 'job_edits.jsonl').exists()
+    assert catalog.get(0)['sections'] == {'skills': 'r'}
+
+
+def test_finishes_a_compaction_cut_short(tmp_path, jobs_file):
+    catalog = open_catalog(tmp_path)
+    catalog.save(dict(jobs_file[0], sections={'skills': 'first'}), 0)
+    (tmp_path / 'job_edits.jsonl').rename(tmp_path / 'job_edits.jsonl.compacting')
+    catalog.save({'file_name': 'Nurse', 'sections': {}})
+
+    reopened = open_catalog(tmp_path)
+    assert reopened.get(0)['sections'] == {'skills': 'first'}
+    assert reopened.titles()[4:] == ['Nurse']
+    assert not (tmp_path / 'job_edits.jsonl.compacting').exists()
+
+
+def test_compact_without_edits_leaves_the_jobs_file_alone(tmp_path, jobs_file):
+    before = (tmp_path / 'jobs.json').read_bytes()
+    open_catalog(tmp_path).compact()
+    assert (tmp_path / 'jobs.json').read_bytes() == before
@@ -0,0 +1,63 @@
+import zlib
+
+import numpy as np
+
+from embedding_store import EmbeddingStore
+from job_matching import SECTION_COMPARISONS, edit_job_sections, job_text, score_job, structured_text
+from tfidf_engine import TfidfEngine, tokenize
+
+
+def encode(texts):
+    # Bag of hashed words, so texts sharing words point the same way
+    embeddings = np.zeros((len(texts), 64), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for word in tokenize(text):
+            embeddings[i, zlib.crc32(word.encode()) % 64] += 1.0
+        embeddings[i, 63] += 0.01
+    return embeddings
+
+
+RESUMES = {
+    'nurse.pdf': {'skills': 'patient care triage nursing', 'experience': 'hospital ward nurse'},
+    'dev.pdf': {'skills': 'python django postgres', 'experience': 'backend developer web services'},
+}
+
+
+def build_pool(tmp_path):
+    store = EmbeddingStore(str(tmp_path / 'store'), list(SECTION_COMPARISONS))
+    tfidf = TfidfEngine()
+    for doc_id, sections in RESUMES.items():
+        text = structured_text(sections)
+        store.add(doc_id, encode([text])[0], {name: encode([content])[0] for name, content in sections.items()})
+        tfidf.add_document(doc_id, text)
+    return store, tfidf
+
+
+def test_structured_text_orders_priority_sections_first():
+    text = structured_text({'hobbies': 'chess', 'skills': 'python', 'summary': 'dev', 'projects': ' '})
+    assert text == "<SUMMARY>\ndev\n</SUMMARY>\n<SKILLS>\npython\n</SKILLS>\n<HOBBIES>\nchess\n</HOBBIES>"
+
+
+def test_edited_sections_change_the_whole_text_scores(tmp_path):
+    store, tfidf = build_pool(tmp_path)
+    sections = {'skills': 'patient care nursing', 'experience': 'hospital nurse'}
+    job = {'file_name': 'Nurse', 'sections': sections, 'structured_text': structured_text(sections)}
+
+    edited = edit_job_sections(job, {'skills': 'python django', 'experience': 'backend developer'})
+    assert edited['sections']['skills'] == 'python django'
+    assert 'python django' in job_text(edited)
+    assert job['sections'] == sections
+
+    doc_ids, before = score_job(job, store, tfidf, encode)
+    _, after = score_job(edited, store, tfidf, encode)
+    nurse, dev = doc_ids.index('nurse.pdf'), doc_ids.index('dev.pdf')
+    for name in ('transformer_score', 'tfidf_score'):
+        assert before[name][nurse] > before[name][dev]
+        assert after[name][dev] > after[name][nurse]
+        assert after[name][dev] > before[name][dev]
+
+
+def test_edit_keeps_a_gui_jobs_description():
+    job = {'title': 'Nurse', 'description': 'Night shift nurse'}
+    edited = edit_job_sections(job, {'skills': 'triage'})
+    assert job_text(edited) == "Night shift nurse\n<SKILLS>\ntriage\n</SKILLS>"
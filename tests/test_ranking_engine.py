@@ -0,0 +1,99 @@
+import json
+import zlib
+
+import numpy as np
+import pytest
+
+from job_matching import SECTION_COMPARISONS, SCORE_WEIGHTS, job_section_texts, job_text
+from ranking_engine import RankingEngine
+from tfidf_engine import tokenize
+
+
+class StubModel:
+    # Bag of hashed words, so texts sharing words point the same way
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        embeddings = np.zeros((len(texts), 64), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in tokenize(text):
+                embeddings[i, zlib.crc32(word.encode()) % 64] += 1.0
+            embeddings[i, 63] += 0.01
+        return embeddings[0] if single else embeddings
+
+
+JOB = {
+    'file_name': 'Backend Developer',
+    'structured_text': 'backend developer python django web services',
+    'sections': {'skills': 'python django postgres', 'experience': 'backend web services'},
+}
+
+RESUMES = [
+    ('dev', 'python django developer building web services',
+     {'skills': 'python django', 'experience': 'backend developer web services'}),
+    ('nurse', 'registered nurse hospital ward patient care',
+     {'skills': 'patient care triage', 'experience': 'hospital ward nurse'}),
+    ('analyst', 'data analyst sql dashboards reporting python',
+     {'skills': 'sql python tableau'}),
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    jobs_file = tmp_path / 'jobs.json'
+    jobs_file.write_text(json.dumps([JOB]))
+    engine = RankingEngine(data_dir=str(tmp_path), jobs_file=str(jobs_file), load_models=False)
+    engine.embedding_cache.model = StubModel()
+    engine.embedding_cache.scanned.wait()
+    return engine
+
+
+def test_a_retry_after_a_failed_batch_scores_stored_resumes_as_new(engine, monkeypatch):
+    add = engine.candidate_index.add
+
+    def fail_on_last(doc_id):
+        if doc_id == 'analyst':
+            raise RuntimeError("index full")
+        add(doc_id)
+
+    monkeypatch.setattr(engine.candidate_index, 'add', fail_on_last)
+    with pytest.raises(RuntimeError):
+        engine.score_resumes(RESUMES, JOB)
+    assert 'dev' in engine.embedding_store
+
+    # Retried one at a time, the resumes the failed batch stored don't match themselves
+    monkeypatch.setattr(engine.candidate_index, 'add', add)
+    for resume in RESUMES:
+        assert 'duplicate_of' not in engine.score_resumes([resume], JOB)[0]
+
+    # Once scored, they're duplicates as before
+    assert engine.score_resumes([RESUMES[0]], JOB)[0]['duplicate_of'] == 'dev'
+
+
+def cosine(a, b):
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def test_batched_scores_match_one_encode_per_text(engine):
+    results = engine.score_resumes(RESUMES, JOB)
+
+    # Scored the way it was before batching: one encode per text, a cosine per pair
+    model = StubModel()
+    job_sections = job_section_texts(JOB)
+    for (doc_id, resume_text, sections), result in zip(RESUMES, results):
+        transformer_score = cosine(model.encode(job_text(JOB)), model.encode(resume_text))
+        section_scores = {
+            section_type: cosine(model.encode(job_sections[section_type]), model.encode(sections[section_type]))
+            for section_type in SECTION_COMPARISONS if sections.get(section_type) and section_type in job_sections
+        }
+        weights = {section_type: SECTION_COMPARISONS[section_type]['weight'] for section_type in section_scores}
+        section_score = sum(section_scores[s] * weights[s] for s in section_scores) / sum(weights.values())
+        # TF-IDF never went through the encoder, so only the embedding scores are recomputed
+        combined_score = (transformer_score * SCORE_WEIGHTS['transformer'] +
+                          result['tfidf_score'] * SCORE_WEIGHTS['tfidf'] +
+                          section_score * SCORE_WEIGHTS['section'])
+
+        assert result['resume_id'] == doc_id
+        assert result['transformer_score'] == pytest.approx(transformer_score, abs=1e-6)
+        assert result['section_details'] == pytest.approx(section_scores, abs=1e-6)
+        assert result['combined_score'] == pytest.approx(combined_score, abs=1e-6)
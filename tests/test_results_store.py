@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+from results_store import ResultsStore
+
+
+def record(resume_file, combined_score, job='Dev'):
+    return {
+        'resume_id': f'id-{resume_file}', 'resume_file': resume_file, 'candidate_name': resume_file, 'transformer_score': combined_score,
+        'tfidf_score': combined_score, 'section_score': combined_score, 'combined_score': combined_score,
+        'section_details': {}, 'job': job,
+    }
+
+
+def test_rows_for_another_job_rank_last_as_stale(tmp_path):
+    store = ResultsStore(str(tmp_path / 'rankings.db'))
+    store.add_many([record('a.pdf', 0.5), record('b.pdf', 0.9), record('c.pdf', 0.7)])
+    assert [r['resume_file'] for r in store.ranked()] == ['b.pdf', 'c.pdf', 'a.pdf']
+    assert store.stale_count() == 0
+
+    # Re-ranked for another job: b.pdf had no stored vectors and wasn't updated
+    assert store.update_scores([record('a.pdf', 0.8, 'Nurse'), record('c.pdf', 0.2, 'Nurse')]) == 2
+    store.set_meta('current_job', 'Nurse')
+    assert len(store) == 3
+    assert store.stale_count() == 1
+    assert [(r['resume_file'], r['stale']) for r in store.ranked()] == [
+        ('a.pdf', False), ('c.pdf', False), ('b.pdf', True)
+    ]
+    assert [r['resume_file'] for r in store.ranked(limit=1, offset=2)] == ['b.pdf']
+    assert [(r['resume_file'], r['stale']) for r in store.recent()] == [
+        ('c.pdf', False), ('b.pdf', True), ('a.pdf', False)
+    ]
+    assert [(row['resume_file'], row['stale']) for row in store.component_rows()] == [
+        ('a.pdf', 0), ('b.pdf', 1), ('c.pdf', 0)
+    ]
+    assert [store.rank_of(r) for r in store.ranked()] == [1, 2, 3]
+    assert store.update_scores([record('missing.pdf', 0.1)]) == 0
+
+
+def test_rows_from_before_the_job_column_keep_the_current_job(tmp_path):
+    path = str(tmp_path / 'rankings.db')
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE candidates (id INTEGER PRIMARY KEY AUTOINCREMENT, resume_file TEXT NOT NULL,
+            candidate_name TEXT NOT NULL, transformer_score REAL NOT NULL, tfidf_score REAL NOT NULL,
+            section_score REAL NOT NULL, combined_score REAL NOT NULL, section_details TEXT NOT NULL,
+            added_at REAL NOT NULL);
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        INSERT INTO candidates VALUES (1, 'a.pdf', 'A', 0.1, 0.1, 0.1, 0.1, '{}', 0);
+        INSERT INTO meta VALUES ('current_job', 'Nurse');
+    """)
+    conn.close()
+
+    store = ResultsStore(path)
+    assert [(r['resume_file'], r['resume_id'], r['job']) for r in store.ranked()] == [('a.pdf', 'a.pdf', 'Nurse')]
+    assert store.update_scores([dict(record('a.pdf', 0.9, 'Nurse'), resume_id='a.pdf')]) == 1
+
+
+def test_readonly_store_sees_the_writers_commits(tmp_path):
+    path = str(tmp_path / 'rankings.db')
+    reader = ResultsStore(path, readonly=True)
+    assert len(reader) == 0
+
+    ResultsStore(path).add(record('a.pdf', 0.5))
+    assert [r['resume_file'] for r in reader.ranked()] == ['a.pdf']
+    with pytest.raises(sqlite3.OperationalError):
+        reader.add(record('b.pdf', 0.5))
+
+
+def test_candidates_sharing_a_file_name_stay_apart(tmp_path):
+    store = ResultsStore(str(tmp_path / 'rankings.db'))
+    store.add_many([dict(record('resume.pdf', 0.5), resume_id='one'), dict(record('resume.pdf', 0.7), resume_id='two')])
+    assert store.update_scores([dict(record('resume.pdf', 0.9), resume_id='one')]) == 1
+    assert [(r['resume_id'], r['combined_score']) for r in store.ranked()] == [('one', 0.9), ('two', 0.7)]
+    assert store.resume_files() == {'one': 'resume.pdf', 'two': 'resume.pdf'}
@@ -0,0 +1,88 @@
+import math
+from collections import Counter
+
+import numpy as np
+
+from tfidf_engine import TfidfEngine, tokenize
+
+DOCS = {
+    'a': "Python developer with Django and PostgreSQL experience",
+    'b': "Registered nurse, patient care and triage in a busy hospital",
+    'c': "Data scientist: Python, statistics and machine learning",
+    'd': "Backend developer building web services in Go and Python",
+}
+QUERY = "Senior Python developer for web services and machine learning"
+
+
+def batch_scores(docs, query):
+    """Cosine similarities under IDF fitted on the whole pool at once."""
+    counts = {doc_id: Counter(tokenize(text)) for doc_id, text in docs.items()}
+    df = Counter(term for doc in counts.values() for term in doc)
+    n = len(docs)
+
+    def weights(doc):
+        length = sum(doc.values())
+        return {term: count / length * (math.log((1 + n) / (1 + df.get(term, 0))) + 1) for term, count in doc.items()}
+
+    def cosine(left, right):
+        dot = sum(weight * right.get(term, 0.0) for term, weight in left.items())
+        norm = math.sqrt(sum(w * w for w in left.values())) * math.sqrt(sum(w * w for w in right.values()))
+        return dot / norm if norm else 0.0
+
+    query_weights = weights(Counter(tokenize(query)))
+    return [cosine(query_weights, weights(doc)) for doc in counts.values()]
+
+
+def test_incremental_df_matches_a_batch_fit():
+    engine = TfidfEngine()
+    added = {}
+    for doc_id, text in DOCS.items():
+        engine.add_document(doc_id, text)
+        added[doc_id] = text
+        # Every add updates the pool's IDF, so earlier candidates' scores change too
+        np.testing.assert_allclose(engine.score(QUERY, list(added)), batch_scores(added, QUERY), rtol=1e-5)
+
+
+def test_replacing_a_document_updates_df():
+    engine = TfidfEngine()
+    for doc_id, text in DOCS.items():
+        engine.add_document(doc_id, text)
+    engine.add_document('b', "Go developer, Kubernetes and web services")
+
+    fresh = TfidfEngine()
+    docs = dict(DOCS, b="Go developer, Kubernetes and web services")
+    for doc_id, text in docs.items():
+        fresh.add_document(doc_id, text)
+
+    assert len(engine) == 4
+    assert engine.live_doc_ids() == ['a', 'c', 'd', 'b']
+    np.testing.assert_allclose(engine.score(QUERY, list(docs)), fresh.score(QUERY, list(docs)), rtol=1e-5)
+    np.testing.assert_allclose(engine.score(QUERY, list(docs)), batch_scores(docs, QUERY), rtol=1e-5)
+
+
+def test_save_and_load_keep_scores(tmp_path):
+    engine = TfidfEngine()
+    for doc_id, text in DOCS.items():
+        engine.add_document(doc_id, text)
+    engine.add_document('a', "Python developer")
+    path = str(tmp_path / 'tfidf_index.npz')
+    engine.save(path)
+
+    loaded = TfidfEngine.load(path)
+    assert loaded.live_doc_ids() == engine.live_doc_ids()
+    np.testing.assert_allclose(loaded.score(QUERY), engine.score(QUERY), rtol=1e-6)
+
+    # The loaded pool keeps growing from where it left off
+    loaded.add_document('e', "Python machine learning engineer")
+    assert 'e' in loaded and len(loaded) == 5
+    assert TfidfEngine.load_or_create(str(tmp_path / 'missing.npz')).live_doc_ids() == []
+
+
+def test_dirty_until_saved(tmp_path):
+    engine = TfidfEngine()
+    assert not engine.dirty
+    engine.add_document('a', DOCS['a'])
+    assert engine.dirty
+    engine.save(str(tmp_path / 'tfidf_index.npz'))
+    assert not engine.dirty
+    assert not TfidfEngine.load(str(tmp_path / 'tfidf_index.npz')).dirty
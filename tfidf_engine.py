@@ -0,0 +1,270 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+STOP_WORDS = frozenset(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text, stop_words=STOP_WORDS):
+    """Lowercase, split into words and drop common English stop words."""
+    return [word for word in WORD_PATTERN.findall(text.lower()) if word not in stop_words]
+
+
+class TfidfEngine:
+    """
+    Corpus-level TF-IDF over the whole candidate pool.
+
+    Every candidate is stored once as a sparse row of term frequencies
+    (count / document length) in growable CSR buffers, and document
+    frequencies are updated as candidates are added, so nothing is ever
+    refitted. IDF uses the smoothed form log((1 + N) / (1 + df)) + 1.
+
+    Scoring a job against all N candidates is two sparse matrix-vector
+    products: X @ (idf^2 * q) for the dot products and X^2 @ idf^2 for the
+    candidate norms, which change as the pool's IDF changes.
+
+    `dirty` is set by every add and cleared by save(), so callers only write
+    the pool back when it has changed.
+    """
+
+    def __init__(self, stop_words=STOP_WORDS):
+        self.stop_words = stop_words
+        self.vocabulary = {}
+        self.doc_ids = []  # row -> doc_id, including replaced rows
+
+        self._row_of = {}  # live doc_id -> row
+        self._df = np.zeros(1024, dtype=np.int64)
+        self._indptr = np.zeros(1025, dtype=np.int64)
+        self._indices = np.zeros(4096, dtype=np.int32)
+        self._data = np.zeros(4096, dtype=np.float32)
+        self._nnz = 0
+        self.dirty = False
+
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._row_of
+
+    def add_document(self, doc_id, text):
+        """
+        Add (or replace) one candidate and update document frequencies in place.
+        """
+        counts = Counter(tokenize(text, self.stop_words))
+        length = sum(counts.values())
+
+        with self._lock:
+            if doc_id in self._row_of:
+                self._drop_row(self._row_of[doc_id])
+
+            columns = np.fromiter((self._term_index(term) for term in counts), dtype=np.int32, count=len(counts))
+            values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            if length:
+                values /= length
+
+            order = np.argsort(columns)
+            columns = columns[order]
+            values = values[order]
+
+            row = len(self.doc_ids)
+            self._append_row(columns, values)
+            self.doc_ids.append(doc_id)
+            self._row_of[doc_id] = row
+            self._df[columns] += 1
+            self.dirty = True
+
+            return row
+
+    def idf(self):
+        with self._lock:
+            n_docs = len(self._row_of)
+            df = self._df[:len(self.vocabulary)]
+            return np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+
+    def score(self, text, doc_ids=None):
+        """
+        Cosine similarity between `text` and each candidate under the pool's TF-IDF.
+        Returns an array aligned with `doc_ids`, or with live_doc_ids() when omitted.
+        """
+        return self.score_matrix([text], doc_ids)[0]
+
+    def score_matrix(self, texts, doc_ids=None):
+        """
+        Cosine similarity between every query text and every candidate as a dense
+        (len(texts), len(doc_ids)) array, computed with one sparse matrix product.
+        """
+        with self._lock:
+            if doc_ids is None:
+                doc_ids = self.live_doc_ids()
+            rows = np.fromiter((self._row_of[doc_id] for doc_id in doc_ids), dtype=np.int64, count=len(doc_ids))
+            matrix, squared = self._matrices()
+            idf = self.idf()
+            unseen_idf = math.log(1.0 + len(self._row_of)) + 1.0
+            queries, query_norms = self._query_matrix(texts, idf, unseen_idf)
+
+        if not len(rows) or not len(texts):
+            return np.zeros((len(texts), len(rows)), dtype=np.float64)
+
+        idf_sq = idf * idf
+        matrix = matrix[rows]
+        squared = squared[rows]
+
+        # Query weights carry idf^2 so the product gives sum(tf_q * idf * tf_d * idf)
+        dots = (queries @ matrix.T).toarray()
+        candidate_norms = np.sqrt(squared @ idf_sq)
+        norms = np.outer(query_norms, candidate_norms)
+
+        scores = np.zeros(dots.shape, dtype=np.float64)
+        np.divide(dots, norms, out=scores, where=norms > 0)
+        return scores
+
+    def _query_matrix(self, texts, idf, unseen_idf):
+        """
+        Sparse (len(texts), vocab) matrix of tf * idf^2 query weights plus each query's TF-IDF norm.
+        Terms the pool has never seen only contribute to the norm.
+        """
+        indptr = [0]
+        indices = []
+        data = []
+        norms = np.zeros(len(texts), dtype=np.float64)
+
+        for i, text in enumerate(texts):
+            counts = Counter(tokenize(text, self.stop_words))
+            length = sum(counts.values())
+            norm_sq = 0.0
+            for term, count in counts.items():
+                tf = count / length
+                column = self.vocabulary.get(term)
+                if column is None or column >= len(idf):
+                    norm_sq += (tf * unseen_idf) ** 2
+                else:
+                    indices.append(column)
+                    data.append(tf * idf[column] * idf[column])
+                    norm_sq += (tf * idf[column]) ** 2
+            norms[i] = math.sqrt(norm_sq)
+            indptr.append(len(indices))
+
+        queries = csr_matrix(
+            (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(texts), len(idf))
+        )
+        return queries, norms
+
+    def similarity(self, text, doc_id):
+        return float(self.score(text, [doc_id])[0])
+
+    def live_doc_ids(self):
+        with self._lock:
+            return [doc_id for doc_id, _ in sorted(self._row_of.items(), key=lambda item: item[1])]
+
+    def save(self, path):
+        """Write the engine state to an .npz file atomically."""
+        with self._lock:
+            terms = sorted(self.vocabulary, key=self.vocabulary.get)
+            n_rows = len(self.doc_ids)
+            live = np.zeros(n_rows, dtype=bool)
+            live[list(self._row_of.values())] = True
+            state = {
+                'vocabulary': np.array(terms, dtype=str),
+                'doc_ids': np.array(self.doc_ids, dtype=str),
+                'live': live,
+                'df': self._df[:len(terms)],
+                'indptr': self._indptr[:n_rows + 1],
+                'indices': self._indices[:self._nnz],
+                'data': self._data[:self._nnz],
+            }
+
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **state)
+            os.replace(tmp_path, path)
+            self.dirty = False
+
+    @classmethod
+    def load(cls, path, stop_words=STOP_WORDS):
+        engine = cls(stop_words)
+        with np.load(path) as state:
+            terms = state['vocabulary'].tolist()
+            engine.vocabulary = {term: i for i, term in enumerate(terms)}
+            engine.doc_ids = state['doc_ids'].tolist()
+            live = state['live']
+            engine._row_of = {doc_id: row for row, doc_id in enumerate(engine.doc_ids) if live[row]}
+
+            engine._df = engine._grow(engine._df, len(terms))
+            engine._df[:len(terms)] = state['df']
+
+            indptr = state['indptr']
+            engine._indptr = engine._grow(engine._indptr, len(indptr))
+            engine._indptr[:len(indptr)] = indptr
+
+            engine._nnz = int(indptr[-1])
+            engine._indices = engine._grow(engine._indices, engine._nnz)
+            engine._indices[:engine._nnz] = state['indices']
+            engine._data = engine._grow(engine._data, engine._nnz)
+            engine._data[:engine._nnz] = state['data']
+        return engine
+
+    @classmethod
+    def load_or_create(cls, path, stop_words=STOP_WORDS):
+        if os.path.exists(path):
+            try:
+                return cls.load(path, stop_words)
+            except Exception as e:
+                print(f"Error loading TF-IDF index, starting a new one: {e}")
+        return cls(stop_words)
+
+    def _term_index(self, term):
+        column = self.vocabulary.get(term)
+        if column is None:
+            column = len(self.vocabulary)
+            self.vocabulary[term] = column
+            self._df = self._grow(self._df, column + 1)
+        return column
+
+    def _append_row(self, columns, values):
+        row = len(self.doc_ids)
+        end = self._nnz + len(columns)
+        self._indices = self._grow(self._indices, end)
+        self._data = self._grow(self._data, end)
+        self._indptr = self._grow(self._indptr, row + 2)
+
+        self._indices[self._nnz:end] = columns
+        self._data[self._nnz:end] = values
+        self._nnz = end
+        self._indptr[row + 1] = end
+
+    def _drop_row(self, row):
+        # Replaced rows stay in the buffers with zeroed data so row numbers never shift
+        start, end = self._indptr[row], self._indptr[row + 1]
+        self._df[self._indices[start:end]] -= 1
+        self._data[start:end] = 0.0
+        del self._row_of[self.doc_ids[row]]
+
+    def _matrices(self):
+        """CSR views over the buffers (no copy of the term data) and the squared-TF matrix."""
+        n_rows = len(self.doc_ids)
+        shape = (n_rows, len(self.vocabulary))
+        indptr = self._indptr[:n_rows + 1]
+        indices = self._indices[:self._nnz]
+        data = self._data[:self._nnz]
+        matrix = csr_matrix((data, indices, indptr), shape=shape, copy=False)
+        squared = csr_matrix((data * data, indices, indptr), shape=shape, copy=False)
+        return matrix, squared
+
+    @staticmethod
+    def _grow(array, size):
+        if size <= len(array):
+            return array
+        grown = np.zeros(max(size, len(array) * 2), dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
@@ -0,0 +1,109 @@
+from tkinter import ttk
+
+
+class VirtualTreeview:
+    """
+    A Treeview that only ever holds the rows currently on screen.
+
+    The data lives elsewhere (e.g. the results database) and is read a page at
+    a time through `fetch(offset, limit)`; `count()` returns the total number
+    of rows and `row_values(index, record)` turns a record into the tuple of
+    column values. A small buffer of records on either side of the visible
+    window is cached so scrolling a few rows doesn't hit the database.
+
+    Scrolling reuses the same Treeview items and just rewrites their values,
+    so the cost of a refresh depends on the window height, not the pool size.
+    """
+
+    def __init__(self, parent, columns, column_widths, fetch, count, row_values, buffer=50, style='Treeview'):
+        self.fetch = fetch
+        self.count = count
+        self.row_values = row_values
+        self.buffer = buffer
+
+        self.offset = 0
+        self.total = 0
+        self.visible = 1
+        self._cache_start = 0
+        self._cache = []
+
+        self.tree = ttk.Treeview(parent, columns=columns, show='headings', style=style, height=1)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=column_widths[col], anchor='center')
+
+        self.y_scrollbar = ttk.Scrollbar(parent, orient='vertical', command=self.yview)
+        self.x_scrollbar = ttk.Scrollbar(parent, orient='horizontal', command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.x_scrollbar.set)
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', lambda event: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll(3))
+        self.tree.bind('<Prior>', lambda event: self.scroll(-self.visible))
+        self.tree.bind('<Next>', lambda event: self.scroll(self.visible))
+
+    def grid(self, row=0, column=0):
+        self.tree.grid(row=row, column=column, sticky="nsew")
+        self.y_scrollbar.grid(row=row, column=column + 1, sticky="ns")
+        self.x_scrollbar.grid(row=row + 1, column=column, sticky="ew")
+
+    def refresh(self):
+        """Re-read the row count and the visible window, e.g. after candidates were added."""
+        self.total = self.count()
+        self._cache = []
+        self._render()
+
+    def scroll_to(self, index):
+        self.offset = index
+        self._render()
+
+    def scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+
+    def yview(self, *args):
+        # Scrollbar protocol: ('moveto', fraction) or ('scroll', n, 'units'|'pages')
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.total))
+        elif args[0] == 'scroll':
+            step = self.visible if args[2] == 'pages' else 1
+            self.scroll(int(args[1]) * step)
+
+    def on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def on_resize(self, event):
+        rowheight = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        # Leave room for the heading row
+        visible = max(1, event.height // rowheight - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self._render()
+
+    def _render(self):
+        self.offset = max(0, min(self.offset, self.total - self.visible))
+        records = self._window(self.offset, min(self.visible, self.total - self.offset))
+
+        items = self.tree.get_children()
+        for i, record in enumerate(records):
+            values = self.row_values(self.offset + i, record)
+            if i < len(items):
+                self.tree.item(items[i], values=values)
+            else:
+                self.tree.insert('', 'end', values=values)
+        if len(items) > len(records):
+            self.tree.delete(*items[len(records):])
+
+        if self.total:
+            self.y_scrollbar.set(self.offset / self.total, (self.offset + len(records)) / self.total)
+        else:
+            self.y_scrollbar.set(0.0, 1.0)
+
+    def _window(self, start, length):
+        cache_end = self._cache_start + len(self._cache)
+        if start < self._cache_start or start + length > cache_end:
+            self._cache_start = max(0, start - self.buffer)
+            self._cache = self.fetch(self._cache_start, length + 2 * self.buffer)
+        begin = start - self._cache_start
+        return self._cache[begin:begin + length]